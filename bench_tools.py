@@ -1,934 +1,847 @@
+import itertools
 import json
-import glob
 import os
+from dataclasses import dataclass, replace
 from time import perf_counter
-import psutil
-import ray
-from datafusion_ray import DatafusionRayContext
-import pyquokka
-import datafusion
-import pyballista
-import pyarrow as pa
-import duckdb
+
 import numpy as np
 import pandas as pd
-import psycopg2
-import lance
-import polars as pl
-from tableauhyperapi import Connection, CreateMode, HyperProcess, Telemetry
-
-from misc import get_query_tag
-from quokka_tools import get_quokka_queries
-
-
-def get_queries(txt, scale_factor):
-    queries_txt = txt.replace("__COEF__", str(float(0.0001 / scale_factor)))
-    queries = queries_txt.split(";")
-    queries = [q.strip() for q in queries]
-    queries = [q for q in queries if len(q) > 0]
-    return queries
-
 
-def run_queries_duckdb_on_duckdb(subfolders, queries_duckdb, logger, tmp_dir_path=None):
+from engine_adapters import (
+    BallistaOnParquetAdapter,
+    DatafusionOnLanceAdapter,
+    DatafusionOnParquetAdapter,
+    DatafusionRayOnParquetAdapter,
+    DuckDBOnDuckDBAdapter,
+    DuckDBOnLanceAdapter,
+    DuckDBOnParquetAdapter,
+    HyperOnHyperAdapter,
+    HyperOnParquetAdapter,
+    PolarsOnParquetAdapter,
+    PolarsSQLOnParquetAdapter,
+    PostgreSQLAdapter,
+    QuokkaOnParquetAdapter,
+)
+from failure_registry import registry_key
+from isolation import set_process_affinity, supervise
+from misc import find_table_files, parse_folder_name
+from monitoring import ResourceSampler, available_cores
+from page_cache import CACHE_MODES, dataset_files, evict_files, preload_files
+from profiles import profile_operators
+from result_check import ResultFingerprint
+from result_store import resume_key
+from tpch_params import generate_params
+
+
+def is_known_failure(known_failures, tpc_name, query_number, scale_factor):
+    for benchmark, query, min_scale_factor, max_scale_factor in known_failures:
+        if (
+            (benchmark == tpc_name)
+            and (query == query_number)
+            and ((min_scale_factor is None) or (scale_factor >= min_scale_factor))
+            and ((max_scale_factor is None) or (scale_factor <= max_scale_factor))
+        ):
+            return True
+    return False
+
+
+def timing_record(
+    adapter,
+    scale_factor,
+    query_number,
+    status,
+    repetition=1,
+    n_returned_rows=np.nan,
+    elapsed_time_s=np.nan,
+    **metrics,
+):
+    if adapter.fetch_mode is not None:
+        metrics["fetch_mode"] = adapter.fetch_mode
+    return {
+        "engine": adapter.engine,
+        "file_type": adapter.file_type if adapter.file_type is not None else np.nan,
+        "scale_factor": scale_factor,
+        "query": query_number,
+        "status": status,
+        "repetition": repetition,
+        "n_returned_rows": n_returned_rows,
+        "elapsed_time_s": elapsed_time_s,
+        **metrics,
+    }
+
+
+def profile_record(
+    adapter, scale_factor, query_number, raw_profile, operators, **metrics
+):
+    if adapter.fetch_mode is not None:
+        metrics["fetch_mode"] = adapter.fetch_mode
+    return {
+        "engine": adapter.engine,
+        "file_type": adapter.file_type if adapter.file_type is not None else np.nan,
+        "scale_factor": scale_factor,
+        "query": query_number,
+        **metrics,
+        "profile_format": adapter.profile_format,
+        "profile": raw_profile,
+        "operators": operators,
+    }
+
+
+def timed_run(adapter, query, fingerprint=None):
     """
-    if the DuckDB connection is created inside the query loop, query 18 causes a crash...
+    Plan, execute and fetch a query, timing each phase.
+
+    Parameters
+    ----------
+    fingerprint : result_check.ResultFingerprint, optional
+        Fingerprint of the result, updated while fetching it. Its computation
+        time is excluded from the phases and returned as fingerprint_time_s.
+
+    Returns
+    -------
+    dict: n_returned_rows, and the phase times in seconds:
+    - plan_time_s: adapter.plan, parsing and planning when the engine API
+      separates them from the execution, else 0,
+    - execute_time_s: adapter.execute, up to the result being available,
+    - first_batch_time_s: up to the first batch of rows,
+    - fetch_time_s: the remaining batches,
+    - elapsed_time_s: the end-to-end time, from the query text to the last row
+      of the result, i.e. the sum of the phases. This is the time compared
+      across the engines,
+    - fingerprint_time_s: with a fingerprint, the time spent computing it.
     """
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"DuckDB / .duckdb - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_queries(queries_duckdb, scale_factor)
-        query_count = len(queries)
-
-        duckdb_file_path = os.path.join(folder_path, "data.duckdb")
-        logger.info(f"DuckDB file path : {duckdb_file_path}")
-
-        for i, query in enumerate(queries):
-            query_tag = get_query_tag(query)
-            logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-
-            with duckdb.connect(database=str(duckdb_file_path), read_only=False) as con:
-                # _ = con.execute("PRAGMA enable_object_cache")
-                if tmp_dir_path is not None:
-                    _ = con.execute(f"SET temp_directory='{tmp_dir_path}'")
-
-                if (
-                    (tpc_name == "tpch") and (i + 1 == 21) and (scale_factor == 100.0)
-                ):  # OOM error with query 21 and SF100
-                    d = dict(
-                        [
-                            ("engine", "DuckDB"),
-                            ("file_type", "duckdb"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", np.NaN),
-                            ("elapsed_time_s", np.NaN),
-                        ]
-                    )
-
-                else:
-                    start_time_s = perf_counter()
-                    _ = con.execute(query)
-                    elapsed_time_s = perf_counter() - start_time_s
-                    logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                    result = con.df()
-                    n_returned_rows = result.shape[0]
-                    # print(result)
-
-                    d = dict(
-                        [
-                            ("engine", "DuckDB"),
-                            ("file_type", "duckdb"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", n_returned_rows),
-                            ("elapsed_time_s", elapsed_time_s),
-                        ]
-                    )
-
-            timings.append(d)
-
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
-
-    timings_df = pd.DataFrame(timings)
-    return timings_df
-
-
-def run_queries_duckdb_on_parquet(
-    subfolders, queries_duckdb, logger, tmp_dir_path=None
+    start_time_s = perf_counter()
+    plan = adapter.plan(query)
+    plan_end_s = perf_counter()
+    result = adapter.execute(plan)
+    execute_end_s = perf_counter()
+    batches = adapter.fetch(result, fingerprint)
+    n_returned_rows = next(batches, 0)
+    first_batch_end_s = perf_counter()
+    # fingerprint computation time, up to the first batch and in total
+    first_fingerprint_time_s = 0.0 if fingerprint is None else fingerprint.time_s
+    n_returned_rows += sum(batches)
+    end_s = perf_counter()
+    fingerprint_time_s = 0.0 if fingerprint is None else fingerprint.time_s
+    phases = {
+        "n_returned_rows": n_returned_rows,
+        "elapsed_time_s": end_s - start_time_s - fingerprint_time_s,
+        "plan_time_s": plan_end_s - start_time_s,
+        "execute_time_s": execute_end_s - plan_end_s,
+        "first_batch_time_s": (
+            first_batch_end_s - execute_end_s - first_fingerprint_time_s
+        ),
+        "fetch_time_s": (
+            end_s - first_batch_end_s - fingerprint_time_s + first_fingerprint_time_s
+        ),
+    }
+    if fingerprint is not None:
+        phases["fingerprint_time_s"] = fingerprint_time_s
+    return phases
+
+
+@dataclass
+class RunOptions:
+    """Measurement options of run_queries, shared with the worker processes."""
+
+    warmup: int = 0
+    repetitions: int = 1
+    sample_interval_s: float = 0.1
+    cache_mode: str = None
+    threads: int = None
+    memory_limit: int = None
+    param_seed: int = None
+    fingerprint: bool = False
+    profile: bool = False
+
+    def settings(self):
+        """Run settings written in the timing records (misc.SETTING_KEYS)."""
+        settings = {}
+        if self.threads is not None:
+            settings["threads"] = self.threads
+        if self.memory_limit is not None:
+            settings["memory_limit"] = self.memory_limit
+        if self.cache_mode is not None:
+            settings["cache_mode"] = self.cache_mode
+        if self.param_seed is not None:
+            settings["param_seed"] = self.param_seed
+        return settings
+
+    def query_params(self, iteration, repetition):
+        """
+        TPC-H substitution parameters of a run, drawn from param_seed and the
+        repetition, the warm-up runs having their own: None for the validation
+        parameters.
+        """
+        if self.param_seed is None:
+            return None
+        if repetition < 1:
+            return generate_params([self.param_seed, 0, iteration + 1])
+        return generate_params([self.param_seed, repetition])
+
+    def cpus(self):
+        """Cores the queries are pinned to, None to keep the affinity."""
+        if self.threads is None:
+            return None
+        return sorted(os.sched_getaffinity(0))[: self.threads]
+
+    def worker_env(self):
+        """Environment variables of the worker processes."""
+        if self.threads is None:
+            return {}
+        # read by the Polars and Rayon thread pools when they are created
+        return {
+            "POLARS_MAX_THREADS": str(self.threads),
+            "RAYON_NUM_THREADS": str(self.threads),
+        }
+
+
+def run_session(
+    adapter,
+    folder_path,
+    queries,
+    query_numbers,
+    skipped,
+    first_repetitions,
+    options,
+    logger,
+    emit,
 ):
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"DuckDB / .parquet - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_queries(queries_duckdb, scale_factor)
-        query_count = len(queries)
-
-        parquet_file_paths = glob.glob(os.path.join(folder_path, "*.parquet"))
-        parquet_file_count = len(parquet_file_paths)
-        logger.info(f"Found {parquet_file_count} Parquet files")
-
-        # list tables
-        table_names = []
-        parquet_files_dict = {}
-        for parquet_file_path in parquet_file_paths:
-            file_name = os.path.basename(parquet_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            if table_name in parquet_files_dict:
-                parquet_files_dict[table_name].append(parquet_file_path)
-            else:
-                parquet_files_dict[table_name] = [parquet_file_path]
-        table_names = list(set(table_names))
-
-        con = duckdb.connect()
-        # _ = con.execute("PRAGMA enable_object_cache;")
-        if tmp_dir_path is not None:
-            _ = con.execute(f"SET temp_directory='{tmp_dir_path}'")
-        # load the files
-        for table_name in table_names:
-            q = f"""CREATE VIEW IF NOT EXISTS {table_name} AS SELECT *
-                FROM read_parquet({parquet_files_dict[table_name]})"""
-            con.execute(q)
-
-        for i, query in enumerate(queries):
-            query_tag = get_query_tag(query)
-            logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-            if ((tpc_name == "tpch") and (i + 1 == 21) and (scale_factor == 100.0)) or (
-                (tpc_name == "tpcds") and (i + 1 == 68) and (scale_factor >= 1.0)
-            ):
-                d = dict(
-                    [
-                        ("engine", "DuckDB"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", np.NaN),
-                        ("elapsed_time_s", np.NaN),
-                    ]
-                )
-
-            else:
-                start_time_s = perf_counter()
-                _ = con.execute(query)
-                elapsed_time_s = perf_counter() - start_time_s
-                logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                result = con.df()
-                n_returned_rows = result.shape[0]
-
-                d = dict(
-                    [
-                        ("engine", "DuckDB"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", n_returned_rows),
-                        ("elapsed_time_s", elapsed_time_s),
-                    ]
-                )
-
-            timings.append(d)
-
-        con.close()
-
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
-
-    timings_df = pd.DataFrame(timings)
-    return timings_df
-
-
-def run_queries_duckdb_on_lance(subfolders, queries_duckdb, logger, tmp_dir_path=None):
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"DuckDB / .lance - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_queries(queries_duckdb, scale_factor)
-        query_count = len(queries)
-
-        lance_file_paths = glob.glob(os.path.join(folder_path, "*.lance"))
-        lance_file_count = len(lance_file_paths)
-        logger.info(f"Found {lance_file_count} Lance files")
-
-        # list tables
-        table_names = []
-        lance_files_dict = {}
-        for lance_file_path in lance_file_paths:
-            file_name = os.path.basename(lance_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            if table_name in lance_files_dict:
-                lance_files_dict[table_name].append(lance_file_path)
-            else:
-                lance_files_dict[table_name] = [lance_file_path]
-        table_names = list(set(table_names))
-
-        con = duckdb.connect()
-        # _ = con.execute("PRAGMA enable_object_cache;")
-        if tmp_dir_path is not None:
-            _ = con.execute(f"SET temp_directory='{tmp_dir_path}'")
-        # load the files
-        for table_name in table_names:
-            locals()[table_name] = lance.dataset(lance_files_dict[table_name][0])
-
-        for i, query in enumerate(queries):
-            query_tag = get_query_tag(query)
-            logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-            if ((tpc_name == "tpch") and (i + 1 == 21) and (scale_factor == 100.0)) or (
-                (tpc_name == "tpcds") and (i + 1 == 68) and (scale_factor >= 1.0)
-            ):
-                d = dict(
-                    [
-                        ("engine", "DuckDB"),
-                        ("file_type", "lance"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", np.NaN),
-                        ("elapsed_time_s", np.NaN),
-                    ]
-                )
-
-            else:
-                start_time_s = perf_counter()
-                _ = con.execute(query)
-                elapsed_time_s = perf_counter() - start_time_s
-                logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                result = con.df()
-                n_returned_rows = result.shape[0]
-
-                d = dict(
-                    [
-                        ("engine", "DuckDB"),
-                        ("file_type", "lance"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", n_returned_rows),
-                        ("elapsed_time_s", elapsed_time_s),
-                    ]
-                )
-
-            timings.append(d)
-
-        con.close()
-
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
-
-    timings_df = pd.DataFrame(timings)
-    return timings_df
-
-
-def run_queries_hyper_on_hyper(subfolders, queries_hyper, logger):
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"Hyper / .hyper - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_queries(queries_hyper, scale_factor)
-        query_count = len(queries)
-
-        hyper_file_path = os.path.join(folder_path, "data.hyper")
-        logger.info(f"Hyper file path : {hyper_file_path}")
-
-        with HyperProcess(
-            telemetry=Telemetry.DO_NOT_SEND_USAGE_DATA_TO_TABLEAU
-        ) as hyper:
-            with Connection(
-                endpoint=hyper.endpoint,
-                database=hyper_file_path,
-                create_mode=CreateMode.NONE,
-            ) as con:
-                _ = con.execute_command("SET schema 'Export';")
-
-                for i, query in enumerate(queries):
-                    query_tag = get_query_tag(query)
-                    logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-
-                    start_time_s = perf_counter()
-                    result = con.execute_query(query)
-                    elapsed_time_s = perf_counter() - start_time_s
-                    logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                    n_returned_rows = 0
-                    while result.next_row():
-                        n_returned_rows += 1
-                        # print(result.get_values())
-                    result.close()
-
-                    d = dict(
-                        [
-                            ("engine", "Hyper"),
-                            ("file_type", "hyper"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", n_returned_rows),
-                            ("elapsed_time_s", elapsed_time_s),
-                        ]
-                    )
-
-                    timings.append(d)
-
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
-
-    timings_df = pd.DataFrame(timings)
-    return timings_df
-
-
-def run_queries_hyper_on_parquet(subfolders, queries_hyper, logger):
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"Hyper / .parquet - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_queries(queries_hyper, scale_factor)
-        query_count = len(queries)
-
-        parquet_file_paths = glob.glob(os.path.join(folder_path, "*.parquet"))
-        parquet_file_count = len(parquet_file_paths)
-        logger.info(f"Found {parquet_file_count} Parquet files")
-
-        # list tables
-        table_names = []
-        parquet_files_dict = {}
-        for parquet_file_path in parquet_file_paths:
-            file_name = os.path.basename(parquet_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            if table_name in parquet_files_dict:
-                parquet_files_dict[table_name].append(parquet_file_path)
-            else:
-                parquet_files_dict[table_name] = [parquet_file_path]
-        table_names = list(set(table_names))
-
-        hyper_file_path = os.path.join(folder_path, "tmp.hyper")
-        parameters = {}
-        parameters["external_table_sample_size_factor"] = "0.005"
-        with HyperProcess(
-            telemetry=Telemetry.DO_NOT_SEND_USAGE_DATA_TO_TABLEAU,
-            parameters=parameters,
-        ) as hyper:
-            with Connection(
-                endpoint=hyper.endpoint,
-                database=hyper_file_path,
-                create_mode=CreateMode.CREATE_AND_REPLACE,
-            ) as con:
-                for table_name in table_names:
-                    file_array = ["'" + c + "'" for c in parquet_files_dict[table_name]]
-                    if len(file_array) == 1:
-                        file_array_str = file_array[0]
-                    else:
-                        file_array_str = ", ".join(file_array)
-                        file_array_str = "ARRAY[" + file_array_str + "]"
-
-                    q = f"""CREATE TEMPORARY EXTERNAL TABLE IF NOT EXISTS {table_name}
-                        FOR {file_array_str} """
-                    _ = con.execute_command(q)
-
-                for i, query in enumerate(queries):
-                    query_tag = get_query_tag(query)
-                    logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-
-                    start_time_s = perf_counter()
-                    result = con.execute_query(query)
-                    elapsed_time_s = perf_counter() - start_time_s
-                    logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                    n_returned_rows = 0
-                    while result.next_row():
-                        n_returned_rows += 1
-                    result.close()
-
-                    d = dict(
-                        [
-                            ("engine", "Hyper"),
-                            ("file_type", "parquet"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", n_returned_rows),
-                            ("elapsed_time_s", elapsed_time_s),
-                        ]
-                    )
-                    timings.append(d)
-
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
-
-    timings_df = pd.DataFrame(timings)
-    return timings_df
-
-
-def run_queries_datafusion_on_parquet(subfolders, queries_datafusion, logger):
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"Datafusion / .parquet - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_queries(queries_datafusion, scale_factor)
-        query_count = len(queries)
-
-        parquet_file_paths = glob.glob(os.path.join(folder_path, "*.parquet"))
-        parquet_file_count = len(parquet_file_paths)
-        logger.info(f"Found {parquet_file_count} Parquet files")
-
-        # list tables
-        table_names = []
-        parquet_files_dict = {}
-        for parquet_file_path in parquet_file_paths:
-            file_name = os.path.basename(parquet_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            if table_name in parquet_files_dict:
-                parquet_files_dict[table_name].append(parquet_file_path)
-            else:
-                parquet_files_dict[table_name] = [parquet_file_path]
-        table_names = list(set(table_names))
-
-        # test
-        #
-        # runtime = (
-        #     datafusion.RuntimeConfig().with_disk_manager_os().with_fair_spill_pool(10000000)
-        # )
-        # config = (
-        #     datafusion.SessionConfig()
-        #     .with_create_default_catalog_and_schema(True)  # .with_default_catalog_and_schema("foo", "bar")
-        #     .with_target_partitions(1)
-        #     .with_information_schema(True)
-        #     .with_repartition_joins(False)
-        #     .with_repartition_aggregations(False)
-        #     .with_repartition_windows(False)
-        #     .with_parquet_pruning(False)
-        #     # .set("datafusion.execution.parquet.pushdown_filters", "true")
-        # )
-        # ctx = datafusion.SessionContext(config, runtime)
-
-        # wrong initial version (e.g. config not being passed into the context)
-        ctx = datafusion.SessionContext()
-        # config = datafusion.Config()
-        # config.set("datafusion.execution.parquet.enable_page_index", "true")
-        # config.set("datafusion.execution.parquet.pushdown_filters", "true")
-        # config.set("datafusion.execution.parquet.reorder_filters", "true")
-
-        logger.info("Register the Parquet files")
+    """
+    Connect the adapter to a data folder and run some of its queries.
+
+    The progress is reported through emit(event, payload), with the events
+    ("start", query_number), ("cache", cache_mode), ("warmup", elapsed_time_s),
+    ("record", dict), ("profile", dict) and ("end", query_number). The session
+    runs either in the benchmark process or in a worker process supervised by
+    isolation.supervise.
+
+    Parameters
+    ----------
+    query_numbers : list
+        1-based numbers of the queries to run.
+    skipped : set
+        Numbers of the queries recorded as skipped instead of being run.
+    first_repetitions : dict
+        query number -> first repetition to run, for the queries whose first
+        repetitions were recorded by a previous run (1 by default).
+    options : RunOptions
+        With options.threads, the adapter limits its thread count. The caller
+        pins the process to as many cores (options.cpus). With
+        options.memory_limit, the adapter sets the memory budget of the engine.
+        With options.profile, each query whose measured runs succeeded is run
+        once more with the profiling of the engine (EngineAdapter.profile).
+    """
+    folder_name = os.path.basename(os.path.normpath(folder_path))
+    _, scale_factor = parse_folder_name(folder_path)
+    query_list = adapter.get_queries(queries, scale_factor)
+    query_count = len(query_list)
+
+    table_files = {}
+    if adapter.file_extension is not None:
+        table_files = find_table_files(folder_path, adapter.file_extension)
+        file_count = sum(len(file_paths) for file_paths in table_files.values())
+        logger.info(f"Found {file_count} {adapter.file_extension} files")
+        if file_count == 0:
+            logger.warning(
+                f"No {adapter.file_extension} files found in {folder_path}, skipping..."
+            )
+            return
+
+    settings = options.settings()
+
+    def record(d):
+        emit("record", {**d, **settings})
+
+    def connect():
+        try:
+            if options.memory_limit is not None:
+                adapter.set_memory_limit(options.memory_limit)
+            adapter.connect(folder_path)
+            if options.threads is not None:
+                adapter.set_threads(options.threads)
+            adapter.register_tables(table_files)
+        except Exception as e:
+            logger.exception(f"Error connecting {adapter.engine} to {folder_name}")
+            return adapter.failure_status(e)
+        return None
+
+    if not adapter.reconnect_per_query:
+        logger.info("Register the tables")
         start_time_s = perf_counter()
-        for table_name in table_names:
-            if len(parquet_files_dict[table_name]) > 1:
-                raise ValueError(
-                    "Cannot handle multiple part Parquet files with Datafusion"
-                )
-            ctx.register_parquet(table_name, parquet_files_dict[table_name][0])
+        status = connect()
+        if status is not None:
+            for query_number in query_numbers:
+                emit("start", query_number)
+                record(timing_record(adapter, scale_factor, query_number, status))
+                emit("end", query_number)
+            return
         elapsed_time_s = perf_counter() - start_time_s
         logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
 
-        for i, query in enumerate(queries):
-            query_tag = get_query_tag(query)
-            logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-
-            skip = False
-            if (
-                ((tpc_name == "tpch") and (i + 1 == 18) and (scale_factor == 30.0))
-                or ((tpc_name == "tpch") and (i + 1 == 7) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 17) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 18) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 21) and (scale_factor == 100.0))
-            ):
-                skip = True
-
-            if skip:
-                d = dict(
-                    [
-                        ("engine", "Datafusion"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", np.NaN),
-                        ("elapsed_time_s", np.NaN),
-                    ]
-                )
-
-            else:
-                start_time_s = perf_counter()
-                df = ctx.sql(query)
-                result = df.collect()
-                # import code
-
-                # code.interact(local=dict(globals(), **locals()))
-                elapsed_time_s = perf_counter() - start_time_s
-                logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                n_returned_rows = 0
-                for _, item in enumerate(result):
-                    n_returned_rows += item.num_rows
-
-                d = dict(
-                    [
-                        ("engine", "Datafusion"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", n_returned_rows),
-                        ("elapsed_time_s", elapsed_time_s),
-                    ]
-                )
-
-            timings.append(d)
-
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
-
-    timings_df = pd.DataFrame(timings)
-    return timings_df
-
-
-def run_queries_ballista_on_parquet(subfolders, queries_datafusion, logger):
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"Ballista / .parquet - folder : {folder_name}, scale_factor : {scale_factor}"
+    warmup, repetitions = options.warmup, options.repetitions
+    if options.cache_mode is not None:
+        cached_file_paths = dataset_files(adapter, folder_path)
+        if len(cached_file_paths) == 0:
+            logger.warning(
+                f"No {adapter.engine} dataset files in {folder_name} to evict "
+                + "or preload"
+            )
+    fingerprint = options.fingerprint and adapter.can_fingerprint()
+    if options.fingerprint and not fingerprint:
+        logger.warning(
+            f"The {adapter.engine} results are not fingerprinted in the "
+            + f"{adapter.fetch_mode} fetch mode"
         )
-        queries = get_queries(queries_datafusion, scale_factor)
-        query_count = len(queries)
-
-        parquet_file_paths = glob.glob(os.path.join(folder_path, "*.parquet"))
-        parquet_file_count = len(parquet_file_paths)
-        logger.info(f"Found {parquet_file_count} Parquet files")
-
-        # list tables
-        table_names = []
-        parquet_files_dict = {}
-        for parquet_file_path in parquet_file_paths:
-            file_name = os.path.basename(parquet_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            if table_name in parquet_files_dict:
-                parquet_files_dict[table_name].append(parquet_file_path)
-            else:
-                parquet_files_dict[table_name] = [parquet_file_path]
-        table_names = list(set(table_names))
-
-        ctx = pyballista.SessionContext("localhost", 50050)
-        # ctx = pyballista.SessionContext()
+    profile = options.profile and (adapter.profile_format is not None)
+    if options.profile and not profile:
+        logger.warning(f"The {adapter.engine} queries are not profiled")
+    sampler = ResourceSampler(
+        options.sample_interval_s,
+        external_processes=adapter.server_processes,
+        spill_dir=adapter.tmp_dir_path,
+        server_engine=adapter.server_engine,
+    )
+    for query_number in query_numbers:
+        query = query_list[query_number - 1]
+        query_tag = adapter.query_tag(query_number - 1, query)
+        logger.info(f"query {query_number} / {query_count} : tag {query_tag}")
+        emit("start", query_number)
+
+        if (query is None) or (query_number in skipped):
+            record(timing_record(adapter, scale_factor, query_number, "skipped"))
+            emit("end", query_number)
+            continue
 
-        logger.info("Register the Parquet files")
-        start_time_s = perf_counter()
-        for table_name in table_names:
-            if len(parquet_files_dict[table_name]) > 1:
-                raise ValueError(
-                    "Cannot handle multiple part Parquet files with Ballista"
+        if adapter.reconnect_per_query:
+            status = connect()
+            if status is not None:
+                record(timing_record(adapter, scale_factor, query_number, status))
+                emit("end", query_number)
+                continue
+
+        if options.cache_mode == "hot":
+            n_bytes = preload_files(cached_file_paths)
+            logger.info(f"Pre-read {n_bytes / 1e9:.3f} GB of dataset files")
+            emit("cache", options.cache_mode)
+
+        first_repetition = first_repetitions.get(query_number, 1)
+        failed = False
+        for iteration in range(warmup + repetitions - first_repetition + 1):
+            repetition = iteration - warmup + first_repetition
+            params = options.query_params(iteration, repetition)
+            variant = {}
+            if params is not None:
+                query = adapter.get_queries(queries, scale_factor, params)[
+                    query_number - 1
+                ]
+                variant["params"] = json.dumps(params[query_number], default=str)
+            if options.cache_mode == "cold":
+                method = evict_files(cached_file_paths)
+                logger.debug(
+                    f"Evicted the dataset files from the page cache ({method})"
                 )
-            ctx.register_parquet(table_name, parquet_files_dict[table_name][0])
-        elapsed_time_s = perf_counter() - start_time_s
-        logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-        for i, query in enumerate(queries):
-            query_tag = get_query_tag(query)
-            logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-
-            skip = False
-
-            # only run certain queries
-            # if i + 1 != 1 or tpc_name != "tpch" or scale_factor != 1.0:
-            #     skip = True
-
-            if skip:
-                d = dict(
-                    [
-                        ("engine", "Ballista"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", np.NaN),
-                        ("elapsed_time_s", np.NaN),
-                    ]
+                emit("cache", options.cache_mode)
+            result_fingerprint = ResultFingerprint() if fingerprint else None
+            try:
+                with sampler:
+                    phases = timed_run(adapter, query, result_fingerprint)
+            except Exception as e:
+                logger.exception(f"Error executing query {query_number}")
+                d = timing_record(
+                    adapter,
+                    scale_factor,
+                    query_number,
+                    adapter.failure_status(e),
+                    max(repetition, first_repetition),
+                    **variant,
+                    **sampler.metrics(),
                 )
-
-            else:
-                start_time_s = perf_counter()
-                df = ctx.sql(query)
-                result = df.collect()
-                # import code
-
-                # code.interact(local=dict(globals(), **locals()))
-                elapsed_time_s = perf_counter() - start_time_s
-                logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                n_returned_rows = 0
-                for _, item in enumerate(result):
-                    n_returned_rows += item.num_rows
-
-                d = dict(
-                    [
-                        ("engine", "Ballista"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", n_returned_rows),
-                        ("elapsed_time_s", elapsed_time_s),
-                    ]
+                record(d)
+                failed = True
+                break
+
+            n_returned_rows = phases.pop("n_returned_rows")
+            elapsed_time_s = phases["elapsed_time_s"]
+            if iteration < warmup:
+                logger.info(
+                    f"Warm-up {iteration + 1} / {warmup} elapsed time (s) : "
+                    + f"{elapsed_time_s:10.3f}"
                 )
+                emit("warmup", elapsed_time_s)
+                continue
+            logger.info(
+                f"Repetition {repetition} / {repetitions} elapsed time (s) : "
+                + f"{elapsed_time_s:10.3f}"
+            )
+            if result_fingerprint is not None:
+                variant["result_fingerprint"] = json.dumps(result_fingerprint.to_dict())
+            d = timing_record(
+                adapter,
+                scale_factor,
+                query_number,
+                "ok",
+                repetition,
+                n_returned_rows,
+                **phases,
+                **variant,
+                **sampler.metrics(),
+            )
+            record(d)
 
-            timings.append(d)
-
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
-
-    timings_df = pd.DataFrame(timings)
-    return timings_df
-
-
-def run_queries_datafusion_ray_on_parquet(subfolders, queries_datafusion, logger):
-    # Start a local cluster
-    ray.init(resources={"worker": 1})
-
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"Datafusion Ray / .parquet - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_queries(queries_datafusion, scale_factor)
-        query_count = len(queries)
-
-        parquet_file_paths = glob.glob(os.path.join(folder_path, "*.parquet"))
-        parquet_file_count = len(parquet_file_paths)
-        logger.info(f"Found {parquet_file_count} Parquet files")
-
-        # list tables
-        table_names = []
-        parquet_files_dict = {}
-        for parquet_file_path in parquet_file_paths:
-            file_name = os.path.basename(parquet_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            if table_name in parquet_files_dict:
-                parquet_files_dict[table_name].append(parquet_file_path)
+        if profile and not failed:
+            # an untimed run, with the validation parameters
+            try:
+                start_time_s = perf_counter()
+                raw_profile = adapter.profile(query_list[query_number - 1])
+                profile_time_s = perf_counter() - start_time_s
+                operators = profile_operators(adapter.profile_format, raw_profile)
+            except Exception:
+                logger.exception(f"Error profiling query {query_number}")
             else:
-                parquet_files_dict[table_name] = [parquet_file_path]
-        table_names = list(set(table_names))
-
-        # Create a context and register a tables
-        ctx = DatafusionRayContext(2, use_ray_shuffle=True)
-
-        logger.info("Register the Parquet files")
-        start_time_s = perf_counter()
-        for table_name in table_names:
-            if len(parquet_files_dict[table_name]) > 1:
-                raise ValueError(
-                    "Cannot handle multiple part Parquet files with Datafusion Ray"
+                logger.info(
+                    f"Profile : {len(operators)} operators, elapsed time (s) : "
+                    + f"{profile_time_s:10.3f}"
                 )
-            ctx.register_parquet(table_name, parquet_files_dict[table_name][0])
-        elapsed_time_s = perf_counter() - start_time_s
-        logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-        for i, query in enumerate(queries):
-            query_tag = get_query_tag(query)
-            logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-
-            skip = False
-
-            # only run certain queries
-            # if i + 1 != 1 or tpc_name != "tpch" or scale_factor != 1.0:
-            #     skip = True
-
-            if skip:
-                d = dict(
-                    [
-                        ("engine", "Datafusion Ray"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", np.NaN),
-                        ("elapsed_time_s", np.NaN),
-                    ]
+                d = profile_record(
+                    adapter,
+                    scale_factor,
+                    query_number,
+                    raw_profile,
+                    operators,
+                    profile_time_s=profile_time_s,
+                    **settings,
                 )
-
-            else:
-                start_time_s = perf_counter()
-                result_set = ctx.sql(query)
-                elapsed_time_s = perf_counter() - start_time_s
-                logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                n_returned_rows = 0
-                for _, item in enumerate(result_set):
-                    n_returned_rows += item.num_rows
-
-                d = dict(
-                    [
-                        ("engine", "Datafusion Ray"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", n_returned_rows),
-                        ("elapsed_time_s", elapsed_time_s),
-                    ]
+                emit("profile", d)
+
+        if adapter.reconnect_per_query:
+            adapter.close()
+        emit("end", query_number)
+
+    if not adapter.reconnect_per_query:
+        adapter.close()
+
+
+def run_isolated_sessions(
+    adapter,
+    folder_path,
+    queries,
+    query_numbers,
+    skipped,
+    first_repetitions,
+    options,
+    logger,
+    isolation,
+    query_limits,
+    result_store=None,
+    profile_store=None,
+):
+    """
+    Run the queries of a data folder in supervised worker processes.
+
+    With isolation="session" a worker runs all the remaining queries of the
+    folder, and a new one is started after the query that killed the previous
+    one. With isolation="query" each query runs in its own worker.
+
+    Parameters
+    ----------
+    query_limits : dict
+        query number -> (timeout_s, memory_ceiling) of the query.
+    result_store : result_store.ResultStore, optional
+        Store the records are appended to as soon as they are received.
+    profile_store : result_store.ResultStore, optional
+        Store the profiles are appended to as soon as they are received.
+    """
+    _, scale_factor = parse_folder_name(folder_path)
+    pending = list(query_numbers)
+    records = []
+
+    while len(pending) > 0:
+        worker_query_numbers = pending if isolation == "session" else pending[:1]
+        args = (
+            adapter,
+            folder_path,
+            queries,
+            worker_query_numbers,
+            skipped,
+            first_repetitions,
+            options,
+        )
+        done = []
+        failed = False
+        events = supervise(
+            run_session,
+            args,
+            logger,
+            query_limits,
+            env=options.worker_env(),
+            cpus=options.cpus(),
+        )
+        for event, payload in events:
+            if event == "record":
+                records.append(payload)
+                if result_store is not None:
+                    result_store.append(payload)
+            elif (event == "profile") and (profile_store is not None):
+                profile_store.append(payload)
+            elif event == "end":
+                done.append(payload)
+            elif event == "failure":
+                failed = True
+                query_number = payload["query"]
+                if query_number is None:
+                    # the worker died outside of a query, e.g. while connecting
+                    # or closing its connection after the last one
+                    query_number = next(
+                        (n for n in worker_query_numbers if n not in done), None
+                    )
+                if query_number is None:
+                    logger.warning(
+                        f"worker {payload['status']} after its last query, "
+                        + "no query failed"
+                    )
+                    continue
+                n_measured = sum(1 for d in records if d["query"] == query_number)
+                d = timing_record(
+                    adapter,
+                    scale_factor,
+                    query_number,
+                    payload["status"],
+                    first_repetitions.get(query_number, 1) + n_measured,
+                    elapsed_time_s=payload["elapsed_time_s"],
+                    peak_rss_bytes=payload["peak_rss_bytes"],
+                    **options.settings(),
                 )
+                records.append(d)
+                if result_store is not None:
+                    result_store.append(d)
+                done.append(query_number)
+        if not failed:
+            done = worker_query_numbers
+        pending = [n for n in pending if n not in done]
 
-            timings.append(d)
-
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
-
-    timings_df = pd.DataFrame(timings)
-    return timings_df
+    return records
 
 
-def run_queries_datafusion_on_lance(subfolders, queries_datafusion, logger):
+def first_unrecorded_repetition(
+    recorded_statuses, adapter, scale_factor, query_number, options
+):
+    """
+    The first repetition of a query missing from the recorded statuses (see
+    result_store.ResultStore.recorded_statuses), None if all its repetitions
+    are recorded or one of them failed.
+    """
+    statuses = []
+    for repetition in range(1, options.repetitions + 1):
+        d = timing_record(
+            adapter,
+            scale_factor,
+            query_number,
+            None,
+            repetition,
+            **options.settings(),
+        )
+        statuses.append(recorded_statuses.get(resume_key(d)))
+    if any((status is not None) and (status != "ok") for status in statuses):
+        return None
+    if None not in statuses:
+        return None
+    return statuses.index(None) + 1
+
+
+def query_status(records, query_number):
+    """The first failure status of a query, "ok" if all its runs succeeded."""
+    statuses = [d["status"] for d in records if d["query"] == query_number]
+    failures = [status for status in statuses if status != "ok"]
+    return failures[0] if failures else "ok"
+
+
+def run_queries(
+    adapter,
+    subfolders,
+    queries,
+    logger,
+    warmup=0,
+    repetitions=1,
+    isolation=None,
+    timeout_s=None,
+    memory_ceiling=None,
+    failure_registry=None,
+    sample_interval_s=0.1,
+    cache_mode=None,
+    threads=None,
+    memory_limits=None,
+    result_store=None,
+    resume=False,
+    query_subset=None,
+    param_seed=None,
+    fingerprint=False,
+    profile_store=None,
+):
+    """
+    Run the queries with the given engine adapter on every data folder.
+
+    Parameters
+    ----------
+    adapter : engine_adapters.EngineAdapter
+        The engine / file format adapter.
+    subfolders : list
+        Data folder paths, e.g. [".../tpch_1", ".../tpch_10"].
+    queries : str
+        The queries text, split by the adapter (ignored by the Polars and
+        Quokka adapters, which hold their own queries).
+    logger : loguru.logger
+    warmup : int
+        Number of untimed runs of each query before the measured ones.
+    repetitions : int
+        Number of measured runs of each query.
+    isolation : str, optional
+        None to run in the benchmark process, "session" to run each folder in
+        a supervised worker process, "query" to run each query in its own
+        worker process. A crash of a worker only fails the query in progress.
+    timeout_s : float, optional
+        Wall-clock limit of each run of a query, in seconds (requires
+        isolation).
+    memory_ceiling : int, optional
+        RSS limit of the worker process and its children, in bytes (requires
+        isolation).
+    failure_registry : failure_registry.FailureRegistry, optional
+        Registry of the previous failures, deciding which queries are skipped
+        or retried with a bigger budget, and updated with the new failures.
+        Without a registry, the adapter known_failures are skipped.
+    sample_interval_s : float, optional
+        Sampling interval of the memory, CPU and I/O usage of the process running
+        the queries, its children and the adapter server processes, in
+        seconds. None disables the sampling.
+    cache_mode : str, optional
+        "cold" to evict the data folder files from the OS page cache before
+        each run of a query, "hot" to read them into the page cache before
+        each query, None to leave the page cache alone. The engine buffer pools
+        are not affected, except by the adapters reconnecting for each query.
+    threads : list, optional
+        Thread counts swept over: for each count, the queries run on as many
+        cores, with the engine thread count set accordingly (see
+        EngineAdapter.set_threads). None keeps the engine defaults. The
+        Polars thread pool is only resized in worker processes (isolation).
+    memory_limits : list, optional
+        Memory budgets of the engines in bytes swept over, beyond which they
+        spill to tmp_dir_path or fail (see EngineAdapter.set_memory_limit).
+        None keeps the engine defaults.
+    result_store : result_store.ResultStore, optional
+        Store each record is appended to as soon as its run finishes.
+    resume : bool
+        Skip the repetitions already in the result store. A query whose
+        recorded repetitions include a failure is not run again.
+    query_subset : list, optional
+        Numbers of the queries to run, all the queries by default.
+    param_seed : int, optional
+        Seed of the TPC-H substitution parameters (see tpch_params.py): each
+        run of a query gets its own parameters, drawn from the seed and the
+        repetition, and written in the params column. None runs the
+        validation queries.
+    fingerprint : bool
+        Compute the fingerprint of the result of each measured run (see
+        result_check.py), written as JSON in the result_fingerprint column,
+        in the fetch modes which allow it (EngineAdapter.can_fingerprint).
+        See result_check.check_result_fingerprints for the comparison with
+        the reference results.
+    profile_store : result_store.ResultStore, optional
+        Store of the native query profiles. With a store, each query whose
+        measured runs succeeded is run once more, untimed and with the
+        validation parameters, with the profiling of the engine enabled (see
+        EngineAdapter.profile), and its raw profile is appended to the store
+        with its operators (see profiles.py), in the adapters which have
+        one.
+
+    Returns
+    -------
+    pd.DataFrame: one row per query and repetition, with a status among "ok",
+    "skipped", "error", "timeout", "oom" and "crash". elapsed_time_s is the
+    end-to-end time of a run, from the query text to the last row of the
+    result, split into plan_time_s, execute_time_s, first_batch_time_s and
+    fetch_time_s (see timed_run). peak_rss_bytes and peak_uss_bytes
+    are the peak memory of the run, memory_timeline its [time_s, rss, uss]
+    samples. cpu_user_s and cpu_system_s are the CPU time of the run,
+    parallel_efficiency the CPU time / (elapsed time * cores) ratio and
+    cpu_timeline the [time_s, [utilization % of each core]] samples.
+    read_bytes, write_bytes, read_syscalls, page_cache_read_bytes,
+    spill_bytes (growth of tmp_dir_path) and scan_throughput_gbs are the disk
+    I/O of the run (see monitoring.ResourceSampler.io_metrics). A query that
+    fails is not repeated. The records already in the result store with
+    resume are not returned.
+    See misc.summarize_timings for the statistics over the repetitions.
+    """
+    assert warmup >= 0
+    assert repetitions >= 1
+    if (cache_mode is not None) and (cache_mode not in CACHE_MODES):
+        raise ValueError(f"Unknown cache mode : {cache_mode}")
+    if isolation not in (None, "session", "query"):
+        raise ValueError(f"Unknown isolation mode : {isolation}")
+    if (isolation is None) and (
+        (timeout_s is not None) or (memory_ceiling is not None)
+    ):
+        raise ValueError("A timeout or a memory ceiling requires an isolation mode")
+    thread_counts = [None] if threads is None else list(threads)
+    memory_budgets = [None] if memory_limits is None else list(memory_limits)
+    for n_threads in thread_counts:
+        if (n_threads is not None) and not (1 <= n_threads <= available_cores()):
+            raise ValueError(
+                f"Invalid thread count : {n_threads}, "
+                + f"{available_cores()} cores available"
+            )
+    options = RunOptions(
+        warmup=warmup,
+        repetitions=repetitions,
+        sample_interval_s=sample_interval_s,
+        cache_mode=cache_mode,
+        param_seed=param_seed,
+        fingerprint=fingerprint,
+        profile=profile_store is not None,
+    )
+    if (param_seed is not None) and any(
+        parse_folder_name(folder_path)[0] != "tpch" for folder_path in subfolders
+    ):
+        raise ValueError("Substitution parameters are only drawn for TPC-H")
     timings = []
-
-    for folder_path in subfolders:
+    recorded_statuses = {}
+    if resume:
+        if result_store is None:
+            raise ValueError("Resuming requires a result store")
+        recorded_statuses = result_store.recorded_statuses()
+
+    engine_version = None
+    if failure_registry is not None:
+        engine_version = adapter.engine_version()
+        logger.info(f"{adapter.engine} version : {engine_version}")
+
+    for n_threads, memory_limit, folder_path in itertools.product(
+        thread_counts, memory_budgets, subfolders
+    ):
+        options = replace(options, threads=n_threads, memory_limit=memory_limit)
         start_time_step = perf_counter()
         folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
+        tpc_name, scale_factor = parse_folder_name(folder_path)
         logger.info("==== BEGIN ====")
         logger.info(
-            f"Datafusion / Lance - folder : {folder_name}, scale_factor : {scale_factor}"
+            f"{adapter.engine} / .{adapter.file_type} - folder : {folder_name}, "
+            + f"scale_factor : {scale_factor}"
         )
-        queries = get_queries(queries_datafusion, scale_factor)
-        query_count = len(queries)
-
-        lance_file_paths = glob.glob(os.path.join(folder_path, "*.lance"))
-        lance_file_count = len(lance_file_paths)
-        logger.info(f"Found {lance_file_count} Lance files")
-
-        if len(lance_file_count) == 0:
-            logger.warning(f"No Lance files found in {folder_path}, skipping...")
+        if n_threads is not None:
+            logger.info(f"threads : {n_threads}")
+        if memory_limit is not None:
+            logger.info(f"memory limit : {memory_limit / 1e9:.3f} GB")
+        query_count = len(adapter.get_queries(queries, scale_factor))
+        query_numbers = []
+        first_repetitions = {}
+        for query_number in range(1, query_count + 1):
+            if (query_subset is not None) and (query_number not in query_subset):
+                continue
+            first_repetition = first_unrecorded_repetition(
+                recorded_statuses, adapter, scale_factor, query_number, options
+            )
+            if first_repetition is None:
+                continue
+            query_numbers.append(query_number)
+            if first_repetition > 1:
+                first_repetitions[query_number] = first_repetition
+        if query_subset is not None:
+            query_count = len([n for n in query_subset if 1 <= n <= query_count])
+        if len(query_numbers) < query_count:
+            logger.info(
+                f"{query_count - len(query_numbers)} queries already recorded, "
+                + "skipping..."
+            )
+        if len(query_numbers) == 0:
             continue
 
-        # list tables
-        table_names = []
-        lance_files_dict = {}
-        for lance_file_path in lance_file_paths:
-            file_name = os.path.basename(lance_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            lance_files_dict[table_name] = lance_file_path
-        table_names = list(set(table_names))
-
-        ctx = datafusion.SessionContext()
-
-        logger.info("Register the Lance files")
-        start_time_s = perf_counter()
-        for table_name in table_names:
-            lance_path = lance_files_dict[table_name]
-            # Read Lance dataset
-            dataset = lance.dataset(lance_path)
-            ctx.register_dataset(table_name, dataset)
-            # # Convert to Arrow table
-            # arrow_table = dataset.to_table()
-            # # Register table with DataFusion
-            # df = datafusion.from_arrow_table(arrow_table)
-            # ctx.register_table(table_name, df)
-        elapsed_time_s = perf_counter() - start_time_s
-        logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-        for i, query in enumerate(queries):
-            query_tag = get_query_tag(query)
-            logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-
-            skip = False
-            if (
-                ((tpc_name == "tpch") and (i + 1 == 18) and (scale_factor == 30.0))
-                or ((tpc_name == "tpch") and (i + 1 == 7) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 17) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 18) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 21) and (scale_factor == 100.0))
-            ):
-                skip = True
-
+        skipped = set()
+        query_limits = {}
+        keys = {}
+        for query_number in query_numbers:
+            known_failure = is_known_failure(
+                adapter.known_failures, tpc_name, query_number, scale_factor
+            )
+            if failure_registry is None:
+                if known_failure:
+                    skipped.add(query_number)
+                query_limits[query_number] = (timeout_s, memory_ceiling)
+                continue
+
+            key = registry_key(
+                adapter.engine,
+                adapter.file_type,
+                tpc_name,
+                scale_factor,
+                query_number,
+                adapter.fetch_mode,
+                n_threads,
+                memory_limit,
+                engine_version,
+            )
+            if known_failure:
+                failure_registry.seed(key)
+            run, query_timeout_s, query_memory_ceiling = failure_registry.decide(
+                key, timeout_s, memory_ceiling
+            )
+            if not run:
+                logger.info(f"query {query_number} skipped by the failure registry")
+                skipped.add(query_number)
+            query_limits[query_number] = (query_timeout_s, query_memory_ceiling)
+            keys[query_number] = key
+
+        if isolation is None:
+            records = []
+
+            def emit(event, payload):
+                if event == "record":
+                    records.append(payload)
+                    if result_store is not None:
+                        result_store.append(payload)
+                elif (event == "profile") and (profile_store is not None):
+                    profile_store.append(payload)
+
+            cpus = sorted(os.sched_getaffinity(0))
+            if n_threads is not None:
+                set_process_affinity(options.cpus())
             try:
-                if skip:
-                    d = dict(
-                        [
-                            ("engine", "Datafusion"),
-                            ("file_type", "lance"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", np.NaN),
-                            ("elapsed_time_s", np.NaN),
-                        ]
-                    )
-
-                else:
-                    start_time_s = perf_counter()
-                    df = ctx.sql(query)
-                    result = df.collect()
-
-                    elapsed_time_s = perf_counter() - start_time_s
-                    logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                    n_returned_rows = 0
-                    for _, item in enumerate(result):
-                        n_returned_rows += item.num_rows
-
-                    d = dict(
-                        [
-                            ("engine", "Datafusion"),
-                            ("file_type", "lance"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", n_returned_rows),
-                            ("elapsed_time_s", elapsed_time_s),
-                        ]
-                    )
-            except Exception as e:
-                logger.exception(f"Error executing query {i+1} ", e)
-                # logger.error(f"Error executing query {i+1} : {e}")
-                d = dict(
-                    [
-                        ("engine", "Datafusion"),
-                        ("file_type", "lance"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", np.NaN),
-                        ("elapsed_time_s", np.NaN),
-                    ]
+                run_session(
+                    adapter,
+                    folder_path,
+                    queries,
+                    query_numbers,
+                    skipped,
+                    first_repetitions,
+                    options,
+                    logger,
+                    emit,
                 )
-
-            timings.append(d)
+            finally:
+                set_process_affinity(cpus)
+        else:
+            records = run_isolated_sessions(
+                adapter,
+                folder_path,
+                queries,
+                query_numbers,
+                skipped,
+                first_repetitions,
+                options,
+                logger,
+                isolation,
+                query_limits,
+                result_store,
+                profile_store,
+            )
+        timings.extend(records)
+
+        if failure_registry is not None:
+            for query_number, key in keys.items():
+                if query_number not in skipped:
+                    failure_registry.record(
+                        key,
+                        query_status(records, query_number),
+                        *query_limits[query_number],
+                    )
 
         logger.info("====  END  ====")
         elapsed_time_step = perf_counter() - start_time_step
@@ -938,317 +851,82 @@ def run_queries_datafusion_on_lance(subfolders, queries_datafusion, logger):
     return timings_df
 
 
-def run_queries_quokka_on_parquet(subfolders, logger):
-    timings = []
-
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"Quokka / .parquet - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_quokka_queries(scale_factor)
-        query_count = len(queries)
-
-        parquet_file_paths = glob.glob(os.path.join(folder_path, "*.parquet"))
-        parquet_file_count = len(parquet_file_paths)
-        logger.info(f"Found {parquet_file_count} Parquet files")
-
-        # list tables
-        table_names = []
-        parquet_files_dict = {}
-        for parquet_file_path in parquet_file_paths:
-            file_name = os.path.basename(parquet_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            if table_name in parquet_files_dict:
-                parquet_files_dict[table_name].append(parquet_file_path)
-            else:
-                parquet_files_dict[table_name] = [parquet_file_path]
-        table_names = list(set(table_names))
-
-        cluster = pyquokka.utils.LocalCluster()
-        # get num cpus
-        num_cpus = psutil.cpu_count(logical=False)
-        qc = pyquokka.QuokkaContext(cluster, 2 * num_cpus, 1 * num_cpus)
-        qc.set_config("fault_tolerance", True)
-        # set hbq path to tmp folder in current directory
-        qc.set_config("hbq_path", os.path.join(os.getcwd(), "tmp"))
-        # qc.set_config("blocking", False)
-
-        quokka_tables = {}
-
-        logger.info("Register the Parquet files")
-        start_time_s = perf_counter()
-        for table_name in table_names:
-            if len(parquet_files_dict[table_name]) > 1:
-                raise ValueError(
-                    "Cannot handle multiple part Parquet files with Quokka"
-                )
+def run_queries_duckdb_on_duckdb(
+    subfolders, queries_duckdb, logger, tmp_dir_path=None, fetch_mode=None, **kwargs
+):
+    adapter = DuckDBOnDuckDBAdapter(tmp_dir_path=tmp_dir_path, fetch_mode=fetch_mode)
+    return run_queries(adapter, subfolders, queries_duckdb, logger, **kwargs)
 
-            quokka_tables[table_name] = qc.read_parquet(
-                parquet_files_dict[table_name][0]
-            )
-        elapsed_time_s = perf_counter() - start_time_s
-        logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
 
-        for i, query in enumerate(queries):
-            logger.info(f"query {i+1} / {query_count}")
-
-            skip = False
-
-            # only run certain queries
-            # if i + 1 != 1 or tpc_name != "tpch" or scale_factor != 1.0:
-            #     skip = True
-
-            if skip or query is None:
-                d = dict(
-                    [
-                        ("engine", "Quokka"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", np.NaN),
-                        ("elapsed_time_s", np.NaN),
-                    ]
-                )
+def run_queries_duckdb_on_parquet(
+    subfolders, queries_duckdb, logger, tmp_dir_path=None, fetch_mode=None, **kwargs
+):
+    adapter = DuckDBOnParquetAdapter(tmp_dir_path=tmp_dir_path, fetch_mode=fetch_mode)
+    return run_queries(adapter, subfolders, queries_duckdb, logger, **kwargs)
 
-            else:
-                start_time_s = perf_counter()
-                try:
-                    result = query(qc, quokka_tables)
-                    elapsed_time_s = perf_counter() - start_time_s
-                    logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                    n_returned_rows = result.height
-
-                    d = dict(
-                        [
-                            ("engine", "Quokka"),
-                            ("file_type", "parquet"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", n_returned_rows),
-                            ("elapsed_time_s", elapsed_time_s),
-                        ]
-                    )
-                except Exception as e:
-                    d = dict(
-                        [
-                            ("engine", "Quokka"),
-                            ("file_type", "parquet"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", np.NaN),
-                            ("elapsed_time_s", np.NaN),
-                        ]
-                    )
 
-            timings.append(d)
+def run_queries_duckdb_on_lance(
+    subfolders, queries_duckdb, logger, tmp_dir_path=None, fetch_mode=None, **kwargs
+):
+    adapter = DuckDBOnLanceAdapter(tmp_dir_path=tmp_dir_path, fetch_mode=fetch_mode)
+    return run_queries(adapter, subfolders, queries_duckdb, logger, **kwargs)
 
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
 
-    timings_df = pd.DataFrame(timings)
-    return timings_df
+def run_queries_hyper_on_hyper(
+    subfolders, queries_hyper, logger, tmp_dir_path=None, fetch_mode=None, **kwargs
+):
+    adapter = HyperOnHyperAdapter(tmp_dir_path=tmp_dir_path, fetch_mode=fetch_mode)
+    return run_queries(adapter, subfolders, queries_hyper, logger, **kwargs)
 
 
-def run_queries_postgresql(subfolders, queries_postgresql, logger):
-    timings = []
+def run_queries_hyper_on_parquet(
+    subfolders, queries_hyper, logger, tmp_dir_path=None, fetch_mode=None, **kwargs
+):
+    adapter = HyperOnParquetAdapter(tmp_dir_path=tmp_dir_path, fetch_mode=fetch_mode)
+    return run_queries(adapter, subfolders, queries_hyper, logger, **kwargs)
 
-    cwd = os.getcwd()
-    file_path = os.path.join(cwd, "pg_credentials.json")
-    logger.info(f"credentials file path : {file_path}")
 
-    with open(file_path) as json_file:
-        auth = json.load(json_file)
+def run_queries_datafusion_on_parquet(
+    subfolders, queries_datafusion, logger, tmp_dir_path=None, **kwargs
+):
+    adapter = DatafusionOnParquetAdapter(tmp_dir_path=tmp_dir_path)
+    return run_queries(adapter, subfolders, queries_datafusion, logger, **kwargs)
 
-    conn = psycopg2.connect(
-        dbname=auth["database"],
-        user=auth["username"],
-        password=auth["password"],
-        host=auth["server"],
-        port=auth["port"],
-    )
 
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"PostgreSQL - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        queries = get_queries(queries_postgresql, scale_factor)
-        query_count = len(queries)
-
-        use_schema_query = f"SET search_path TO '{folder_name}';"
-        curs = conn.cursor()
-        curs.execute(use_schema_query)
-        conn.commit()
-        curs.close()
-
-        for i, query in enumerate(queries):
-            query_tag = get_query_tag(query)
-            logger.info(f"query {i+1} / {query_count} : tag {query_tag}")
-
-            curs = conn.cursor()
-
-            start_time_s = perf_counter()
-            curs.execute(query)
-            conn.commit()
-            elapsed_time_s = perf_counter() - start_time_s
-            logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-            data = curs.fetchall()
-            n_returned_rows = len(data)
-
-            curs.close()
-
-            d = dict(
-                [
-                    ("engine", "PostgreSQL"),
-                    ("file_type", np.NaN),
-                    ("scale_factor", scale_factor),
-                    ("query", i + 1),
-                    ("n_returned_rows", n_returned_rows),
-                    ("elapsed_time_s", elapsed_time_s),
-                ]
-            )
+def run_queries_ballista_on_parquet(subfolders, queries_datafusion, logger, **kwargs):
+    adapter = BallistaOnParquetAdapter()
+    return run_queries(adapter, subfolders, queries_datafusion, logger, **kwargs)
 
-            timings.append(d)
 
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
+def run_queries_datafusion_ray_on_parquet(
+    subfolders, queries_datafusion, logger, **kwargs
+):
+    adapter = DatafusionRayOnParquetAdapter()
+    return run_queries(adapter, subfolders, queries_datafusion, logger, **kwargs)
 
-    conn.close()
 
-    timings_df = pd.DataFrame(timings)
-    return timings_df
+def run_queries_datafusion_on_lance(
+    subfolders, queries_datafusion, logger, tmp_dir_path=None, **kwargs
+):
+    adapter = DatafusionOnLanceAdapter(tmp_dir_path=tmp_dir_path)
+    return run_queries(adapter, subfolders, queries_datafusion, logger, **kwargs)
 
 
-from polars_queries import PL_QUERIES
+def run_queries_quokka_on_parquet(subfolders, logger, **kwargs):
+    adapter = QuokkaOnParquetAdapter()
+    return run_queries(adapter, subfolders, None, logger, **kwargs)
 
 
-def run_queries_polars_on_parquet(subfolders, queries_polars, logger):
-    timings = []
+def run_queries_postgresql(subfolders, queries_postgresql, logger, **kwargs):
+    adapter = PostgreSQLAdapter()
+    return run_queries(adapter, subfolders, queries_postgresql, logger, **kwargs)
 
-    for folder_path in subfolders:
-        start_time_step = perf_counter()
-        folder_name = os.path.basename(os.path.normpath(folder_path))
-        scale_factor = float(folder_name.split("_")[-1])
-        if folder_name.startswith("tpch"):
-            tpc_name = "tpch"
-        elif folder_name.startswith("tpcds"):
-            tpc_name = "tpcds"
-        logger.info("==== BEGIN ====")
-        logger.info(
-            f"Polars / .parquet - folder : {folder_name}, scale_factor : {scale_factor}"
-        )
-        query_count = len(PL_QUERIES)
-
-        parquet_file_paths = glob.glob(os.path.join(folder_path, "*.parquet"))
-        parquet_file_count = len(parquet_file_paths)
-        logger.info(f"Found {parquet_file_count} Parquet files")
-
-        # list tables
-        table_names = []
-        parquet_files_dict = {}
-        for parquet_file_path in parquet_file_paths:
-            file_name = os.path.basename(parquet_file_path)
-            table_name = os.path.splitext(file_name)[0]
-            if table_name[-3:].isdigit():
-                table_name = table_name[:-4]
-            table_names.append(table_name)
-            if table_name in parquet_files_dict:
-                parquet_files_dict[table_name].append(parquet_file_path)
-            else:
-                parquet_files_dict[table_name] = [parquet_file_path]
-        table_names = list(set(table_names))
-
-        # Load Parquet files into Polars DataFrames
-        dataframes = {}
-        for table_name in table_names:
-            if len(parquet_files_dict[table_name]) > 1:
-                df = pl.concat(
-                    [pl.scan_parquet(file) for file in parquet_files_dict[table_name]]
-                )
-            else:
-                df = pl.scan_parquet(parquet_files_dict[table_name][0])
-            dataframes[table_name] = df
-
-        for i, query in enumerate(PL_QUERIES):
-            logger.info(f"query {i+1} / {query_count} : tag {i}")
-
-            skip = False
-            if (
-                ((tpc_name == "tpch") and (i + 1 == 18) and (scale_factor == 30.0))
-                or ((tpc_name == "tpch") and (i + 1 == 7) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 17) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 18) and (scale_factor == 100.0))
-                or ((tpc_name == "tpch") and (i + 1 == 21) and (scale_factor == 100.0))
-            ):
-                skip = True
-
-            if skip:
-                d = dict(
-                    [
-                        ("engine", "Polars"),
-                        ("file_type", "parquet"),
-                        ("scale_factor", scale_factor),
-                        ("query", i + 1),
-                        ("n_returned_rows", np.NaN),
-                        ("elapsed_time_s", np.NaN),
-                    ]
-                )
-            else:
-                try:
-                    start_time_s = perf_counter()
-                    result = query(dataframes).collect(new_streaming=True)
-                    # result = pl.SQLContext(dataframes).execute(query).collect()
-                    elapsed_time_s = perf_counter() - start_time_s
-                    logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
-
-                    n_returned_rows = len(result)
-
-                    d = dict(
-                        [
-                            ("engine", "Polars"),
-                            ("file_type", "parquet"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", n_returned_rows),
-                            ("elapsed_time_s", elapsed_time_s),
-                        ]
-                    )
-                except Exception as e:
-                    logger.error(f"Error executing query {i+1}: {str(e)}")
-                    d = dict(
-                        [
-                            ("engine", "Polars"),
-                            ("file_type", "parquet"),
-                            ("scale_factor", scale_factor),
-                            ("query", i + 1),
-                            ("n_returned_rows", np.nan),
-                            ("elapsed_time_s", np.nan),
-                        ]
-                    )
 
-            timings.append(d)
+def run_queries_polars_on_parquet(subfolders, queries_polars, logger, **kwargs):
+    adapter = PolarsOnParquetAdapter()
+    return run_queries(adapter, subfolders, queries_polars, logger, **kwargs)
 
-        logger.info("====  END  ====")
-        elapsed_time_step = perf_counter() - start_time_step
-        logger.info(f"Elapsed time (s) : {elapsed_time_step:10.3f}")
 
-    timings_df = pd.DataFrame(timings)
-    return timings_df
+def run_queries_polars_sql_on_parquet(subfolders, queries_sql, logger, **kwargs):
+    adapter = PolarsSQLOnParquetAdapter()
+    return run_queries(adapter, subfolders, queries_sql, logger, **kwargs)
@@ -0,0 +1,349 @@
+"""
+Compare benchmark results against a baseline results directory.
+
+The timings of each (engine, file type, scale factor, query) and run settings
+are aligned between the baseline and each candidate run. The relative change
+of the median elapsed time comes with a bootstrap confidence interval, and a
+change is flagged as a regression (or a speedup) when the whole interval lies
+beyond the threshold. The queries with less than min_samples successful
+repetitions on a side are not flagged. The exit code is 1 if any regression is
+flagged.
+
+Example:
+$ python compare.py -b results/2024-06-01T10:00:00 -c results/2024-07-01T10:00:00
+"""
+
+import json
+import os
+import sys
+from argparse import ArgumentParser
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from misc import SETTING_KEYS, TIMING_KEYS
+
+
+def load_results(output_dir):
+    """
+    Timings of a results directory, from timings.csv, or from timings.jsonl
+    if the run was interrupted before writing the CSV file.
+    """
+    csv_path = os.path.join(output_dir, "timings.csv")
+    jsonl_path = os.path.join(output_dir, "timings.jsonl")
+    if os.path.isfile(csv_path):
+        return pd.read_csv(csv_path)
+    if os.path.isfile(jsonl_path):
+        records = []
+        with open(jsonl_path) as jsonl_file:
+            for line in jsonl_file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass
+        return pd.DataFrame(records)
+    raise FileNotFoundError(f"No timings.csv or timings.jsonl in {output_dir}")
+
+
+def load_versions(output_dir):
+    """Package versions of the run manifest of a results directory, if any."""
+    manifest_path = os.path.join(output_dir, "run_manifest.json")
+    if not os.path.isfile(manifest_path):
+        return {}
+    with open(manifest_path) as json_file:
+        return json.load(json_file).get("versions", {})
+
+
+def bootstrap_ratio(baseline, candidate, n_resamples, confidence, rng):
+    """
+    Ratio of the median elapsed times candidate / baseline, with its bootstrap
+    percentile confidence interval. With a single sample per side the
+    interval reduces to the point estimate, see compare_timings min_samples.
+
+    Parameters
+    ----------
+    baseline, candidate : np.ndarray
+        Elapsed times of the successful repetitions.
+    n_resamples : int
+        Number of bootstrap resamples.
+    confidence : float
+        Confidence level of the interval, e.g. 0.95.
+    rng : np.random.Generator
+
+    Returns
+    -------
+    (ratio, low, high)
+    """
+    ratio = np.median(candidate) / np.median(baseline)
+    baseline_medians = np.median(
+        rng.choice(baseline, size=(n_resamples, len(baseline))), axis=1
+    )
+    candidate_medians = np.median(
+        rng.choice(candidate, size=(n_resamples, len(candidate))), axis=1
+    )
+    ratios = candidate_medians / baseline_medians
+    alpha = 1.0 - confidence
+    low, high = np.quantile(ratios, [alpha / 2, 1.0 - alpha / 2])
+    return ratio, low, high
+
+
+def compare_timings(
+    baseline_df,
+    candidate_df,
+    threshold=0.05,
+    confidence=0.95,
+    n_resamples=2000,
+    seed=0,
+    min_samples=2,
+):
+    """
+    Compare the timings of a candidate run with those of a baseline run.
+
+    Parameters
+    ----------
+    baseline_df, candidate_df : pd.DataFrame
+        Timings with one row per query and repetition. The timings are
+        aligned on the run settings (SETTING_KEYS) present in both.
+    threshold : float
+        Relative change of the median elapsed time below which a change is
+        not flagged, e.g. 0.05 for 5%.
+    confidence : float
+        Confidence level of the bootstrap intervals.
+    n_resamples : int
+        Number of bootstrap resamples.
+    seed : int
+        Seed of the bootstrap resampling.
+    min_samples : int
+        Number of successful repetitions required on each side to compute a
+        confidence interval and flag a change.
+
+    Returns
+    -------
+    pd.DataFrame: one row per (engine, file_type, scale_factor, query) and
+    run settings, with the baseline and candidate medians, the relative
+    change and its confidence interval, and a verdict: "regression",
+    "speedup", "unchanged", "insufficient_samples", "new_failure", "fixed",
+    "failed", "removed" or "added".
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.concat(
+        [baseline_df.assign(side="baseline"), candidate_df.assign(side="candidate")],
+        ignore_index=True,
+    )
+    # a setting recorded by one run only would split every pair of groups
+    keys = TIMING_KEYS + [
+        key for key in SETTING_KEYS if (key in baseline_df) and (key in candidate_df)
+    ]
+
+    rows = []
+    for key_values, group in df.groupby(keys, dropna=False, sort=False):
+        samples = {}
+        for side in ("baseline", "candidate"):
+            runs = group[group["side"] == side]
+            samples[side] = (
+                runs.loc[runs["status"] == "ok", "elapsed_time_s"].to_numpy()
+                if len(runs) > 0
+                else None
+            )
+        baseline, candidate = samples["baseline"], samples["candidate"]
+        row = dict(zip(keys, key_values))
+        row.update(
+            {
+                "baseline_n_samples": 0 if baseline is None else len(baseline),
+                "candidate_n_samples": 0 if candidate is None else len(candidate),
+                "baseline_time_s": np.nan,
+                "candidate_time_s": np.nan,
+                "relative_change": np.nan,
+                "ci_low": np.nan,
+                "ci_high": np.nan,
+            }
+        )
+        if baseline is None:
+            row["verdict"] = "added"
+        elif candidate is None:
+            row["verdict"] = "removed"
+        elif (len(baseline) == 0) and (len(candidate) == 0):
+            row["verdict"] = "failed"
+        elif len(candidate) == 0:
+            row["baseline_time_s"] = np.median(baseline)
+            row["verdict"] = "new_failure"
+        elif len(baseline) == 0:
+            row["candidate_time_s"] = np.median(candidate)
+            row["verdict"] = "fixed"
+        elif min(len(baseline), len(candidate)) < min_samples:
+            row.update(
+                {
+                    "baseline_time_s": np.median(baseline),
+                    "candidate_time_s": np.median(candidate),
+                    "relative_change": np.median(candidate) / np.median(baseline) - 1.0,
+                }
+            )
+            row["verdict"] = "insufficient_samples"
+        else:
+            ratio, low, high = bootstrap_ratio(
+                baseline, candidate, n_resamples, confidence, rng
+            )
+            row.update(
+                {
+                    "baseline_time_s": np.median(baseline),
+                    "candidate_time_s": np.median(candidate),
+                    "relative_change": ratio - 1.0,
+                    "ci_low": low - 1.0,
+                    "ci_high": high - 1.0,
+                }
+            )
+            if low - 1.0 > threshold:
+                row["verdict"] = "regression"
+            elif high - 1.0 < -threshold:
+                row["verdict"] = "speedup"
+            else:
+                row["verdict"] = "unchanged"
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # logger
+    fmt = (
+        "[<g>{time:YYYY-MM-DD HH:mm:ss.SSSZ}</g> :: <c>{level}</c> ::"
+        + " <e>{process.id}</e>] {message}"
+    )
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        level="DEBUG",
+        backtrace=True,
+        diagnose=True,
+        format=fmt,
+        enqueue=True,
+    )
+
+    # argument parser
+    parser = ArgumentParser(
+        description="Command line interface to compare benchmark results"
+    )
+    _ = parser.add_argument(
+        "-b",
+        "--baseline",
+        dest="baseline_dir",
+        help="baseline results directory",
+        metavar="TXT",
+        type=str,
+        required=True,
+    )
+    _ = parser.add_argument(
+        "-c",
+        "--candidates",
+        dest="candidate_dirs",
+        help="results directories compared with the baseline",
+        metavar="TXT",
+        type=str,
+        nargs="+",
+        required=True,
+    )
+    _ = parser.add_argument(
+        "-o",
+        "--output",
+        dest="output_csv",
+        help="CSV file of the comparison, comparison.csv in the last candidate "
+        + "directory by default",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "--threshold",
+        dest="threshold",
+        help="relative change of the median elapsed time flagged as a "
+        + "regression or a speedup, e.g. 0.05 for 5%%",
+        metavar="NUM",
+        type=float,
+        required=False,
+        default=0.05,
+    )
+    _ = parser.add_argument(
+        "--confidence",
+        dest="confidence",
+        help="confidence level of the bootstrap intervals",
+        metavar="NUM",
+        type=float,
+        required=False,
+        default=0.95,
+    )
+    _ = parser.add_argument(
+        "--n_resamples",
+        dest="n_resamples",
+        help="number of bootstrap resamples",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=2000,
+    )
+    _ = parser.add_argument(
+        "--min_samples",
+        dest="min_samples",
+        help="successful repetitions required on each side to flag a change",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=2,
+    )
+    args = parser.parse_args()
+    output_csv = args.output_csv
+    if output_csv is None:
+        output_csv = os.path.join(args.candidate_dirs[-1], "comparison.csv")
+
+    baseline_df = load_results(args.baseline_dir)
+    baseline_versions = load_versions(args.baseline_dir)
+    comparisons = []
+    for candidate_dir in args.candidate_dirs:
+        logger.info(f"baseline : {args.baseline_dir}, candidate : {candidate_dir}")
+        candidate_versions = load_versions(candidate_dir)
+        for package, version in candidate_versions.items():
+            if baseline_versions.get(package, version) != version:
+                logger.info(f"{package} : {baseline_versions[package]} -> {version}")
+        comparison = compare_timings(
+            baseline_df,
+            load_results(candidate_dir),
+            threshold=args.threshold,
+            confidence=args.confidence,
+            n_resamples=args.n_resamples,
+            min_samples=args.min_samples,
+        )
+        comparison.insert(
+            0, "candidate", os.path.basename(os.path.normpath(candidate_dir))
+        )
+        comparisons.append(comparison)
+    comparison = pd.concat(comparisons, ignore_index=True)
+    comparison.to_csv(output_csv, index=False)
+
+    flagged = comparison[comparison["verdict"] != "unchanged"]
+    for row in flagged.itertuples():
+        message = (
+            f"{row.verdict:<12s} {row.candidate} : engine : {row.engine}, "
+            + f"file type : {row.file_type}, scale factor : {row.scale_factor}, "
+            + f"query : {row.query}"
+        )
+        if not np.isnan(row.ci_low):
+            message += (
+                f", {row.baseline_time_s:.3f}s -> {row.candidate_time_s:.3f}s "
+                + f"({row.relative_change:+.1%}, CI [{row.ci_low:+.1%}, "
+                + f"{row.ci_high:+.1%}])"
+            )
+        elif not np.isnan(row.relative_change):
+            message += (
+                f", {row.baseline_time_s:.3f}s -> {row.candidate_time_s:.3f}s "
+                + f"({row.relative_change:+.1%})"
+            )
+        if row.verdict in ("regression", "new_failure"):
+            logger.error(message)
+        else:
+            logger.info(message)
+    counts = comparison["verdict"].value_counts().to_dict()
+    logger.info(f"verdicts : {counts}")
+    logger.info(f"comparison : {output_csv}")
+
+    n_regressions = counts.get("regression", 0) + counts.get("new_failure", 0)
+    sys.exit(1 if n_regressions > 0 else 0)
@@ -0,0 +1,1044 @@
+"""
+Engine / file format adapters driven by bench_tools.run_queries.
+
+An adapter wraps one engine reading one file format and only knows how to
+connect, register the tables, plan a query, execute it, fetch its result and
+close.
+Folder parsing, table discovery, skips, timing and the timing records are
+handled once by the execution core.
+"""
+
+import copy
+import functools
+import io
+import json
+import os
+import shutil
+import tempfile
+
+import datafusion
+import datafusion_ray
+import duckdb
+import lance
+import polars as pl
+import psutil
+import psycopg2
+import psycopg2.sql
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.parquet as pq
+import pyballista
+import pyquokka
+import ray
+import tableauhyperapi
+from datafusion_ray import DatafusionRayContext
+from tableauhyperapi import (
+    Connection,
+    CreateMode,
+    HyperProcess,
+    Telemetry,
+    escape_string_literal,
+)
+
+from misc import find_table_files, get_queries, get_query_tag
+from polars_queries import PL_QUERIES
+from quokka_tools import get_quokka_queries
+
+
+def processes_named(prefix):
+    """The running processes whose name starts with prefix."""
+    return [
+        process
+        for process in psutil.process_iter(["name"])
+        if (process.info["name"] or "").startswith(prefix)
+    ]
+
+
+class EngineAdapter:
+    """
+    Base class of the engine adapters.
+
+    Class attributes
+    ----------------
+    engine : str
+        Engine name, as written in the timings.
+    file_type : str
+        File format read by the engine, as written in the timings.
+    file_extension : str or None
+        Extension of the table files registered with the engine. None if the
+        engine reads its own database file (or a server) instead.
+    reconnect_per_query : bool
+        Open a new connection for each query instead of one per folder.
+    known_failures : tuple
+        (benchmark, query, min_scale_factor, max_scale_factor) entries of
+        queries known to fail (e.g. OOM), which are skipped. A None bound is
+        open.
+    fetch_modes : tuple
+        Result fetch strategies supported by the adapter, the first one being
+        the default. Empty if the adapter has a single strategy.
+    fingerprint_fetch_modes : tuple
+        Fetch modes in which fetch can compute the result fingerprint, None
+        standing for the single strategy.
+    profile_format : str or None
+        Format of the native query profiles returned by profile, parsed by
+        profiles.py. None if the adapter has no profile.
+    server_engine : bool
+        Whether the queries run in engine server processes, the results being
+        read from sockets, which the page cache reads of
+        monitoring.ResourceSampler.io_metrics cannot tell apart.
+
+    Parameters
+    ----------
+    tmp_dir_path : str, optional
+        Spill directory of the engine.
+    fetch_mode : str, optional
+        One of fetch_modes, written in the timings.
+    """
+
+    engine = None
+    file_type = None
+    file_extension = None
+    reconnect_per_query = False
+    known_failures = ()
+    fetch_modes = ()
+    fingerprint_fetch_modes = (None,)
+    profile_format = None
+    server_engine = False
+
+    def __init__(self, tmp_dir_path=None, fetch_mode=None):
+        self.tmp_dir_path = tmp_dir_path
+        self.memory_limit = None
+        if (fetch_mode is None) and (len(self.fetch_modes) > 0):
+            fetch_mode = self.fetch_modes[0]
+        if fetch_mode not in self.fetch_modes + (None,):
+            raise ValueError(f"Unknown {self.engine} fetch mode : {fetch_mode}")
+        self.fetch_mode = fetch_mode
+
+    def engine_version(self):
+        return None
+
+    def get_queries(self, queries, scale_factor, params=None):
+        """
+        The queries to run, with the TPC-H substitution parameters params
+        (query number -> parameters, see tpch_params.py), the validation
+        parameters by default.
+        """
+        return get_queries(queries, scale_factor, params)
+
+    def query_tag(self, i, query):
+        return get_query_tag(query)
+
+    def connect(self, folder_path):
+        raise NotImplementedError
+
+    def register_tables(self, table_files):
+        """table_files : dict mapping the table names to lists of file paths."""
+        pass
+
+    def dataset_paths(self, folder_path):
+        """
+        Paths of the files (or directories, e.g. the Lance datasets) of a data
+        folder read by the engine, evicted from or read into the page cache by
+        the cache modes. By default the table files with file_extension.
+        """
+        if self.file_extension is None:
+            return []
+        table_files = find_table_files(folder_path, self.file_extension)
+        return [path for file_paths in table_files.values() for path in file_paths]
+
+    def plan(self, query):
+        """
+        Parse and plan a query as far as the engine API allows it without
+        executing it. The returned plan is passed to execute.
+        """
+        return query
+
+    def set_threads(self, threads):
+        """
+        Limit the number of threads of the engine, called after connect. By
+        default the engine is only limited by the cores the process is pinned
+        to.
+        """
+        pass
+
+    def set_memory_limit(self, memory_limit):
+        """
+        Set the memory budget of the engine in bytes, beyond which it spills
+        to tmp_dir_path or fails. Called before connect, which applies it, as
+        some engines only take it at startup.
+        """
+        self.memory_limit = memory_limit
+
+    def execute(self, plan):
+        """Start the execution of a planned query and return its result."""
+        raise NotImplementedError
+
+    def failure_status(self, exception):
+        """Status recorded for a query, or a connection, raising exception."""
+        if isinstance(exception, MemoryError):
+            return "oom"
+        return "error"
+
+    def fetch(self, result, fingerprint=None):
+        """
+        Consume the result returned by execute, yielding the row count of each
+        batch of rows as soon as it is available.
+
+        Parameters
+        ----------
+        fingerprint : result_check.ResultFingerprint, optional
+            Fingerprint updated with the Arrow record batches of the result,
+            see can_fingerprint.
+        """
+        raise NotImplementedError
+
+    def can_fingerprint(self):
+        """Whether fetch computes the result fingerprint in the fetch mode."""
+        return self.fetch_mode in self.fingerprint_fetch_modes
+
+    def profile(self, query):
+        """
+        Run a query with the profiling of the engine enabled, after connect,
+        the result being discarded.
+
+        Returns
+        -------
+        str: the raw profile, in the profile_format of the adapter.
+        """
+        raise NotImplementedError(f"{self.engine} has no query profile")
+
+    def close(self):
+        pass
+
+    def open_stream(self, stream):
+        """
+        Adapter running queries concurrently with the other streams, on its
+        own connection (or cursor) to the engine of this connected adapter,
+        e.g. for the throughput test. Closed with close_stream, before close.
+        """
+        raise NotImplementedError(f"{self.engine} has no concurrent streams")
+
+    def close_stream(self):
+        pass
+
+    def copy_dataset(self, folder_path, copy_folder_path):
+        """
+        Copy the data read by the engine from a data folder to another
+        (existing) folder, which is then modified by insert_rows and
+        delete_rows, e.g. for the TPC-H refresh functions.
+        """
+        raise NotImplementedError(
+            f"{self.engine} / .{self.file_type} data cannot be modified"
+        )
+
+    def remove_dataset_copy(self, copy_folder_path):
+        shutil.rmtree(copy_folder_path)
+
+    def insert_rows(self, table_name, file_path):
+        """
+        Insert the rows of a Parquet file into a table, called after connect.
+
+        Returns
+        -------
+        int: the number of inserted rows.
+        """
+        raise NotImplementedError
+
+    def delete_rows(self, table_name, key_column, file_path):
+        """
+        Delete the rows of a table whose key_column value is one of the keys
+        of a single column Parquet file, called after connect.
+
+        Returns
+        -------
+        int: the number of deleted rows.
+        """
+        raise NotImplementedError
+
+    def server_processes(self):
+        """
+        Engine processes which are not descendants of the benchmark process,
+        sampled with it by monitoring.ResourceSampler.
+        """
+        return []
+
+
+class DuckDBAdapter(EngineAdapter):
+    """
+    Fetch modes:
+    - "arrow": stream the result as Arrow record batches, without conversion
+      to Python objects,
+    - "count": only count the rows, with SELECT count(*) FROM (query); the
+      optimizer may skip the computation of unused columns,
+    - "pandas": convert the whole result to a pandas DataFrame.
+    """
+
+    engine = "DuckDB"
+    fetch_modes = ("arrow", "count", "pandas")
+    fingerprint_fetch_modes = ("arrow",)
+    profile_format = "duckdb"
+
+    def engine_version(self):
+        return duckdb.__version__
+
+    def connect(self, folder_path):
+        self.con = duckdb.connect()
+        # _ = self.con.execute("PRAGMA enable_object_cache")
+        self.configure()
+
+    def configure(self):
+        if self.tmp_dir_path is not None:
+            _ = self.con.execute(f"SET temp_directory='{self.tmp_dir_path}'")
+        if self.memory_limit is not None:
+            _ = self.con.execute(f"SET memory_limit='{self.memory_limit}B'")
+
+    def set_threads(self, threads):
+        _ = self.con.execute(f"SET threads = {threads}")
+
+    def plan(self, query):
+        if self.fetch_mode == "count":
+            query = f"SELECT count(*) FROM (\n{query}\n)"
+        # parsing only, the binding and optimization happen in execute
+        (statement,) = self.con.extract_statements(query)
+        return statement
+
+    def execute(self, plan):
+        return self.con.execute(plan)
+
+    def failure_status(self, exception):
+        if isinstance(exception, duckdb.OutOfMemoryException):
+            return "oom"
+        return super().failure_status(exception)
+
+    def fetch(self, result, fingerprint=None):
+        if self.fetch_mode == "count":
+            yield result.fetchone()[0]
+        elif self.fetch_mode == "pandas":
+            yield result.df().shape[0]
+        else:
+            reader = result.to_arrow_reader()
+            if fingerprint is not None:
+                # the columns of a result without batches
+                fingerprint.update(reader.schema.empty_table())
+            for batch in reader:
+                if fingerprint is not None:
+                    fingerprint.update(batch)
+                yield batch.num_rows
+
+    def profile(self, query):
+        # no_output keeps the profile in the connection instead of printing it
+        _ = self.con.execute("SET enable_profiling = 'no_output'")
+        try:
+            _ = self.con.execute(query).to_arrow_table()
+            return self.con.get_profiling_information(format="json")
+        finally:
+            _ = self.con.execute("RESET enable_profiling")
+
+    def close(self):
+        self.con.close()
+
+    def open_stream(self, stream):
+        # the cursors share the database and its settings
+        adapter = copy.copy(self)
+        adapter.con = self.con.cursor()
+        return adapter
+
+    def close_stream(self):
+        self.con.close()
+
+
+class DuckDBOnDuckDBAdapter(DuckDBAdapter):
+    """
+    The connection is re-created for each query: with a single connection,
+    query 18 causes a crash...
+    """
+
+    file_type = "duckdb"
+    reconnect_per_query = True
+    known_failures = (("tpch", 21, 100.0, 100.0),)  # OOM
+
+    def dataset_paths(self, folder_path):
+        return [os.path.join(folder_path, "data.duckdb")]
+
+    def connect(self, folder_path):
+        duckdb_file_path = os.path.join(folder_path, "data.duckdb")
+        self.con = duckdb.connect(database=str(duckdb_file_path), read_only=False)
+        self.configure()
+
+    def copy_dataset(self, folder_path, copy_folder_path):
+        _ = shutil.copy2(os.path.join(folder_path, "data.duckdb"), copy_folder_path)
+
+    def insert_rows(self, table_name, file_path):
+        q = f"INSERT INTO {table_name} SELECT * FROM read_parquet('{file_path}')"
+        return self.con.execute(q).fetchone()[0]
+
+    def delete_rows(self, table_name, key_column, file_path):
+        q = f"""DELETE FROM {table_name} WHERE {key_column} IN
+            (SELECT * FROM read_parquet('{file_path}'))"""
+        return self.con.execute(q).fetchone()[0]
+
+
+class DuckDBOnParquetAdapter(DuckDBAdapter):
+    file_type = "parquet"
+    file_extension = "parquet"
+    known_failures = (("tpch", 21, 100.0, 100.0), ("tpcds", 68, 1.0, None))
+
+    def register_tables(self, table_files):
+        for table_name, file_paths in table_files.items():
+            q = f"""CREATE VIEW IF NOT EXISTS {table_name} AS SELECT *
+                FROM read_parquet({file_paths})"""
+            self.con.execute(q)
+
+
+class DuckDBOnLanceAdapter(DuckDBAdapter):
+    file_type = "lance"
+    file_extension = "lance"
+    known_failures = (("tpch", 21, 100.0, 100.0), ("tpcds", 68, 1.0, None))
+
+    def register_tables(self, table_files):
+        for table_name, file_paths in table_files.items():
+            self.con.register(table_name, lance.dataset(file_paths[0]))
+        self.table_files = table_files
+
+    def copy_dataset(self, folder_path, copy_folder_path):
+        for file_paths in find_table_files(folder_path, "lance").values():
+            for file_path in file_paths:
+                _ = shutil.copytree(
+                    file_path,
+                    os.path.join(copy_folder_path, os.path.basename(file_path)),
+                )
+
+    def insert_rows(self, table_name, file_path):
+        # a new version of the dataset, read by the next connections
+        table = pq.read_table(file_path)
+        _ = lance.write_dataset(table, self.table_files[table_name][0], mode="append")
+        return table.num_rows
+
+    def delete_rows(self, table_name, key_column, file_path):
+        keys = pq.read_table(file_path).column(0).to_pylist()
+        predicate = f"{key_column} IN ({', '.join(str(key) for key in keys)})"
+        n_deleted_rows = 0
+        for dataset_path in self.table_files[table_name]:
+            dataset = lance.dataset(dataset_path)
+            n_deleted_rows += dataset.count_rows(filter=predicate)
+            dataset.delete(predicate)
+        return n_deleted_rows
+
+
+class HyperAdapter(EngineAdapter):
+    """
+    Fetch modes:
+    - "parquet": Hyper exports the result to a Parquet file in tmp_dir_path
+      (the system temporary directory by default) with COPY (query) TO, the
+      row count is read from the file metadata,
+    - "count": only count the rows, with SELECT count(*) FROM (query),
+    - "rows": iterate over the result rows in Python with next_row().
+    """
+
+    engine = "Hyper"
+    server_engine = True
+    parameters = {}
+    fetch_modes = ("parquet", "count", "rows")
+    fingerprint_fetch_modes = ("parquet",)
+    profile_format = "hyper"
+
+    def engine_version(self):
+        return tableauhyperapi.__version__
+
+    def connect(self, folder_path):
+        parameters = dict(self.parameters)
+        if self.memory_limit is not None:
+            parameters["memory_limit"] = f"{self.memory_limit // 2**20}m"
+        self.hyper = HyperProcess(
+            telemetry=Telemetry.DO_NOT_SEND_USAGE_DATA_TO_TABLEAU,
+            parameters=parameters,
+        )
+        self.folder_path = folder_path
+        self.con = Connection(
+            endpoint=self.hyper.endpoint,
+            database=self.database_path(folder_path),
+            create_mode=self.create_mode,
+        )
+        tmp_dir_path = self.tmp_dir_path
+        if tmp_dir_path is None:
+            tmp_dir_path = tempfile.gettempdir()
+        self.result_file_path = os.path.join(
+            tmp_dir_path, f"hyper_result_{os.getpid()}.parquet"
+        )
+
+    def plan(self, query):
+        if self.fetch_mode == "parquet":
+            return (
+                f"COPY (\n{query}\n) TO '{self.result_file_path}' "
+                + "WITH (FORMAT => 'parquet')"
+            )
+        if self.fetch_mode == "count":
+            return f"SELECT count(*) FROM (\n{query}\n) AS result"
+        return query
+
+    def execute(self, plan):
+        if self.fetch_mode == "parquet":
+            return self.con.execute_command(plan)
+        if self.fetch_mode == "count":
+            return self.con.execute_scalar_query(plan)
+        return self.con.execute_query(plan)
+
+    def fetch(self, result, fingerprint=None):
+        if self.fetch_mode == "parquet":
+            yield pq.read_metadata(self.result_file_path).num_rows
+            if fingerprint is not None:
+                with fingerprint.timing():
+                    table = pq.read_table(self.result_file_path)
+                fingerprint.update(table)
+            os.remove(self.result_file_path)
+        elif self.fetch_mode == "count":
+            yield result
+        else:
+            # the rows are streamed one by one, the first one is the first batch
+            with result:
+                if result.next_row():
+                    yield 1
+                n_returned_rows = 0
+                while result.next_row():
+                    n_returned_rows += 1
+                yield n_returned_rows
+
+    def profile(self, query):
+        # the JSON plan is returned as text rows
+        rows = self.con.execute_list_query(f"EXPLAIN ANALYZE\n{query}")
+        return "\n".join(row[0] for row in rows)
+
+    def close(self):
+        self.con.close()
+        self.hyper.close()
+
+    def open_stream(self, stream):
+        # a connection to the same Hyper process and database
+        adapter = copy.copy(self)
+        adapter.con = Connection(
+            endpoint=self.hyper.endpoint,
+            database=self.database_path(self.folder_path),
+            create_mode=CreateMode.NONE,
+        )
+        adapter.result_file_path = os.path.join(
+            os.path.dirname(self.result_file_path),
+            f"hyper_result_{os.getpid()}_{stream}.parquet",
+        )
+        return adapter
+
+    def close_stream(self):
+        self.con.close()
+
+
+class HyperOnHyperAdapter(HyperAdapter):
+    file_type = "hyper"
+    create_mode = CreateMode.NONE
+
+    def database_path(self, folder_path):
+        return os.path.join(folder_path, "data.hyper")
+
+    def dataset_paths(self, folder_path):
+        return [self.database_path(folder_path)]
+
+    def connect(self, folder_path):
+        super().connect(folder_path)
+        _ = self.con.execute_command("SET schema 'Export';")
+
+    def open_stream(self, stream):
+        adapter = super().open_stream(stream)
+        _ = adapter.con.execute_command("SET schema 'Export';")
+        return adapter
+
+    def copy_dataset(self, folder_path, copy_folder_path):
+        _ = shutil.copy2(self.database_path(folder_path), copy_folder_path)
+
+    def insert_rows(self, table_name, file_path):
+        q = f"""INSERT INTO {table_name}
+            (SELECT * FROM external({escape_string_literal(file_path)}))"""
+        return self.con.execute_command(q)
+
+    def delete_rows(self, table_name, key_column, file_path):
+        q = f"""DELETE FROM {table_name} WHERE {key_column} IN
+            (SELECT * FROM external({escape_string_literal(file_path)}))"""
+        return self.con.execute_command(q)
+
+
+class HyperOnParquetAdapter(HyperAdapter):
+    file_type = "parquet"
+    file_extension = "parquet"
+    create_mode = CreateMode.CREATE_AND_REPLACE
+    parameters = {"external_table_sample_size_factor": "0.005"}
+
+    def database_path(self, folder_path):
+        return os.path.join(folder_path, "tmp.hyper")
+
+    def register_tables(self, table_files):
+        for table_name, file_paths in table_files.items():
+            file_array = ["'" + c + "'" for c in file_paths]
+            if len(file_array) == 1:
+                file_array_str = file_array[0]
+            else:
+                file_array_str = ", ".join(file_array)
+                file_array_str = "ARRAY[" + file_array_str + "]"
+
+            q = f"""CREATE TEMPORARY EXTERNAL TABLE IF NOT EXISTS {table_name}
+                FOR {file_array_str} """
+            _ = self.con.execute_command(q)
+        self.table_files = table_files
+
+    def open_stream(self, stream):
+        # the temporary external tables are only visible in their connection
+        adapter = super().open_stream(stream)
+        adapter.register_tables(self.table_files)
+        return adapter
+
+
+class DatafusionAdapter(EngineAdapter):
+    engine = "Datafusion"
+    known_failures = (
+        ("tpch", 18, 30.0, 30.0),
+        ("tpch", 7, 100.0, 100.0),
+        ("tpch", 17, 100.0, 100.0),
+        ("tpch", 18, 100.0, 100.0),
+        ("tpch", 21, 100.0, 100.0),
+    )
+    profile_format = "datafusion"
+
+    def engine_version(self):
+        return datafusion.__version__
+
+    def connect(self, folder_path):
+        # test
+        #
+        # runtime = (
+        #     datafusion.RuntimeConfig().with_disk_manager_os().with_fair_spill_pool(10000000)
+        # )
+        # config = (
+        #     datafusion.SessionConfig()
+        #     .with_create_default_catalog_and_schema(True)  # .with_default_catalog_and_schema("foo", "bar")
+        #     .with_target_partitions(1)
+        #     .with_information_schema(True)
+        #     .with_repartition_joins(False)
+        #     .with_repartition_aggregations(False)
+        #     .with_repartition_windows(False)
+        #     .with_parquet_pruning(False)
+        #     # .set("datafusion.execution.parquet.pushdown_filters", "true")
+        # )
+        # ctx = datafusion.SessionContext(config, runtime)
+
+        # wrong initial version (e.g. config not being passed into the context)
+        if self.memory_limit is None:
+            self.ctx = datafusion.SessionContext()
+        else:
+            # RuntimeConfig was renamed RuntimeEnvBuilder in datafusion 43
+            runtime = getattr(datafusion, "RuntimeEnvBuilder", None)
+            if runtime is None:
+                runtime = datafusion.RuntimeConfig
+            runtime = runtime().with_fair_spill_pool(self.memory_limit)
+            if self.tmp_dir_path is not None:
+                runtime = runtime.with_disk_manager_specified(self.tmp_dir_path)
+            else:
+                runtime = runtime.with_disk_manager_os()
+            self.ctx = datafusion.SessionContext(datafusion.SessionConfig(), runtime)
+        # config = datafusion.Config()
+        # config.set("datafusion.execution.parquet.enable_page_index", "true")
+        # config.set("datafusion.execution.parquet.pushdown_filters", "true")
+        # config.set("datafusion.execution.parquet.reorder_filters", "true")
+
+    def set_threads(self, threads):
+        # same as SessionConfig().with_target_partitions(threads)
+        _ = self.ctx.sql(
+            f"SET datafusion.execution.target_partitions = {threads}"
+        ).collect()
+
+    def plan(self, query):
+        return self.ctx.sql(query)
+
+    def execute(self, plan):
+        return plan.execute_stream()
+
+    def failure_status(self, exception):
+        if "Resources exhausted" in str(exception):
+            return "oom"
+        return super().failure_status(exception)
+
+    def fetch(self, result, fingerprint=None):
+        for batch in result:
+            batch = batch.to_pyarrow()
+            if fingerprint is not None:
+                fingerprint.update(batch)
+            yield batch.num_rows
+
+    def profile(self, query):
+        batches = self.ctx.sql(f"EXPLAIN ANALYZE\n{query}").collect()
+        table = pa.Table.from_batches(batches).to_pydict()
+        plans = dict(zip(table["plan_type"], table["plan"]))
+        return plans["Plan with Metrics"]
+
+    def open_stream(self, stream):
+        # the queries of the streams are planned and run by the same context
+        return copy.copy(self)
+
+
+class DatafusionOnParquetAdapter(DatafusionAdapter):
+    file_type = "parquet"
+    file_extension = "parquet"
+
+    def register_tables(self, table_files):
+        for table_name, file_paths in table_files.items():
+            if len(file_paths) > 1:
+                raise ValueError(
+                    f"Cannot handle multiple part Parquet files with {self.engine}"
+                )
+            self.ctx.register_parquet(table_name, file_paths[0])
+
+
+class DatafusionOnLanceAdapter(DatafusionAdapter):
+    file_type = "lance"
+    file_extension = "lance"
+
+    def register_tables(self, table_files):
+        for table_name, file_paths in table_files.items():
+            dataset = lance.dataset(file_paths[0])
+            self.ctx.register_dataset(table_name, dataset)
+            # # Convert to Arrow table
+            # arrow_table = dataset.to_table()
+            # # Register table with DataFusion
+            # df = datafusion.from_arrow_table(arrow_table)
+            # ctx.register_table(table_name, df)
+
+
+class BallistaOnParquetAdapter(DatafusionOnParquetAdapter):
+    engine = "Ballista"
+    known_failures = ()
+    server_engine = True
+
+    def engine_version(self):
+        return getattr(pyballista, "__version__", None)
+
+    def connect(self, folder_path):
+        self.ctx = pyballista.SessionContext("localhost", 50050)
+        # self.ctx = pyballista.SessionContext()
+
+    def set_threads(self, threads):
+        # the executor slots are set when starting it (--concurrent-tasks)
+        pass
+
+    def execute(self, plan):
+        # the batches are collected from the executors
+        return plan.collect()
+
+    def fetch(self, result, fingerprint=None):
+        for item in result:
+            if fingerprint is not None:
+                fingerprint.update(item)
+            yield item.num_rows
+
+    def server_processes(self):
+        # the scheduler and executor started next to the benchmark
+        return processes_named("ballista")
+
+
+class DatafusionRayOnParquetAdapter(DatafusionOnParquetAdapter):
+    engine = "Datafusion Ray"
+    known_failures = ()
+    server_engine = True
+    profile_format = None
+
+    def engine_version(self):
+        return getattr(datafusion_ray, "__version__", None)
+
+    def connect(self, folder_path):
+        # Start a local cluster
+        if not ray.is_initialized():
+            ray.init(resources={"worker": 1})
+        self.ctx = DatafusionRayContext(2, use_ray_shuffle=True)
+
+    def set_threads(self, threads):
+        # the Ray workers are only limited by the cores they are pinned to
+        pass
+
+    def plan(self, query):
+        # the context plans and executes the query in one call
+        return query
+
+    def execute(self, plan):
+        return self.ctx.sql(plan)
+
+    def fetch(self, result, fingerprint=None):
+        for item in result:
+            if fingerprint is not None:
+                fingerprint.update(item)
+            yield item.num_rows
+
+
+class QuokkaOnParquetAdapter(EngineAdapter):
+    engine = "Quokka"
+    file_type = "parquet"
+    file_extension = "parquet"
+
+    def engine_version(self):
+        return getattr(pyquokka, "__version__", None)
+
+    def get_queries(self, queries, scale_factor, params=None):
+        return get_quokka_queries(scale_factor, params)
+
+    def query_tag(self, i, query):
+        return f"{i + 1:02d}"
+
+    def connect(self, folder_path):
+        cluster = pyquokka.utils.LocalCluster()
+        # get num cpus
+        num_cpus = psutil.cpu_count(logical=False)
+        self.qc = pyquokka.QuokkaContext(cluster, 2 * num_cpus, 1 * num_cpus)
+        self.qc.set_config("fault_tolerance", True)
+        # set hbq path to tmp folder in current directory
+        self.qc.set_config("hbq_path", os.path.join(os.getcwd(), "tmp"))
+        # self.qc.set_config("blocking", False)
+
+    def register_tables(self, table_files):
+        self.tables = {}
+        for table_name, file_paths in table_files.items():
+            if len(file_paths) > 1:
+                raise ValueError(
+                    "Cannot handle multiple part Parquet files with Quokka"
+                )
+            self.tables[table_name] = self.qc.read_parquet(file_paths[0])
+
+    def execute(self, plan):
+        return plan(self.qc, self.tables)
+
+    def fetch(self, result, fingerprint=None):
+        if fingerprint is not None:
+            with fingerprint.timing():
+                table = result.to_arrow()
+            fingerprint.update(table)
+        yield result.height
+
+
+class PolarsOnParquetAdapter(EngineAdapter):
+    """
+    The queries run on the streaming engine, which processes the data in
+    batches; Polars has no memory budget setting.
+    """
+
+    engine = "Polars"
+    file_type = "parquet"
+    file_extension = "parquet"
+    known_failures = DatafusionAdapter.known_failures
+    profile_format = "polars"
+
+    def engine_version(self):
+        return pl.__version__
+
+    def get_queries(self, queries, scale_factor, params=None):
+        if params is None:
+            return PL_QUERIES
+        return [
+            functools.partial(query, p=params[i + 1])
+            for i, query in enumerate(PL_QUERIES)
+        ]
+
+    def query_tag(self, i, query):
+        return f"{i + 1:02d}"
+
+    def connect(self, folder_path):
+        self.dataframes = {}
+
+    def register_tables(self, table_files):
+        for table_name, file_paths in table_files.items():
+            if len(file_paths) > 1:
+                df = pl.concat([pl.scan_parquet(file) for file in file_paths])
+            else:
+                df = pl.scan_parquet(file_paths[0])
+            self.dataframes[table_name] = df
+
+    def plan(self, query):
+        return query(self.dataframes)
+        # return pl.SQLContext(self.dataframes).execute(query)
+
+    def execute(self, plan):
+        return plan.collect(new_streaming=True)
+
+    def fetch(self, result, fingerprint=None):
+        if fingerprint is not None:
+            with fingerprint.timing():
+                table = result.to_arrow()
+            fingerprint.update(table)
+        yield len(result)
+
+    def profile(self, query):
+        # the profiler runs the query on the in-memory engine
+        _, timings = self.plan(query).profile()
+        return timings.write_json()
+
+
+class PolarsSQLOnParquetAdapter(PolarsOnParquetAdapter):
+    """
+    The SQL queries are translated to lazy frames by the Polars SQLContext,
+    e.g. for the TPC-DS queries which have no DataFrame implementation.
+    """
+
+    engine = "Polars SQL"
+
+    def get_queries(self, queries, scale_factor, params=None):
+        return get_queries(queries, scale_factor, params)
+
+    def query_tag(self, i, query):
+        return get_query_tag(query)
+
+    def plan(self, query):
+        return pl.SQLContext(self.dataframes).execute(query)
+
+
+class PostgreSQLAdapter(EngineAdapter):
+    """
+    The data is read from the schema named after the data folder, e.g. tpch_10.
+    """
+
+    engine = "PostgreSQL"
+    profile_format = "postgresql"
+    server_engine = True
+
+    def _connect(self):
+        file_path = os.path.join(os.getcwd(), "pg_credentials.json")
+        with open(file_path) as json_file:
+            auth = json.load(json_file)
+
+        return psycopg2.connect(
+            dbname=auth["database"],
+            user=auth["username"],
+            password=auth["password"],
+            host=auth["server"],
+            port=auth["port"],
+        )
+
+    def engine_version(self):
+        conn = self._connect()
+        curs = conn.cursor()
+        curs.execute("SHOW server_version;")
+        version = curs.fetchone()[0]
+        curs.close()
+        conn.close()
+        return version
+
+    def connect(self, folder_path):
+        self.conn = self._connect()
+        self.folder_path = folder_path
+
+        folder_name = os.path.basename(os.path.normpath(folder_path))
+        curs = self.conn.cursor()
+        curs.execute(f"SET search_path TO '{folder_name}';")
+        self.conn.commit()
+        curs.close()
+
+    def set_threads(self, threads):
+        # the leader process takes part in the parallel plans
+        curs = self.conn.cursor()
+        curs.execute(f"SET max_parallel_workers_per_gather TO {threads - 1};")
+        self.conn.commit()
+        curs.close()
+
+    def execute(self, plan):
+        # the client-side cursor receives the whole result in execute
+        curs = self.conn.cursor()
+        curs.execute(plan)
+        self.conn.commit()
+        return curs
+
+    def fetch(self, result, fingerprint=None):
+        rows = result.fetchall()
+        if fingerprint is not None:
+            with fingerprint.timing():
+                names = [column.name for column in result.description]
+                columns = list(zip(*rows)) if len(rows) > 0 else [[] for _ in names]
+                table = pa.table([pa.array(column) for column in columns], names=names)
+            fingerprint.update(table)
+        result.close()
+        yield len(rows)
+
+    def profile(self, query):
+        curs = self.conn.cursor()
+        curs.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)\n{query}")
+        plan = curs.fetchone()[0]
+        self.conn.commit()
+        curs.close()
+        # psycopg2 decodes the json columns
+        return plan if isinstance(plan, str) else json.dumps(plan)
+
+    def close(self):
+        self.conn.close()
+
+    def open_stream(self, stream):
+        adapter = copy.copy(self)
+        adapter.connect(self.folder_path)
+        return adapter
+
+    def close_stream(self):
+        self.conn.close()
+
+    def copy_dataset(self, folder_path, copy_folder_path):
+        # the copy is the schema named after the copy folder
+        schema = os.path.basename(os.path.normpath(folder_path))
+        copy_schema = os.path.basename(os.path.normpath(copy_folder_path))
+        conn = self._connect()
+        curs = conn.cursor()
+        curs.execute(
+            "SELECT table_name FROM information_schema.tables "
+            + "WHERE table_schema = %s;",
+            (schema,),
+        )
+        table_names = [row[0] for row in curs.fetchall()]
+        # quoted, the folder names of fractional scale factors hold a dot
+        schema = psycopg2.sql.Identifier(schema)
+        copy_schema = psycopg2.sql.Identifier(copy_schema)
+        curs.execute(
+            psycopg2.sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE;").format(copy_schema)
+        )
+        curs.execute(psycopg2.sql.SQL("CREATE SCHEMA {};").format(copy_schema))
+        for table_name in table_names:
+            table_name = psycopg2.sql.Identifier(table_name)
+            curs.execute(
+                psycopg2.sql.SQL("CREATE TABLE {}.{} AS TABLE {}.{};").format(
+                    copy_schema, table_name, schema, table_name
+                )
+            )
+        conn.commit()
+        curs.close()
+        conn.close()
+
+    def remove_dataset_copy(self, copy_folder_path):
+        copy_schema = os.path.basename(os.path.normpath(copy_folder_path))
+        conn = self._connect()
+        curs = conn.cursor()
+        curs.execute(
+            psycopg2.sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE;").format(
+                psycopg2.sql.Identifier(copy_schema)
+            )
+        )
+        conn.commit()
+        curs.close()
+        conn.close()
+        super().remove_dataset_copy(copy_folder_path)
+
+    def insert_rows(self, table_name, file_path):
+        table = pq.read_table(file_path)
+        buffer = io.BytesIO()
+        pyarrow.csv.write_csv(
+            table, buffer, pyarrow.csv.WriteOptions(include_header=False)
+        )
+        _ = buffer.seek(0)
+        curs = self.conn.cursor()
+        curs.copy_expert(f"COPY {table_name} FROM STDIN WITH (FORMAT csv);", buffer)
+        self.conn.commit()
+        curs.close()
+        return table.num_rows
+
+    def delete_rows(self, table_name, key_column, file_path):
+        keys = pq.read_table(file_path).column(0).to_pylist()
+        curs = self.conn.cursor()
+        curs.execute(f"DELETE FROM {table_name} WHERE {key_column} = ANY(%s);", (keys,))
+        n_deleted_rows = curs.rowcount
+        self.conn.commit()
+        curs.close()
+        return n_deleted_rows
@@ -0,0 +1,149 @@
+"""
+Persisted registry of the query failures, used to skip or retry them.
+
+The registry holds the last outcome of each (engine, file_type, benchmark,
+scale_factor, query, fetch_mode, threads, memory_limit, engine_version)
+combination, so that a query failing with a small memory budget or a few
+threads is still run with the others. It is updated after each query on a
+timeout, an OOM or a crash, and on the success of a previously failing query.
+An engine upgrade changes the key, so that the failures of the previous
+version are re-tested. The entries of the registries written before the run
+settings were part of the key load with the engine defaults (None).
+"""
+
+import datetime
+import json
+import os
+
+FAILURE_STATUSES = ("timeout", "oom", "crash")
+
+
+def registry_key(
+    engine,
+    file_type,
+    benchmark,
+    scale_factor,
+    query,
+    fetch_mode,
+    threads,
+    memory_limit,
+    engine_version,
+):
+    # engine_version stays last, see FailureRegistry.seed
+    return (
+        engine,
+        file_type,
+        benchmark,
+        float(scale_factor),
+        int(query),
+        fetch_mode,
+        None if threads is None else int(threads),
+        None if memory_limit is None else int(memory_limit),
+        engine_version,
+    )
+
+
+class FailureRegistry:
+    """
+    Failure registry stored in a JSON file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the JSON file, created on the first update.
+    policy : str
+        "skip" to skip the combinations that failed, "retry" to run them again
+        with their timeout and memory ceiling multiplied by budget_factor for
+        each previous failure.
+    budget_factor : float
+        Budget multiplier of the "retry" policy.
+    max_attempts : int
+        Number of failures after which a combination is skipped with the
+        "retry" policy.
+    """
+
+    fields = (
+        "engine",
+        "file_type",
+        "benchmark",
+        "scale_factor",
+        "query",
+        "fetch_mode",
+        "threads",
+        "memory_limit",
+        "engine_version",
+    )
+
+    def __init__(self, file_path, policy="skip", budget_factor=2.0, max_attempts=3):
+        if policy not in ("skip", "retry"):
+            raise ValueError(f"Unknown failure registry policy : {policy}")
+        self.file_path = file_path
+        self.policy = policy
+        self.budget_factor = budget_factor
+        self.max_attempts = max_attempts
+        self.entries = {}
+        if os.path.isfile(file_path):
+            with open(file_path) as json_file:
+                for entry in json.load(json_file):
+                    key = registry_key(*[entry.get(field) for field in self.fields])
+                    self.entries[key] = entry
+
+    def save(self):
+        tmp_file_path = self.file_path + ".tmp"
+        with open(tmp_file_path, "w") as json_file:
+            json.dump(list(self.entries.values()), json_file, indent=2)
+        os.replace(tmp_file_path, self.file_path)
+
+    def seed(self, key, status="oom"):
+        """
+        Register a failure known from before the registry (the adapters
+        known_failures), unless the combination was already run with any
+        engine version. The known failures are seeded for each run setting.
+        """
+        if not any(k[:-1] == key[:-1] for k in self.entries):
+            self.record(key, status)
+
+    def record(self, key, status, timeout_s=None, memory_ceiling=None):
+        """
+        Record the outcome of a query. Only the failures, and the successes of
+        combinations already in the registry, are stored.
+        """
+        entry = self.entries.get(key)
+        if status in FAILURE_STATUSES:
+            entry = dict(zip(self.fields, key))
+            entry["failures"] = self.entries.get(key, {}).get("failures", 0) + 1
+        elif (status == "ok") and (entry is not None):
+            entry = dict(entry)
+            entry["failures"] = 0
+        else:
+            return
+        entry["status"] = status
+        entry["timeout_s"] = timeout_s
+        entry["memory_ceiling"] = memory_ceiling
+        entry["updated"] = datetime.datetime.now().replace(microsecond=0).isoformat()
+        self.entries[key] = entry
+        self.save()
+
+    def decide(self, key, timeout_s=None, memory_ceiling=None):
+        """
+        Returns
+        -------
+        (run, timeout_s, memory_ceiling): whether to run the query, and the
+        budget to run it with.
+        """
+        entry = self.entries.get(key)
+        if (entry is None) or (entry["status"] not in FAILURE_STATUSES):
+            return True, timeout_s, memory_ceiling
+        if (self.policy == "skip") or (entry["failures"] >= self.max_attempts):
+            return False, timeout_s, memory_ceiling
+
+        factor = self.budget_factor ** entry["failures"]
+        if entry["timeout_s"] is not None:
+            timeout_s = entry["timeout_s"] * self.budget_factor
+        elif timeout_s is not None:
+            timeout_s = timeout_s * factor
+        if entry["memory_ceiling"] is not None:
+            memory_ceiling = int(entry["memory_ceiling"] * self.budget_factor)
+        elif memory_ceiling is not None:
+            memory_ceiling = int(memory_ceiling * factor)
+        return True, timeout_s, memory_ceiling
@@ -8,6 +8,7 @@ Example:
 $ python generate_tpcds_data.py -sf 1 -d /home/francois/Workspace/pydbbench/data
 """
 
+import json
 import os
 import pathlib
 import sys
@@ -18,6 +19,7 @@ import duckdb
 from loguru import logger
 
 from hyper_tools import convert_parquets_to_hyper
+from manifest import DATASET_FILE_NAME
 
 
 def generate_tpcds_data_files(
@@ -110,6 +112,20 @@ def generate_tpcds_data_files(
     # Convert the parquet file to an Hyper file
     convert_parquets_to_hyper(parquet_dir, logger)
 
+    # generation parameters, stored in the run manifests of the benchmarks
+    with open(parquet_dir.joinpath(DATASET_FILE_NAME), "w") as json_file:
+        json.dump(
+            {
+                "benchmark": "tpcds",
+                "scale_factor": scale_factor,
+                "compression": compression,
+                "row_group_size": row_group_size,
+                "duckdb": duckdb.__version__,
+            },
+            json_file,
+            indent=2,
+        )
+
     logger.info("====  END  generate TPC-DS data ====")
     elapsed_time_s = perf_counter() - start_time_s
     logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
@@ -8,6 +8,7 @@ Example:
 $ python generate_tpch_data.py -sf 1 -d /home/francois/Workspace/pydbbench/data
 """
 
+import json
 import os
 import pathlib
 import sys
@@ -19,6 +20,7 @@ from loguru import logger
 
 from hyper_tools import convert_parquets_to_hyper
 from lance_tools import convert_parquets_to_lance
+from manifest import DATASET_FILE_NAME
 
 
 def generate_tpch_data_files(
@@ -132,6 +134,21 @@ def generate_tpch_data_files(
     if lance:
         convert_parquets_to_lance(parquet_dir, logger)
 
+    # generation parameters, stored in the run manifests of the benchmarks
+    with open(parquet_dir.joinpath(DATASET_FILE_NAME), "w") as json_file:
+        json.dump(
+            {
+                "benchmark": "tpch",
+                "scale_factor": scale_factor,
+                "n_steps": n_steps,
+                "compression": compression,
+                "row_group_size": row_group_size,
+                "duckdb": duckdb.__version__,
+            },
+            json_file,
+            indent=2,
+        )
+
     logger.info("====  END  generate TPC-H data ====")
     elapsed_time_s = perf_counter() - start_time_s
     logger.info(f"Elapsed time (s) : {elapsed_time_s:10.3f}")
@@ -0,0 +1,213 @@
+"""
+Supervised worker processes for the benchmark runs.
+
+A worker runs a target function in a spawned process and reports its progress
+through a pipe as (event, payload) tuples. The supervisor enforces a
+wall-clock timeout and a memory ceiling on the query being executed, and turns
+a hang, an OOM-kill or a crash of the worker into a failure event, so that the
+caller can record it and carry on with the next queries.
+"""
+
+import multiprocessing
+import os
+import signal
+import traceback
+from time import perf_counter
+
+import psutil
+
+POLL_INTERVAL_S = 0.1
+
+
+def process_tree(pid):
+    """The process and all its descendants (e.g. hyperd, Ray workers)."""
+    try:
+        process = psutil.Process(pid)
+        return [process] + process.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return []
+
+
+def process_tree_rss(pid):
+    rss = 0
+    for process in process_tree(pid):
+        try:
+            rss += process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return rss
+
+
+def kill_process_tree(pid):
+    processes = process_tree(pid)
+    for process in reversed(processes):
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            pass
+    _ = psutil.wait_procs(processes, timeout=10)
+
+
+def set_process_affinity(cpus, pid=None):
+    """
+    Pin all the threads of a process to the given cores. The threads and
+    processes it starts afterwards inherit the affinity.
+    """
+    pid = os.getpid() if pid is None else pid
+    for tid in os.listdir(f"/proc/{pid}/task"):
+        try:
+            os.sched_setaffinity(int(tid), cpus)
+        except ProcessLookupError:
+            # thread exited
+            pass
+
+
+class PipeLogger:
+    """
+    Logger of the worker process, forwarding the messages to the supervisor.
+
+    The loguru handlers of the benchmark process cannot be shared with a
+    spawned process, so the worker sends ("log", (level, message)) events
+    which the supervisor logs.
+    """
+
+    def __init__(self, emit):
+        self.emit = emit
+
+    def log(self, level, message):
+        self.emit("log", (level, message))
+
+    def debug(self, message):
+        self.log("DEBUG", message)
+
+    def info(self, message):
+        self.log("INFO", message)
+
+    def warning(self, message):
+        self.log("WARNING", message)
+
+    def error(self, message):
+        self.log("ERROR", message)
+
+    def exception(self, message):
+        self.log("ERROR", message + "\n" + traceback.format_exc())
+
+
+def _worker_main(target, args, conn):
+    def emit(event, payload):
+        conn.send((event, payload))
+
+    try:
+        target(*args, PipeLogger(emit), emit)
+    finally:
+        conn.close()
+
+
+def supervise(target, args, logger, query_limits, env=None, cpus=None):
+    """
+    Run target(*args, logger, emit) in a spawned worker process and yield its
+    events.
+
+    The target reports ("start", query_number) before running a query,
+    ("end", query_number) after it, and sends at least one event per run of
+    the query. The timeout applies to each run of the query in progress, the
+    memory ceiling to the RSS of the worker and all its descendants while a
+    query is in progress.
+
+    Parameters
+    ----------
+    target : callable
+        A module level function, called as target(*args, logger, emit) where
+        logger forwards the worker log messages to the supervisor logger.
+    args : tuple
+        Picklable arguments of the target.
+    logger : loguru.logger
+    query_limits : dict
+        query number -> (timeout_s, memory_ceiling) where timeout_s is the
+        wall-clock limit of a run of the query in seconds, and memory_ceiling
+        the RSS limit of the worker process tree in bytes. None values disable
+        the limits.
+    env : dict, optional
+        Environment variables of the worker process.
+    cpus : list, optional
+        Cores the worker process is pinned to.
+
+    Yields
+    ------
+    (event, payload) tuples sent by the worker. If the worker is killed or dies
+    while running a query, a last ("failure", dict) event is yielded with the
+    query number, the status ("timeout", "oom" or "crash"), the elapsed time
+    of the interrupted run and the peak RSS observed.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_worker_main, args=(target, args, child_conn))
+    environ = dict(os.environ)
+    os.environ.update(env or {})
+    try:
+        process.start()
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+    if cpus is not None:
+        set_process_affinity(cpus, process.pid)
+    child_conn.close()
+
+    current_query = None
+    timeout_s, memory_ceiling = None, None
+    run_start_s = None
+    peak_rss = 0
+    status = None
+    while True:
+        if parent_conn.poll(POLL_INTERVAL_S):
+            try:
+                event, payload = parent_conn.recv()
+            except EOFError:
+                break
+            if event == "log":
+                logger.log(*payload)
+                continue
+            if event == "start":
+                current_query = payload
+                timeout_s, memory_ceiling = query_limits.get(payload, (None, None))
+                peak_rss = 0
+            elif event == "end":
+                current_query = None
+            run_start_s = perf_counter()
+            yield event, payload
+            continue
+
+        if not process.is_alive():
+            break
+        if current_query is None:
+            continue
+
+        peak_rss = max(peak_rss, process_tree_rss(process.pid))
+        if (timeout_s is not None) and (perf_counter() - run_start_s > timeout_s):
+            logger.error(f"query {current_query} timed out after {timeout_s} s")
+            status = "timeout"
+        elif (memory_ceiling is not None) and (peak_rss > memory_ceiling):
+            logger.error(
+                f"query {current_query} exceeded the memory ceiling : "
+                + f"{peak_rss / 1e9:.3f} GB"
+            )
+            status = "oom"
+        if status is not None:
+            kill_process_tree(process.pid)
+            break
+
+    elapsed_time_s = perf_counter() - run_start_s if run_start_s is not None else None
+    process.join()
+    parent_conn.close()
+
+    if (status is None) and (process.exitcode != 0):
+        # the kernel OOM killer sends SIGKILL
+        status = "oom" if process.exitcode == -signal.SIGKILL else "crash"
+        logger.error(f"worker died with exit code {process.exitcode} : {status}")
+    if status is not None:
+        yield "failure", {
+            "query": current_query,
+            "status": status,
+            "elapsed_time_s": elapsed_time_s,
+            "peak_rss_bytes": peak_rss,
+        }
@@ -0,0 +1,257 @@
+"""
+Open-loop load test: queries arriving at a given rate, served by a pool of
+concurrent clients.
+
+The arrivals follow a Poisson process of rate lambda (queries per second),
+each arrival drawing a query uniformly at random. They are queued whatever
+the state of the clients (open loop), and each of the N clients, on its own
+connection to the engine (see EngineAdapter.open_stream), serves the queue in
+arrival order. The latency of a query is its queueing delay, from its arrival
+to its start, plus its service time. The rate is raised level after level,
+the latency percentiles showing the knee of the latency curve and the
+achieved rate the saturation of the engine.
+"""
+
+import queue
+import threading
+from time import perf_counter, sleep
+
+import numpy as np
+import pandas as pd
+
+from bench_tools import timed_run, timing_record
+from misc import find_table_files, parse_folder_name
+
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def poisson_arrivals(rate_qps, duration_s, rng):
+    """
+    Arrival times, in seconds from the start, of a Poisson process of rate
+    rate_qps over duration_s: the inter-arrival times are exponential.
+    """
+    # enough draws to exceed the duration with a very high probability
+    n_draws = int(rate_qps * duration_s + 10 * np.sqrt(rate_qps * duration_s) + 10)
+    arrivals = np.cumsum(rng.exponential(1.0 / rate_qps, n_draws))
+    while arrivals[-1] < duration_s:
+        arrivals = np.concatenate(
+            [
+                arrivals,
+                arrivals[-1] + np.cumsum(rng.exponential(1.0 / rate_qps, n_draws)),
+            ]
+        )
+    return arrivals[arrivals < duration_s]
+
+
+def serve(adapter, query_list, requests, scale_factor, rate_qps, client, logger):
+    """
+    Serve the queued requests until the None sentinel.
+
+    Returns
+    -------
+    list: the timing records, with the arrival, start and end times of each
+    query, its queueing delay, service time (elapsed_time_s) and latency.
+    """
+    records = []
+    while (request := requests.get()) is not None:
+        arrival_s, query_number, start_s = request
+        query_start_s = perf_counter()
+        try:
+            phases = timed_run(adapter, query_list[query_number - 1])
+            status = "ok"
+        except Exception as e:
+            logger.error(f"client {client}, query {query_number} : {e}")
+            phases = {}
+            status = adapter.failure_status(e)
+        query_end_s = perf_counter()
+        records.append(
+            timing_record(
+                adapter,
+                scale_factor,
+                query_number,
+                status,
+                rate_qps=rate_qps,
+                client=client,
+                arrival_time_s=arrival_s,
+                start_time_s=query_start_s - start_s,
+                end_time_s=query_end_s - start_s,
+                queue_delay_s=query_start_s - start_s - arrival_s,
+                latency_s=query_end_s - start_s - arrival_s,
+                **phases,
+            )
+        )
+    return records
+
+
+def run_load_level(
+    clients, query_list, query_numbers, rate_qps, duration_s, scale_factor, rng, logger
+):
+    """
+    Run one load level: Poisson arrivals of rate rate_qps during duration_s,
+    served by the clients. The queries still queued at the end of the
+    arrivals are served before returning.
+
+    Returns
+    -------
+    list: the timing records of the level, see serve.
+    """
+    arrivals = poisson_arrivals(rate_qps, duration_s, rng)
+    numbers = rng.choice(query_numbers, size=len(arrivals))
+    requests = queue.Queue()
+    client_records = [[] for _ in clients]
+
+    def run(i):
+        client_records[i] = serve(
+            clients[i], query_list, requests, scale_factor, rate_qps, i + 1, logger
+        )
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(clients))]
+    for thread in threads:
+        thread.start()
+    start_s = perf_counter()
+    for arrival_s, query_number in zip(arrivals, numbers):
+        delay_s = arrival_s - (perf_counter() - start_s)
+        if delay_s > 0:
+            sleep(delay_s)
+        requests.put((float(arrival_s), int(query_number), start_s))
+    for _ in clients:
+        requests.put(None)
+    for thread in threads:
+        thread.join()
+    return [record for records in client_records for record in records]
+
+
+def load_metrics(df, rate_qps, duration_s):
+    """
+    Metrics of a load level: the offered and achieved rates (successful
+    queries per second, over the time up to the last completion), the latency
+    and queueing delay percentiles of the successful queries, and the number
+    of failures.
+    """
+    if len(df) == 0:
+        # no arrival, e.g. at a low rate over a short duration
+        df = pd.DataFrame(
+            columns=[
+                "status",
+                "end_time_s",
+                "latency_s",
+                "queue_delay_s",
+                "elapsed_time_s",
+            ],
+            dtype=float,
+        )
+    ok = df[df["status"] == "ok"]
+    metrics = {
+        "rate_qps": rate_qps,
+        "n_queries": len(df),
+        "n_failed": len(df) - len(ok),
+        "offered_qps": len(df) / duration_s,
+        "achieved_qps": np.nan,
+    }
+    if len(ok) > 0:
+        metrics["achieved_qps"] = len(ok) / max(duration_s, df["end_time_s"].max())
+    names = {
+        "latency_s": "latency",
+        "queue_delay_s": "queue_delay",
+        "elapsed_time_s": "service_time",
+    }
+    for column, name in names.items():
+        for percentile in LATENCY_PERCENTILES:
+            metrics[f"{name}_p{percentile}_s"] = (
+                np.percentile(ok[column], percentile) if len(ok) > 0 else np.nan
+            )
+    metrics["queue_delay_mean_s"] = ok["queue_delay_s"].mean()
+    return metrics
+
+
+def run_load_test(
+    adapter,
+    folder_path,
+    queries,
+    n_clients,
+    rates_qps,
+    duration_s,
+    logger,
+    query_subset=None,
+    seed=0,
+    saturation=0.5,
+):
+    """
+    Run the load levels, by increasing rate, on a data folder.
+
+    Parameters
+    ----------
+    adapter : engine_adapters.EngineAdapter
+        An adapter implementing open_stream.
+    folder_path : str
+        Data folder path, e.g. ".../tpch_10".
+    queries : str
+        The queries text.
+    n_clients : int
+        Number of concurrent clients, each one on its own connection.
+    rates_qps : list
+        Arrival rates of the load levels, in queries per second.
+    duration_s : float
+        Arrival duration of each load level.
+    logger : loguru.logger
+    query_subset : list, optional
+        Query numbers of the mix, all the queries by default.
+    seed : int
+        Seed of the arrival times and of the query draws.
+    saturation : float
+        The levels stop rising once the achieved rate of a level is below
+        this fraction of its offered rate, the queue growing without bound
+        past this point, or once all the queries of a level fail.
+
+    Returns
+    -------
+    (pd.DataFrame, pd.DataFrame): the timing records, and the metrics of each
+    load level, see load_metrics.
+    """
+    _, scale_factor = parse_folder_name(folder_path)
+    adapter.connect(folder_path)
+    if adapter.file_extension is not None:
+        adapter.register_tables(find_table_files(folder_path, adapter.file_extension))
+    query_list = adapter.get_queries(queries, scale_factor)
+    query_numbers = query_subset or list(range(1, len(query_list) + 1))
+    rng = np.random.default_rng(seed)
+    records, metrics = [], []
+    try:
+        clients = [adapter.open_stream(client) for client in range(1, n_clients + 1)]
+        try:
+            for rate_qps in sorted(rates_qps):
+                logger.info(f"load level : {rate_qps} queries/s, {n_clients} clients")
+                level_records = run_load_level(
+                    clients,
+                    query_list,
+                    query_numbers,
+                    rate_qps,
+                    duration_s,
+                    scale_factor,
+                    rng,
+                    logger,
+                )
+                records += level_records
+                level_metrics = load_metrics(
+                    pd.DataFrame(level_records), rate_qps, duration_s
+                )
+                metrics.append(level_metrics)
+                logger.info(
+                    f"achieved : {level_metrics['achieved_qps']:.2f} queries/s, "
+                    + f"latency p50 / p95 / p99 (s) : "
+                    + f"{level_metrics['latency_p50_s']:.3f} / "
+                    + f"{level_metrics['latency_p95_s']:.3f} / "
+                    + f"{level_metrics['latency_p99_s']:.3f}"
+                )
+                # NaN when every query of the level failed
+                if (level_metrics["n_queries"] > 0) and not (
+                    level_metrics["achieved_qps"] >= saturation * rate_qps
+                ):
+                    logger.info("saturated, the higher load levels are skipped")
+                    break
+        finally:
+            for client in clients:
+                client.close_stream()
+    finally:
+        adapter.close()
+    return pd.DataFrame(records), pd.DataFrame(metrics)
@@ -0,0 +1,182 @@
+"""
+TPC-H open-loop load test: Poisson query arrivals at rising rates, served by
+N concurrent clients, on each tpch_* data folder, see load.py.
+
+Example:
+$ python load_bench.py -d /home/francois/Data/dbbenchdata -c 8 -l 0.5 1 2 4 8 -t 60 -e duckdb_on_duckdb postgresql
+"""
+
+import datetime
+import os
+import sys
+from argparse import ArgumentParser
+
+import pandas as pd
+from loguru import logger
+
+from load import run_load_test
+from matrix_bench import ADAPTERS
+from misc import check_n_returned_rows, find_subfolders_with_prefix
+from ref_row_count import tpch_ref_n_rows_returned
+from throughput_bench import STREAM_ENGINES
+from tpch_queries import sql
+
+if __name__ == "__main__":
+    # logger
+    fmt = (
+        "[<g>{time:YYYY-MM-DD HH:mm:ss.SSSZ}</g> :: <c>{level}</c> ::"
+        + " <e>{process.id}</e>] {message}"
+    )
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        level="DEBUG",
+        backtrace=True,
+        diagnose=True,
+        format=fmt,
+        enqueue=True,
+    )
+
+    # argument parser
+    parser = ArgumentParser(description="Command line interface to the load test")
+    _ = parser.add_argument(
+        "-d",
+        "--data_dir",
+        dest="data_dir_path",
+        help="Data dir path",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=os.getcwd(),
+    )
+    _ = parser.add_argument(
+        "-o",
+        "--output",
+        dest="output_dir",
+        help="output directory path",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=os.path.join(
+            os.getcwd(),
+            "results",
+            datetime.datetime.now().replace(microsecond=0).isoformat(),
+        ),
+    )
+    _ = parser.add_argument(
+        "-c",
+        "--clients",
+        dest="n_clients",
+        help="number of concurrent clients",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=4,
+    )
+    _ = parser.add_argument(
+        "-l",
+        "--rates",
+        dest="rates_qps",
+        help="arrival rates of the load levels, in queries per second",
+        metavar="NUM",
+        type=float,
+        nargs="+",
+        required=False,
+        default=[0.5, 1.0, 2.0, 4.0, 8.0],
+    )
+    _ = parser.add_argument(
+        "-t",
+        "--duration",
+        dest="duration_s",
+        help="arrival duration of each load level, in seconds",
+        metavar="NUM",
+        type=float,
+        required=False,
+        default=60.0,
+    )
+    _ = parser.add_argument(
+        "-q",
+        "--queries",
+        dest="query_subset",
+        help="query numbers of the mix, all the queries by default",
+        metavar="INT",
+        type=int,
+        nargs="+",
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "-e",
+        "--engines",
+        dest="engines",
+        help="engines to test",
+        choices=STREAM_ENGINES,
+        nargs="+",
+        required=False,
+        default=["duckdb_on_duckdb", "hyper_on_hyper"],
+    )
+    _ = parser.add_argument(
+        "--seed",
+        dest="seed",
+        help="seed of the arrival times and of the query draws",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=0,
+    )
+    _ = parser.add_argument(
+        "--tmp_dir",
+        dest="tmp_dir_path",
+        help="spill directory of DuckDB, Hyper and Datafusion",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    args = parser.parse_args()
+    assert args.n_clients >= 1
+    assert min(args.rates_qps) > 0
+    data_dir_path = os.path.abspath(args.data_dir_path)
+    logger.info(f"data dir path : {data_dir_path}")
+    logger.info(f"output dir path : {args.output_dir}")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    tpch_subfolders = find_subfolders_with_prefix(data_dir_path, "tpch_")
+    timings, metrics = [], []
+    for engine in args.engines:
+        for folder_path in tpch_subfolders:
+            adapter = ADAPTERS[engine](tmp_dir_path=args.tmp_dir_path)
+            logger.info("==== BEGIN ====")
+            logger.info(
+                f"{adapter.engine} / .{adapter.file_type} - folder : "
+                + f"{os.path.basename(os.path.normpath(folder_path))}"
+            )
+            df, metrics_df = run_load_test(
+                adapter,
+                folder_path,
+                sql,
+                args.n_clients,
+                args.rates_qps,
+                args.duration_s,
+                logger,
+                query_subset=args.query_subset,
+                seed=args.seed,
+            )
+            timings.append(df)
+            metrics.append(
+                metrics_df.assign(
+                    engine=adapter.engine,
+                    file_type=adapter.file_type,
+                    scale_factor=df["scale_factor"].iloc[0],
+                    n_clients=args.n_clients,
+                )
+            )
+            logger.info("====  END  ====")
+
+    df = pd.concat(timings, ignore_index=True)
+    df = check_n_returned_rows(df, tpch_ref_n_rows_returned(tpch_subfolders), logger)
+    df.to_csv(os.path.join(args.output_dir, "load_timings.csv"), index=False)
+    keys = ["engine", "file_type", "scale_factor", "n_clients"]
+    metrics_df = pd.concat(metrics, ignore_index=True)
+    metrics_df = metrics_df[keys + [c for c in metrics_df.columns if c not in keys]]
+    metrics_df.to_csv(os.path.join(args.output_dir, "load_metrics.csv"), index=False)
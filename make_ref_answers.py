@@ -0,0 +1,133 @@
+"""
+Compute the reference answers of the queries with DuckDB and store them in the
+ref_answers subfolder of each data folder, see ref_answers.py. The answers
+are cross-checked against the answers published by the DuckDB extensions and
+the row counts of ref_row_count.py, when available, and a folder with a wrong
+answer is left without answers. The benchmarks compare their results with
+them with --validate.
+
+Example:
+$ python make_ref_answers.py -d /home/francois/Data/dbbenchdata -b tpch
+"""
+
+import os
+import sys
+from argparse import ArgumentParser
+
+import duckdb
+from loguru import logger
+
+from matrix_bench import ADAPTERS, BENCHMARKS
+from misc import find_subfolders_with_prefix, parse_folder_name
+from ref_answers import (
+    compute_answers,
+    cross_check_answers,
+    stored_answer_paths,
+    write_answers,
+)
+
+REFERENCE_ENGINES = ("duckdb_on_duckdb", "duckdb_on_parquet")
+
+if __name__ == "__main__":
+    # logger
+    fmt = (
+        "[<g>{time:YYYY-MM-DD HH:mm:ss.SSSZ}</g> :: <c>{level}</c> ::"
+        + " <e>{process.id}</e>] {message}"
+    )
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        level="DEBUG",
+        backtrace=True,
+        diagnose=True,
+        format=fmt,
+        enqueue=True,
+    )
+
+    # argument parser
+    parser = ArgumentParser(
+        description="Command line interface to the reference answers"
+    )
+    _ = parser.add_argument(
+        "-d",
+        "--data_dir",
+        dest="data_dir_path",
+        help="Data dir path",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=os.getcwd(),
+    )
+    _ = parser.add_argument(
+        "-b",
+        "--benchmark",
+        dest="benchmark",
+        help="benchmark of the data folders",
+        choices=sorted(BENCHMARKS),
+        required=False,
+        default="tpch",
+    )
+    _ = parser.add_argument(
+        "-e",
+        "--engine",
+        dest="engine",
+        help="reference engine",
+        choices=REFERENCE_ENGINES,
+        required=False,
+        default="duckdb_on_duckdb",
+    )
+    _ = parser.add_argument(
+        "--overwrite",
+        dest="overwrite",
+        help="compute again the answers of the folders which already hold some",
+        action="store_true",
+    )
+    _ = parser.add_argument(
+        "--tmp_dir",
+        dest="tmp_dir_path",
+        help="spill directory of DuckDB",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    args = parser.parse_args()
+    data_dir_path = os.path.abspath(args.data_dir_path)
+    logger.info(f"data dir path : {data_dir_path}")
+
+    get_sql, ref_n_rows_returned = BENCHMARKS[args.benchmark]
+    queries = get_sql()
+    # the hand-maintained row counts only
+    n_rows_returned = ref_n_rows_returned()
+    subfolders = find_subfolders_with_prefix(data_dir_path, args.benchmark + "_")
+    for folder_path in subfolders:
+        folder_name = os.path.basename(os.path.normpath(folder_path))
+        tpc_name, scale_factor = parse_folder_name(folder_path)
+        if (len(stored_answer_paths(folder_path)) > 0) and not args.overwrite:
+            logger.info(f"{folder_name} : answers already stored, skipping...")
+            continue
+        logger.info(f"{folder_name} : computing the answers")
+        adapter = ADAPTERS[args.engine](tmp_dir_path=args.tmp_dir_path)
+        answers = compute_answers(adapter, folder_path, queries, logger)
+
+        try:
+            wrong_queries = cross_check_answers(answers, tpc_name, scale_factor, logger)
+        except duckdb.Error as e:
+            logger.warning(f"The answers are not cross-checked : {e}")
+            wrong_queries = []
+        for query_number, table in answers.items():
+            key = (scale_factor, query_number)
+            if (key in n_rows_returned) and (table.num_rows != n_rows_returned[key]):
+                logger.error(
+                    f"query {query_number} : {table.num_rows} rows, should be : "
+                    + f"{n_rows_returned[key]}"
+                )
+                wrong_queries.append(query_number)
+        if len(wrong_queries) > 0:
+            logger.error(
+                f"{folder_name} : wrong answers to the queries "
+                + f"{sorted(set(wrong_queries))}, the answers are not stored"
+            )
+            continue
+        write_answers(folder_path, answers)
+        logger.info(f"{folder_name} : {len(answers)} answers stored")
@@ -0,0 +1,268 @@
+"""
+Run manifest: the hardware, system, engine versions, settings and dataset
+layout of a benchmark run, stored next to its timings.
+
+The config fingerprint hashes the manifest without its date, so that the
+timings of runs on the same machine, software and settings can be told apart
+from the others.
+"""
+
+import datetime
+import glob
+import hashlib
+import importlib.metadata
+import json
+import os
+import platform
+import socket
+import sys
+
+import psutil
+import pyarrow.parquet as pq
+
+from misc import find_table_files
+
+ENGINE_PACKAGES = (
+    "duckdb",
+    "tableauhyperapi",
+    "datafusion",
+    "pyballista",
+    "datafusion-ray",
+    "polars",
+    "pylance",
+    "pyquokka",
+    "ray",
+    "psycopg2",
+    "psycopg2-binary",
+    "pyarrow",
+    "pandas",
+    "numpy",
+)
+DATASET_FILE_NAME = "dataset.json"
+# engine databases generated next to the Parquet files
+DATABASE_FILE_NAMES = ("data.duckdb", "data.hyper")
+
+
+def _read(file_path):
+    try:
+        with open(file_path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_info():
+    model = None
+    cpuinfo = _read("/proc/cpuinfo") or ""
+    for line in cpuinfo.splitlines():
+        if line.startswith("model name"):
+            model = line.split(":", 1)[1].strip()
+            break
+    frequency = psutil.cpu_freq()
+    return {
+        "model": model or platform.processor(),
+        "logical_cores": psutil.cpu_count(logical=True),
+        "physical_cores": psutil.cpu_count(logical=False),
+        "affinity_cores": len(os.sched_getaffinity(0)),
+        "max_frequency_mhz": frequency.max if frequency is not None else None,
+        "governor": _read("/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor"),
+    }
+
+
+def memory_info():
+    return {
+        "total_bytes": psutil.virtual_memory().total,
+        "swap_bytes": psutil.swap_memory().total,
+    }
+
+
+def numa_info():
+    """CPU list and memory of each NUMA node."""
+    nodes = {}
+    for node_path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*")):
+        meminfo = _read(os.path.join(node_path, "meminfo")) or ""
+        memory_kb = None
+        for line in meminfo.splitlines():
+            if "MemTotal" in line:
+                memory_kb = int(line.split()[-2])
+        nodes[os.path.basename(node_path)] = {
+            "cpus": _read(os.path.join(node_path, "cpulist")),
+            "memory_bytes": memory_kb * 1024 if memory_kb is not None else None,
+        }
+    return nodes
+
+
+def disk_info(dir_path):
+    """File system and device of the disk holding a directory."""
+    dir_path = os.path.realpath(dir_path)
+    partition = None
+    for p in psutil.disk_partitions(all=True):
+        if dir_path.startswith(p.mountpoint) and (
+            (partition is None) or (len(p.mountpoint) > len(partition.mountpoint))
+        ):
+            partition = p
+    if partition is None:
+        return {}
+
+    disk_type = None
+    device = os.path.basename(partition.device)
+    block_path = os.path.join("/sys/class/block", device)
+    if os.path.exists(os.path.join(block_path, "partition")):
+        # the queue settings are those of the parent disk
+        block_path = os.path.dirname(os.path.realpath(block_path))
+    rotational = _read(os.path.join(block_path, "queue", "rotational"))
+    if rotational is not None:
+        disk_type = "hdd" if rotational == "1" else "ssd"
+        if device.startswith("nvme"):
+            disk_type = "nvme"
+    return {
+        "device": partition.device,
+        "mountpoint": partition.mountpoint,
+        "fstype": partition.fstype,
+        "type": disk_type,
+        "total_bytes": psutil.disk_usage(partition.mountpoint).total,
+    }
+
+
+def package_versions(packages=ENGINE_PACKAGES):
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            pass
+    return versions
+
+
+def dataset_layout(folder_path):
+    """
+    Layout of a data folder: the generation parameters saved in dataset.json
+    by generate_tpch_data.py, if any, the Parquet layout of each table, and
+    the other dataset files (engine databases and Lance tables). The engine
+    scratch files (e.g. tmp.hyper) and the ref_answers and refresh subfolders
+    are left out, so that they do not change the config fingerprint.
+    """
+    layout = {}
+    dataset_file_path = os.path.join(folder_path, DATASET_FILE_NAME)
+    if os.path.isfile(dataset_file_path):
+        with open(dataset_file_path) as json_file:
+            layout["generation"] = json.load(json_file)
+
+    tables = {}
+    for table_name, file_paths in find_table_files(folder_path, "parquet").items():
+        metadatas = [pq.read_metadata(file_path) for file_path in file_paths]
+        row_group_rows = [
+            metadata.row_group(i).num_rows
+            for metadata in metadatas
+            for i in range(metadata.num_row_groups)
+        ]
+        first = metadatas[0]
+        tables[table_name] = {
+            "n_files": len(file_paths),
+            "n_rows": sum(metadata.num_rows for metadata in metadatas),
+            "n_row_groups": len(row_group_rows),
+            "max_row_group_rows": max(row_group_rows, default=0),
+            "compression": (
+                first.row_group(0).column(0).compression
+                if first.num_row_groups > 0
+                else None
+            ),
+            "created_by": first.created_by,
+            "size_bytes": sum(os.path.getsize(path) for path in file_paths),
+        }
+    layout["parquet"] = tables
+    files = [
+        file_name
+        for file_name in DATABASE_FILE_NAMES
+        if os.path.exists(os.path.join(folder_path, file_name))
+    ]
+    for file_paths in find_table_files(folder_path, "lance").values():
+        files.extend(os.path.basename(file_path) for file_path in file_paths)
+    layout["files"] = sorted(files)
+    return layout
+
+
+def collect_manifest(data_dir_path, subfolders, settings):
+    """
+    Parameters
+    ----------
+    data_dir_path : str
+        Directory holding the data folders.
+    subfolders : list
+        Data folder paths.
+    settings : dict
+        Benchmark settings, e.g. the command line arguments.
+
+    Returns
+    -------
+    dict: the run manifest, with its config_fingerprint.
+    """
+    uname = platform.uname()
+    manifest = {
+        "date": datetime.datetime.now().replace(microsecond=0).isoformat(),
+        "host": {
+            "hostname": socket.gethostname(),
+            "kernel": f"{uname.system} {uname.release} {uname.version}",
+            "machine": uname.machine,
+            "python": sys.version,
+        },
+        "cpu": cpu_info(),
+        "memory": memory_info(),
+        "numa": numa_info(),
+        "disk": disk_info(data_dir_path),
+        "versions": package_versions(),
+        "settings": settings,
+        "datasets": {
+            os.path.basename(os.path.normpath(folder_path)): dataset_layout(folder_path)
+            for folder_path in subfolders
+        },
+    }
+    manifest["config_fingerprint"] = config_fingerprint(manifest)
+    return manifest
+
+
+def config_fingerprint(manifest):
+    """Short hash of the manifest, without its date and fingerprint."""
+    content = {
+        key: value
+        for key, value in manifest.items()
+        if key not in ("date", "config_fingerprint")
+    }
+    text = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()[:12]
+
+
+def write_manifest(manifest, file_path):
+    with open(file_path, "w") as json_file:
+        json.dump(manifest, json_file, indent=2, default=str)
+
+
+def archive_changed_manifest(manifest, file_path, logger):
+    """
+    Before a resumed run writes its manifest, compare its config fingerprint
+    with the one of the manifest at file_path, if any. If the configuration
+    changed, e.g. a new engine version, a warning is logged and the previous
+    manifest is kept as run_manifest_{fingerprint}.json in the same directory.
+
+    Returns
+    -------
+    bool: whether the configuration changed.
+    """
+    if not os.path.isfile(file_path):
+        return False
+    with open(file_path) as json_file:
+        previous_fingerprint = json.load(json_file)["config_fingerprint"]
+    if previous_fingerprint == manifest["config_fingerprint"]:
+        return False
+    logger.warning(
+        "The configuration changed since the resumed run "
+        + f"({previous_fingerprint} -> {manifest['config_fingerprint']}), "
+        + "see the previous manifests in the output directory"
+    )
+    os.rename(
+        file_path,
+        os.path.join(
+            os.path.dirname(file_path), f"run_manifest_{previous_fingerprint}.json"
+        ),
+    )
+    return True
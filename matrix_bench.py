@@ -0,0 +1,521 @@
+"""
+Run a benchmark matrix declared in a TOML spec.
+
+The spec replaces the commented-out run_queries_* calls of tpch_bench.py: each
+[[matrix]] table is expanded into the product of its engines, scale factors,
+cache modes, fetch modes, thread counts and memory limits, each combination
+being a job run on one data folder. The duration of each job is estimated from
+the timings of previous runs before the jobs are executed.
+
+Spec example:
+
+    data_dir = "/home/francois/Workspace/pydbbench/data"
+    output_dir = "results/duckdb_threads"
+    history = ["results/2024-06-01T10:00:00"]
+
+    [defaults]
+    scale_factors = [1, 10]
+    warmup = 1
+    repetitions = 5
+    isolation = "query"
+    timeout_s = 600
+
+    [[matrix]]
+    engines = ["duckdb_on_duckdb", "duckdb_on_parquet"]
+    fetch_modes = ["arrow", "count"]
+    threads = [1, 2, 4, 8]
+
+    [[matrix]]
+    engines = ["polars_on_parquet", "hyper_on_hyper"]
+    queries = [1, 9, 18]
+    cache_modes = ["hot", "cold"]
+
+Example:
+$ python matrix_bench.py -s spec.toml --dry_run
+"""
+
+import datetime
+import itertools
+import os
+import sys
+import tomllib
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from bench_tools import run_queries
+from compare import load_results
+from engine_adapters import (
+    BallistaOnParquetAdapter,
+    DatafusionOnLanceAdapter,
+    DatafusionOnParquetAdapter,
+    DatafusionRayOnParquetAdapter,
+    DuckDBOnDuckDBAdapter,
+    DuckDBOnLanceAdapter,
+    DuckDBOnParquetAdapter,
+    HyperOnHyperAdapter,
+    HyperOnParquetAdapter,
+    PolarsOnParquetAdapter,
+    PolarsSQLOnParquetAdapter,
+    PostgreSQLAdapter,
+    QuokkaOnParquetAdapter,
+)
+from failure_registry import FailureRegistry
+from manifest import archive_changed_manifest, collect_manifest, write_manifest
+from misc import (
+    check_n_returned_rows,
+    find_subfolders_with_prefix,
+    parse_folder_name,
+    summarize_timings,
+    visualize_timings,
+)
+from profiles import operators_dataframe
+from ref_answers import load_ref_fingerprints
+from ref_row_count import tpcds_ref_n_rows_returned, tpch_ref_n_rows_returned
+from result_check import check_result_fingerprints
+from result_store import ResultStore
+from tpcds_queries import get_tpcds_sql
+from tpch_queries import sql
+
+ADAPTERS = {
+    "duckdb_on_duckdb": DuckDBOnDuckDBAdapter,
+    "duckdb_on_parquet": DuckDBOnParquetAdapter,
+    "duckdb_on_lance": DuckDBOnLanceAdapter,
+    "hyper_on_hyper": HyperOnHyperAdapter,
+    "hyper_on_parquet": HyperOnParquetAdapter,
+    "datafusion_on_parquet": DatafusionOnParquetAdapter,
+    "datafusion_on_lance": DatafusionOnLanceAdapter,
+    "ballista_on_parquet": BallistaOnParquetAdapter,
+    "datafusion_ray_on_parquet": DatafusionRayOnParquetAdapter,
+    "quokka_on_parquet": QuokkaOnParquetAdapter,
+    "polars_on_parquet": PolarsOnParquetAdapter,
+    "polars_sql_on_parquet": PolarsSQLOnParquetAdapter,
+    "postgresql": PostgreSQLAdapter,
+}
+# benchmark -> (queries text function, reference row counts function)
+BENCHMARKS = {
+    "tpch": (lambda: sql, tpch_ref_n_rows_returned),
+    "tpcds": (get_tpcds_sql, tpcds_ref_n_rows_returned),
+}
+# list-valued keys, whose product gives the jobs of a matrix table
+MATRIX_KEYS = (
+    "engines",
+    "scale_factors",
+    "cache_modes",
+    "fetch_modes",
+    "threads",
+    "memory_limits_gb",
+)
+JOB_KEYS = (
+    "queries",
+    "warmup",
+    "repetitions",
+    "isolation",
+    "timeout_s",
+    "memory_ceiling_gb",
+    "sample_interval_s",
+    "tmp_dir",
+    "validate",
+    "profile",
+)
+SPEC_KEYS = (
+    "benchmark",
+    "data_dir",
+    "output_dir",
+    "history",
+    "failure_registry",
+    "failure_policy",
+    "defaults",
+    "matrix",
+)
+# spec keys hashed into the config fingerprint, the others (paths of the
+# output directory, history and failure registry) not affecting the timings
+FINGERPRINT_SPEC_KEYS = ("benchmark", "defaults", "matrix")
+
+
+@dataclass(frozen=True)
+class Job:
+    """One run_queries call: an engine adapter and settings on a data folder."""
+
+    engine: str
+    folder_path: str
+    scale_factor: float
+    queries: tuple = None
+    cache_mode: str = None
+    fetch_mode: str = None
+    threads: int = None
+    memory_limit: int = None
+    warmup: int = 0
+    repetitions: int = 1
+    isolation: str = None
+    timeout_s: float = None
+    memory_ceiling: int = None
+    sample_interval_s: float = 0.1
+    tmp_dir_path: str = None
+    validate: bool = False
+    profile: bool = False
+
+    def adapter(self):
+        return ADAPTERS[self.engine](
+            tmp_dir_path=self.tmp_dir_path, fetch_mode=self.fetch_mode
+        )
+
+    def run_kwargs(self):
+        return dict(
+            warmup=self.warmup,
+            repetitions=self.repetitions,
+            isolation=self.isolation,
+            timeout_s=self.timeout_s,
+            memory_ceiling=self.memory_ceiling,
+            sample_interval_s=self.sample_interval_s,
+            cache_mode=self.cache_mode,
+            threads=None if self.threads is None else [self.threads],
+            memory_limits=None if self.memory_limit is None else [self.memory_limit],
+            query_subset=None if self.queries is None else list(self.queries),
+            fingerprint=self.validate,
+        )
+
+    def describe(self):
+        adapter_class = ADAPTERS[self.engine]
+        text = (
+            f"{adapter_class.engine} / .{adapter_class.file_type} - "
+            + f"scale factor : {self.scale_factor}"
+        )
+        for name in ("queries", "cache_mode", "fetch_mode", "threads"):
+            if getattr(self, name) is not None:
+                text += f", {name} : {getattr(self, name)}"
+        if self.memory_limit is not None:
+            text += f", memory limit : {self.memory_limit / 1e9:.3f} GB"
+        return text
+
+
+def load_spec(file_path):
+    with open(file_path, "rb") as toml_file:
+        spec = tomllib.load(toml_file)
+    unknown_keys = set(spec) - set(SPEC_KEYS)
+    if unknown_keys:
+        raise ValueError(f"Unknown spec keys : {sorted(unknown_keys)}")
+    return spec
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def expand_spec(spec, data_dir_path, logger):
+    """
+    Expand the [[matrix]] tables of a spec into the job list.
+
+    The keys of the [defaults] table apply to every matrix table which does
+    not set them. A fetch mode is only applied to the adapters supporting
+    fetch modes, the combinations of an engine with a fetch mode it does not
+    support are skipped, and the duplicate jobs are removed.
+
+    Parameters
+    ----------
+    spec : dict
+        The spec, see load_spec.
+    data_dir_path : str
+        Directory holding the data folders, e.g. tpch_1 and tpch_10.
+    logger : loguru.logger
+
+    Returns
+    -------
+    list: the Job instances, in the order of the spec.
+    """
+    benchmark = spec.get("benchmark", "tpch")
+    if benchmark not in BENCHMARKS:
+        raise ValueError(f"Unknown benchmark : {benchmark}")
+    folders = {}
+    for folder_path in find_subfolders_with_prefix(data_dir_path, benchmark + "_"):
+        folders[parse_folder_name(folder_path)[1]] = folder_path
+
+    jobs = []
+    unsupported = set()
+    for table in spec.get("matrix", []):
+        table = {**spec.get("defaults", {}), **table}
+        unknown_keys = set(table) - set(MATRIX_KEYS + JOB_KEYS)
+        if unknown_keys:
+            raise ValueError(f"Unknown matrix keys : {sorted(unknown_keys)}")
+        if "engines" not in table:
+            raise ValueError("A matrix table requires engines")
+        axes = [
+            _as_list(
+                table.get(key, sorted(folders) if key == "scale_factors" else None)
+            )
+            for key in MATRIX_KEYS
+        ]
+        for (
+            engine,
+            scale_factor,
+            cache_mode,
+            fetch_mode,
+            n_threads,
+            memory_limit_gb,
+        ) in itertools.product(*axes):
+            if engine not in ADAPTERS:
+                raise ValueError(f"Unknown engine : {engine}")
+            scale_factor = float(scale_factor)
+            if scale_factor not in folders:
+                raise ValueError(
+                    f"No {benchmark}_{scale_factor:g} folder in {data_dir_path}"
+                )
+            if len(ADAPTERS[engine].fetch_modes) == 0:
+                fetch_mode = None
+            elif (fetch_mode is not None) and (
+                fetch_mode not in ADAPTERS[engine].fetch_modes
+            ):
+                if (engine, fetch_mode) not in unsupported:
+                    unsupported.add((engine, fetch_mode))
+                    logger.info(
+                        f"{engine} does not support the {fetch_mode} fetch mode, "
+                        + "skipping..."
+                    )
+                continue
+            memory_ceiling_gb = table.get("memory_ceiling_gb")
+            queries = table.get("queries")
+            jobs.append(
+                Job(
+                    engine=engine,
+                    folder_path=folders[scale_factor],
+                    scale_factor=scale_factor,
+                    queries=None if queries is None else tuple(_as_list(queries)),
+                    cache_mode=cache_mode,
+                    fetch_mode=fetch_mode,
+                    threads=n_threads,
+                    memory_limit=(
+                        None
+                        if memory_limit_gb is None
+                        else int(float(memory_limit_gb) * 1e9)
+                    ),
+                    warmup=table.get("warmup", 0),
+                    repetitions=table.get("repetitions", 1),
+                    isolation=table.get("isolation"),
+                    timeout_s=table.get("timeout_s"),
+                    memory_ceiling=(
+                        None
+                        if memory_ceiling_gb is None
+                        else int(memory_ceiling_gb * 1e9)
+                    ),
+                    sample_interval_s=table.get("sample_interval_s", 0.1),
+                    tmp_dir_path=table.get("tmp_dir"),
+                    validate=table.get("validate", False),
+                    profile=table.get("profile", False),
+                )
+            )
+    return list(dict.fromkeys(jobs))
+
+
+def estimate_duration(job, history, query_count):
+    """
+    Estimate the duration of a job from the timings of previous runs.
+
+    The run time of each query is the median of its successful runs with the
+    same engine, file type and settings (the settings missing from the
+    history being ignored), at the same scale factor, or else scaled linearly
+    from the nearest recorded scale factor. A query that timed out counts for
+    the job timeout.
+
+    Parameters
+    ----------
+    job : Job
+    history : pd.DataFrame
+        Timings of previous runs.
+    query_count : int
+        Number of queries of the benchmark.
+
+    Returns
+    -------
+    (duration_s, n_unknown): the estimated duration in seconds of the queries
+    found in the history, and the number of queries not found.
+    """
+    adapter_class = ADAPTERS[job.engine]
+    query_numbers = (
+        range(1, query_count + 1) if job.queries is None else list(job.queries)
+    )
+    if len(history) == 0:
+        return 0.0, len(query_numbers)
+
+    runs = history[history["engine"] == adapter_class.engine]
+    if adapter_class.file_type is None:
+        runs = runs[runs["file_type"].isna()]
+    else:
+        runs = runs[runs["file_type"] == adapter_class.file_type]
+    for column, value in (
+        ("cache_mode", job.cache_mode),
+        ("fetch_mode", job.fetch_mode),
+        ("threads", job.threads),
+        ("memory_limit", job.memory_limit),
+    ):
+        if column in runs:
+            if value is None:
+                runs = runs[runs[column].isna()]
+            else:
+                runs = runs[runs[column] == value]
+
+    duration_s, n_unknown = 0.0, 0
+    n_runs = job.warmup + job.repetitions
+    for query_number in query_numbers:
+        query_runs = runs[runs["query"] == query_number]
+        if (job.timeout_s is not None) and (query_runs["status"] == "timeout").any():
+            duration_s += job.timeout_s
+            continue
+        query_runs = query_runs[query_runs["status"] == "ok"]
+        if len(query_runs) == 0:
+            n_unknown += 1
+            continue
+        scale_factors = query_runs["scale_factor"].astype(float).unique()
+        nearest = scale_factors[np.argmin(np.abs(scale_factors - job.scale_factor))]
+        elapsed_time_s = query_runs.loc[
+            query_runs["scale_factor"] == nearest, "elapsed_time_s"
+        ].median()
+        duration_s += elapsed_time_s * job.scale_factor / nearest * n_runs
+    return duration_s, n_unknown
+
+
+if __name__ == "__main__":
+    # logger
+    fmt = (
+        "[<g>{time:YYYY-MM-DD HH:mm:ss.SSSZ}</g> :: <c>{level}</c> ::"
+        + " <e>{process.id}</e>] {message}"
+    )
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        level="DEBUG",
+        backtrace=True,
+        diagnose=True,
+        format=fmt,
+        enqueue=True,
+    )
+
+    # argument parser
+    parser = ArgumentParser(
+        description="Command line interface to run a benchmark matrix spec"
+    )
+    _ = parser.add_argument(
+        "-s",
+        "--spec",
+        dest="spec_path",
+        help="TOML spec of the benchmark matrix",
+        metavar="TXT",
+        type=str,
+        required=True,
+    )
+    _ = parser.add_argument(
+        "--dry_run",
+        dest="dry_run",
+        help="only list the jobs and their estimated durations",
+        action="store_true",
+    )
+    _ = parser.add_argument(
+        "--resume",
+        dest="resume",
+        help="skip the runs already recorded in the timings.jsonl file of the "
+        + "output directory",
+        action="store_true",
+    )
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec_path)
+    data_dir_path = os.path.abspath(spec.get("data_dir", os.getcwd()))
+    output_dir = spec.get(
+        "output_dir",
+        os.path.join(
+            os.getcwd(),
+            "results",
+            datetime.datetime.now().replace(microsecond=0).isoformat(),
+        ),
+    )
+    jobs = expand_spec(spec, data_dir_path, logger)
+    get_sql, ref_n_rows_returned = BENCHMARKS[spec.get("benchmark", "tpch")]
+    queries = get_sql()
+    logger.info(f"spec : {args.spec_path}, {len(jobs)} jobs")
+
+    history = []
+    for results_dir in spec.get("history", []):
+        history.append(load_results(results_dir))
+    timings_jsonl = os.path.join(output_dir, "timings.jsonl")
+    if os.path.isfile(timings_jsonl):
+        history.append(load_results(output_dir))
+    history = pd.concat(history, ignore_index=True) if history else pd.DataFrame()
+
+    total_duration_s, total_unknown = 0.0, 0
+    for i, job in enumerate(jobs):
+        query_count = len(job.adapter().get_queries(queries, job.scale_factor))
+        duration_s, n_unknown = estimate_duration(job, history, query_count)
+        total_duration_s += duration_s
+        total_unknown += n_unknown
+        logger.info(
+            f"job {i + 1:>3d} : {job.describe()} - estimated duration (s) : "
+            + f"{duration_s:10.1f}"
+            + (f" + {n_unknown} queries without history" if n_unknown > 0 else "")
+        )
+    logger.info(
+        f"Estimated duration (s) : {total_duration_s:10.1f}"
+        + (f" + {total_unknown} queries without history" if total_unknown > 0 else "")
+    )
+    if args.dry_run:
+        sys.exit(0)
+
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"output dir path : {output_dir}")
+    if os.path.isfile(timings_jsonl) and not args.resume:
+        raise ValueError(f"{timings_jsonl} already exists, use --resume to complete it")
+    subfolders = sorted({job.folder_path for job in jobs})
+    manifest = collect_manifest(
+        data_dir_path,
+        subfolders,
+        {key: spec[key] for key in FINGERPRINT_SPEC_KEYS if key in spec},
+    )
+    manifest_path = os.path.join(output_dir, "run_manifest.json")
+    if args.resume:
+        _ = archive_changed_manifest(manifest, manifest_path, logger)
+    write_manifest(manifest, manifest_path)
+    result_store = ResultStore(
+        timings_jsonl,
+        common_fields={"config_fingerprint": manifest["config_fingerprint"]},
+    )
+    profile_store = ResultStore(
+        os.path.join(output_dir, "profiles.jsonl"),
+        common_fields={"config_fingerprint": manifest["config_fingerprint"]},
+    )
+    failure_registry = None
+    if "failure_registry" in spec:
+        failure_registry = FailureRegistry(
+            spec["failure_registry"], policy=spec.get("failure_policy", "skip")
+        )
+    for tmp_dir_path in {job.tmp_dir_path for job in jobs} - {None}:
+        os.makedirs(tmp_dir_path, exist_ok=True)
+
+    start_time_s = perf_counter()
+    for i, job in enumerate(jobs):
+        logger.info(f"job {i + 1} / {len(jobs)} : {job.describe()}")
+        _ = run_queries(
+            job.adapter(),
+            [job.folder_path],
+            queries,
+            logger,
+            failure_registry=failure_registry,
+            result_store=result_store,
+            resume=args.resume,
+            profile_store=profile_store if job.profile else None,
+            **job.run_kwargs(),
+        )
+    logger.info(f"Elapsed time (s) : {perf_counter() - start_time_s:10.3f}")
+
+    df = result_store.dataframe()
+    df = check_n_returned_rows(df, ref_n_rows_returned(subfolders), logger)
+    df = check_result_fingerprints(df, load_ref_fingerprints(subfolders), logger)
+    df.to_csv(os.path.join(output_dir, "timings.csv"), index=False)
+    summary = summarize_timings(df)
+    summary.to_csv(os.path.join(output_dir, "timings_summary.csv"), index=False)
+    if any(job.profile for job in jobs):
+        operators_dataframe(profile_store.load()).to_csv(
+            os.path.join(output_dir, "operators.csv"), index=False
+        )
+    visualize_timings(summary, output_dir)
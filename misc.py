@@ -1,8 +1,12 @@
+import glob
 import os
 import re
 import altair as alt
+import numpy as np
 import pandas as pd
 
+from tpch_params import VALIDATION_PARAMS, substitute_params
+
 # alt.renderers.enable("browser")
 alt.renderers.enable("svg")
 
@@ -24,6 +28,68 @@ def find_subfolders_with_prefix(parent_folder, prefix):
     return matching_subfolders
 
 
+def find_table_files(folder_path, extension):
+    """
+    Find the table files with the given extension in folder_path.
+
+    Multi-part tables (e.g. lineitem_000.parquet, lineitem_001.parquet) are
+    grouped under their table name.
+
+    Returns
+    -------
+    dict: table name -> list of file paths.
+    """
+    table_files = {}
+    for file_path in sorted(glob.glob(os.path.join(folder_path, f"*.{extension}"))):
+        file_name = os.path.basename(file_path)
+        table_name = os.path.splitext(file_name)[0]
+        if table_name[-3:].isdigit():
+            table_name = table_name[:-4]
+        table_files.setdefault(table_name, []).append(file_path)
+    return table_files
+
+
+def parse_folder_name(folder_path):
+    """
+    Get the benchmark name and the scale factor from a data folder path, e.g.
+    /data/tpch_10 -> ("tpch", 10.0)
+    """
+    folder_name = os.path.basename(os.path.normpath(folder_path))
+    scale_factor = float(folder_name.split("_")[-1])
+    if folder_name.startswith("tpcds"):
+        tpc_name = "tpcds"
+    elif folder_name.startswith("tpch"):
+        tpc_name = "tpch"
+    else:
+        tpc_name = None
+    return tpc_name, scale_factor
+
+
+def get_queries(txt, scale_factor, params=None):
+    """
+    Split the queries text into queries, with the TPC-H substitution
+    parameters of the query numbers of their tags (see tpch_params.py).
+
+    Parameters
+    ----------
+    txt : str
+        The queries text, separated by semicolons.
+    scale_factor : float
+    params : dict, optional
+        query number -> substitution parameters, the validation parameters by
+        default.
+    """
+    if params is None:
+        params = VALIDATION_PARAMS
+    queries_txt = txt.replace("__COEF__", str(float(0.0001 / scale_factor)))
+    queries = queries_txt.split(";")
+    queries = [q.strip() for q in queries]
+    queries = [q for q in queries if len(q) > 0]
+    return [
+        substitute_params(q, params.get(int(get_query_tag(q)), {})) for q in queries
+    ]
+
+
 def get_query_tag(query_txt):
     match = re.search("--query(\d+)", query_txt)
     if match:
@@ -33,6 +99,155 @@ def get_query_tag(query_txt):
     return query_tag
 
 
+TIMING_KEYS = ["engine", "file_type", "scale_factor", "query"]
+# run settings distinguishing timings of the same query, when present
+SETTING_KEYS = ["fetch_mode", "cache_mode", "threads", "memory_limit", "param_seed"]
+
+
+def check_n_returned_rows(df, ref_n_rows_returned, logger):
+    """
+    Set the status of the runs returning a row count different from the
+    reference one to "wrong_n_rows".
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Timings with one row per query and repetition.
+    ref_n_rows_returned : dict
+        (scale_factor, query) -> reference row count, see ref_row_count.py.
+        The runs of the scale factors without reference, and the runs with
+        drawn substitution parameters (param_seed), are not checked.
+    logger : loguru.logger
+
+    Returns
+    -------
+    pd.DataFrame: the timings, modified in place.
+    """
+    for row in df.itertuples():
+        key = (float(row.scale_factor), int(row.query))
+        if key not in ref_n_rows_returned:
+            continue
+        if not pd.isna(getattr(row, "param_seed", np.nan)):
+            continue
+        n_returned_rows_ref = ref_n_rows_returned[key]
+        if (not np.isnan(row.n_returned_rows)) and (
+            n_returned_rows_ref != int(row.n_returned_rows)
+        ):
+            logger.error(
+                f"Wrong number of returned rows! engine : {row.engine}, "
+                + f"file type : {row.file_type}, scale factor : {row.scale_factor}, query : {row.query}, "
+                + f"n returned rows : {row.n_returned_rows}, should be : {n_returned_rows_ref}"
+            )
+            df.loc[row.Index, "status"] = "wrong_n_rows"
+    return df
+
+
+def summarize_timings(df):
+    """
+    Aggregate the repetitions of each query into robust statistics.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Timings with one row per query and repetition, as returned by
+        bench_tools.run_queries.
+
+    Returns
+    -------
+    pd.DataFrame: one row per (engine, file_type, scale_factor, query) and run
+    settings (SETTING_KEYS). The status is "ok" if every repetition succeeded,
+    else the first failure status. elapsed_time_s is the median of the
+    successful repetitions, next to their min, mean, 95th percentile, standard
+    deviation and raw samples. The peak memory columns, if any, are the max
+    over the repetitions, the phase, CPU and I/O columns the median over the
+    successful repetitions.
+    """
+
+    def summarize(group):
+        statuses = group["status"].tolist()
+        failures = [status for status in statuses if status != "ok"]
+        samples = group.loc[group["status"] == "ok", "elapsed_time_s"].to_numpy()
+        has_samples = len(samples) > 0
+        peaks = {
+            column: group[column].max()
+            for column in ("peak_rss_bytes", "peak_uss_bytes")
+            if column in group
+        }
+        medians = {
+            column: group.loc[group["status"] == "ok", column].median()
+            for column in (
+                "plan_time_s",
+                "execute_time_s",
+                "first_batch_time_s",
+                "fetch_time_s",
+                "cpu_user_s",
+                "cpu_system_s",
+                "parallel_efficiency",
+                "read_bytes",
+                "page_cache_read_bytes",
+                "spill_bytes",
+                "write_bytes",
+                "scan_throughput_gbs",
+            )
+            if column in group
+        }
+        return pd.Series(
+            {
+                "status": failures[0] if failures else "ok",
+                "n_returned_rows": group["n_returned_rows"].iloc[0],
+                "n_samples": len(samples),
+                "elapsed_time_s": np.median(samples) if has_samples else np.nan,
+                "elapsed_time_min_s": samples.min() if has_samples else np.nan,
+                "elapsed_time_mean_s": samples.mean() if has_samples else np.nan,
+                "elapsed_time_p95_s": (
+                    np.percentile(samples, 95) if has_samples else np.nan
+                ),
+                "elapsed_time_std_s": (
+                    samples.std(ddof=1) if len(samples) > 1 else np.nan
+                ),
+                "elapsed_time_samples_s": samples.tolist(),
+                **peaks,
+                **medians,
+            }
+        )
+
+    keys = TIMING_KEYS + [key for key in SETTING_KEYS if key in df]
+    summary = (
+        df.groupby(keys, dropna=False, sort=False)
+        .apply(summarize, include_groups=False)
+        .reset_index()
+    )
+    return summary
+
+
+def speedup_curves(summary):
+    """
+    Speedup of each query over the thread counts of a threads sweep.
+
+    Parameters
+    ----------
+    summary : pd.DataFrame
+        Output of summarize_timings, with a threads column.
+
+    Returns
+    -------
+    pd.DataFrame: one row per query and thread count, with the speedup
+    relative to the smallest thread count, and the scaling efficiency
+    speedup * min_threads / threads (1 for a linear scaling).
+    """
+    keys = [key for key in TIMING_KEYS + SETTING_KEYS if key in summary]
+    keys.remove("threads")
+    curves = summary.loc[
+        summary["status"] == "ok", keys + ["threads", "elapsed_time_s"]
+    ].sort_values(keys + ["threads"])
+    grouped = curves.groupby(keys, dropna=False, sort=False)
+    base_threads = grouped["threads"].transform("first")
+    base_time_s = grouped["elapsed_time_s"].transform("first")
+    curves["speedup"] = base_time_s / curves["elapsed_time_s"]
+    curves["scaling_efficiency"] = curves["speedup"] * base_threads / curves["threads"]
+    return curves.reset_index(drop=True)
+
+
 def visualize_timings(df, output_dir):
     grouped = df.groupby("scale_factor")
 
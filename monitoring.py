@@ -0,0 +1,324 @@
+"""
+Resource sampling of the benchmark process tree while a query runs.
+
+A sampler thread polls the benchmark process (or the worker process, with
+isolation), its descendants (hyperd, Ray workers, ...) and the engine server
+processes reported by the adapter (e.g. the Ballista executor), and keeps a
+timeline of their memory footprint, their CPU time and disk I/O, and the
+utilization of each core.
+"""
+
+import os
+import threading
+from time import perf_counter
+
+import psutil
+
+from isolation import process_tree
+
+
+def processes_memory(processes):
+    """
+    Returns
+    -------
+    (rss, uss): the summed resident set size and unique set size in bytes.
+    The USS is the memory freed if the processes exit, without the pages
+    shared between them (e.g. the memory mapped files).
+    """
+    rss, uss = 0, 0
+    for process in processes:
+        try:
+            memory = process.memory_full_info()
+            rss += memory.rss
+            uss += memory.uss
+        except psutil.AccessDenied:
+            try:
+                rss += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        except psutil.NoSuchProcess:
+            pass
+    return rss, uss
+
+
+COUNTERS = (
+    "cpu_user_s",
+    "cpu_system_s",
+    "read_syscalls",
+    "write_syscalls",
+    "read_bytes",
+    "write_bytes",
+    "read_chars",
+)
+
+
+def processes_counters(processes):
+    """
+    Cumulative CPU and I/O counters of the processes.
+
+    read_bytes and write_bytes are the bytes fetched from and sent to the
+    storage layer (/proc/<pid>/io), read_chars the bytes returned by the read
+    system calls, whether they hit the page cache or the disk.
+
+    Returns
+    -------
+    dict: (pid, create_time) -> tuple of the COUNTERS values of each process.
+    """
+    counters = {}
+    for process in processes:
+        try:
+            with process.oneshot():
+                cpu_times = process.cpu_times()
+                key = (process.pid, process.create_time())
+            try:
+                io = process.io_counters()
+                io_values = (
+                    io.read_count,
+                    io.write_count,
+                    io.read_bytes,
+                    io.write_bytes,
+                    io.read_chars,
+                )
+            except (psutil.AccessDenied, AttributeError):
+                io_values = (0, 0, 0, 0, 0)
+            counters[key] = (cpu_times.user, cpu_times.system) + io_values
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return counters
+
+
+def directory_size(dir_path):
+    """Total size of the files in a directory tree, in bytes."""
+    size = 0
+    for root, _, file_names in os.walk(dir_path):
+        for file_name in file_names:
+            try:
+                size += os.path.getsize(os.path.join(root, file_name))
+            except OSError:
+                # spill file removed during the walk
+                pass
+    return size
+
+
+def thread_read_chars():
+    """Bytes returned by the read system calls of the calling thread."""
+    try:
+        with open("/proc/thread-self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def available_cores():
+    """Number of cores the benchmark process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return psutil.cpu_count(logical=True)
+
+
+class ResourceSampler:
+    """
+    Background thread sampling the memory, CPU and I/O usage of a process tree.
+
+    The CPU time and I/O of a process are counted from the start of the
+    sampling, or its creation, until its last sample: a child process exiting
+    between two samples loses its last interval. The per-core utilization is
+    system-wide.
+
+    Parameters
+    ----------
+    interval_s : float or None
+        Sampling interval in seconds. None disables the sampling, and
+        metrics() is then empty.
+    pid : int, optional
+        Root of the process tree, the current process by default.
+    external_processes : callable, optional
+        Returns the list of psutil.Process which are not descendants of pid but
+        whose resources are part of the run, e.g. an engine server.
+    spill_dir : str, optional
+        Directory of the engine spill files, whose peak growth is reported as
+        spill_bytes.
+    server_engine : bool
+        Whether the engine runs in server processes fed through sockets (see
+        EngineAdapter.server_engine), whose socket reads count in read_chars.
+
+    Use as a context manager around the measured code; the sampling stops on
+    exit:
+
+        with ResourceSampler(0.05) as sampler:
+            run_query()
+        sampler.peak_rss, sampler.cpu_user_s, sampler.timeline
+    """
+
+    def __init__(
+        self,
+        interval_s,
+        pid=None,
+        external_processes=None,
+        spill_dir=None,
+        server_engine=False,
+    ):
+        self.interval_s = interval_s
+        self.pid = os.getpid() if pid is None else pid
+        self.external_processes = external_processes
+        self.spill_dir = spill_dir
+        self.server_engine = server_engine
+        self.timeline = []
+        self.cpu_timeline = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_s = None
+        self._elapsed_time_s = None
+        self._first_counters = {}
+        self._last_counters = {}
+        self._spill_dir_sizes = []
+        self._sampler_read_chars = 0
+
+    def processes(self):
+        processes = process_tree(self.pid)
+        if self.external_processes is not None:
+            processes += self.external_processes()
+        return processes
+
+    def sample(self, first=False):
+        # the /proc files read by the sampler count in the read_chars of the
+        # benchmark process, when it is sampled
+        start_read_chars = thread_read_chars()
+        processes = self.processes()
+        rss, uss = processes_memory(processes)
+        counters = processes_counters(processes)
+        if first:
+            self._first_counters = counters
+            # the first call of cpu_percent only sets its reference times
+            _ = psutil.cpu_percent(percpu=True)
+        self._last_counters.update(counters)
+        if (self.spill_dir is not None) and os.path.isdir(self.spill_dir):
+            self._spill_dir_sizes.append(directory_size(self.spill_dir))
+        elapsed_time_s = round(perf_counter() - self._start_s, 4)
+        self.timeline.append((elapsed_time_s, rss, uss))
+        if not first:
+            self.cpu_timeline.append((elapsed_time_s, psutil.cpu_percent(percpu=True)))
+        self._sampler_read_chars += thread_read_chars() - start_read_chars
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.sample()
+
+    def start(self):
+        self.timeline = []
+        self.cpu_timeline = []
+        self._last_counters = {}
+        self._spill_dir_sizes = []
+        self._sampler_read_chars = 0
+        if self.interval_s is None:
+            return self
+        self._stop.clear()
+        self._start_s = perf_counter()
+        self.sample(first=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.sample()
+        self._elapsed_time_s = perf_counter() - self._start_s
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def peak_rss(self):
+        return max(rss for _, rss, _ in self.timeline)
+
+    @property
+    def peak_uss(self):
+        return max(uss for _, _, uss in self.timeline)
+
+    def counter(self, name):
+        """Increase of one of the COUNTERS over the sampled process tree."""
+        index = COUNTERS.index(name)
+        return sum(
+            values[index] - self._first_counters.get(key, (0,) * len(COUNTERS))[index]
+            for key, values in self._last_counters.items()
+        )
+
+    @property
+    def cpu_user_s(self):
+        return self.counter("cpu_user_s")
+
+    @property
+    def cpu_system_s(self):
+        return self.counter("cpu_system_s")
+
+    @property
+    def spill_bytes(self):
+        """Peak growth of the spill directory."""
+        if len(self._spill_dir_sizes) == 0:
+            return 0
+        return max(self._spill_dir_sizes) - self._spill_dir_sizes[0]
+
+    @property
+    def parallel_efficiency(self):
+        """CPU time / (wall-clock time * available cores), between 0 and 1."""
+        cpu_time_s = self.cpu_user_s + self.cpu_system_s
+        return cpu_time_s / (self._elapsed_time_s * available_cores())
+
+    def io_metrics(self):
+        """
+        Disk I/O of the run. page_cache_read_bytes estimates the bytes read
+        from the page cache (read_chars - read_bytes), scan_throughput_gbs
+        the bytes read by the engine, from the disk or the page cache, per
+        second of the run.
+
+        read_chars also counts the reads of pipes, sockets and /proc files.
+        The /proc files read by the sampler itself are subtracted when it
+        samples its own process (approximately, for the first and last
+        samples). With a server engine, whose results and worker traffic are
+        read from sockets, page_cache_read_bytes is not reported (None) and
+        scan_throughput_gbs only counts read_bytes.
+        """
+        io = {
+            name: self.counter(name)
+            for name in ("read_bytes", "write_bytes", "read_syscalls")
+        }
+        read_chars = self.counter("read_chars")
+        if self.pid == os.getpid():
+            read_chars = max(read_chars - self._sampler_read_chars, 0)
+        if self.server_engine:
+            io["page_cache_read_bytes"] = None
+            scanned_bytes = io["read_bytes"]
+        else:
+            io["page_cache_read_bytes"] = max(read_chars - io["read_bytes"], 0)
+            scanned_bytes = max(read_chars, io["read_bytes"])
+        io["spill_bytes"] = self.spill_bytes
+        io["scan_throughput_gbs"] = scanned_bytes / self._elapsed_time_s / 1e9
+        return io
+
+    def metrics(self):
+        """Resource usage of the sampled run, as columns of the timing records."""
+        if len(self.timeline) == 0:
+            return {}
+        return {
+            "peak_rss_bytes": self.peak_rss,
+            "peak_uss_bytes": self.peak_uss,
+            "cpu_user_s": self.cpu_user_s,
+            "cpu_system_s": self.cpu_system_s,
+            "parallel_efficiency": self.parallel_efficiency,
+            **self.io_metrics(),
+            "memory_timeline": [list(sample) for sample in self.timeline],
+            "cpu_timeline": [
+                [elapsed_time_s, percents]
+                for elapsed_time_s, percents in self.cpu_timeline
+            ],
+        }
@@ -0,0 +1,77 @@
+"""
+Control of the OS page cache holding the dataset files.
+
+Without it, an engine benefits from the files cached by the engines that ran
+before it. In "cold" mode the dataset files are evicted from the page cache
+before each measured run, in "hot" mode they are read into it before each
+query.
+"""
+
+import os
+
+CACHE_MODES = ("hot", "cold")
+DROP_CACHES_PATH = "/proc/sys/vm/drop_caches"
+READ_BLOCK_SIZE = 1 << 24
+
+
+def dataset_files(adapter, folder_path):
+    """
+    The files of a data folder read by an engine adapter (see
+    EngineAdapter.dataset_paths), the directories such as the Lance datasets
+    being walked. The files of the other formats, the reference answers and
+    the refresh sets are left out.
+    """
+    file_paths = []
+    for path in adapter.dataset_paths(folder_path):
+        if not os.path.isdir(path):
+            file_paths.append(path)
+            continue
+        for root, _, file_names in os.walk(path):
+            for file_name in file_names:
+                file_paths.append(os.path.join(root, file_name))
+    return sorted(file_paths)
+
+
+def can_drop_caches():
+    return (os.geteuid() == 0) and os.access(DROP_CACHES_PATH, os.W_OK)
+
+
+def evict_files(file_paths):
+    """
+    Evict files from the page cache.
+
+    As root, all the clean caches of the system are dropped
+    (/proc/sys/vm/drop_caches), which also evicts the file system metadata.
+    Otherwise each file is evicted with posix_fadvise(POSIX_FADV_DONTNEED).
+
+    Returns
+    -------
+    str: the eviction method, "drop_caches" or "fadvise".
+    """
+    if can_drop_caches():
+        os.sync()
+        with open(DROP_CACHES_PATH, "w") as f:
+            f.write("3")
+        return "drop_caches"
+
+    for file_path in file_paths:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.fdatasync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return "fadvise"
+
+
+def preload_files(file_paths):
+    """Read files entirely, so that they are in the page cache."""
+    n_bytes = 0
+    for file_path in file_paths:
+        with open(file_path, "rb", buffering=0) as f:
+            while True:
+                block = f.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                n_bytes += len(block)
+    return n_bytes
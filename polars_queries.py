@@ -1,10 +1,12 @@
 from datetime import date
 import polars as pl
 
-def q1(dfs) -> pl.LazyFrame:
+from tpch_params import VALIDATION_PARAMS
+
+def q1(dfs, p=VALIDATION_PARAMS[1]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
 
-    var1 = date(1998, 9, 2)
+    var1 = p["DATE"]
 
     q_final = (
         lineitem.filter(pl.col("l_shipdate") <= var1)
@@ -38,14 +40,14 @@ def q1(dfs) -> pl.LazyFrame:
 
 
 
-def q10(dfs) -> pl.LazyFrame:
+def q10(dfs, p=VALIDATION_PARAMS[10]) -> pl.LazyFrame:
     customer = dfs["customer"]
     lineitem = dfs["lineitem"]
     nation = dfs["nation"]
     orders = dfs["orders"]
 
-    var1 = date(1993, 10, 1)
-    var2 = date(1994, 1, 1)
+    var1 = p["DATE"]
+    var2 = p["END_DATE"]
 
     q_final = (
         customer.join(orders, left_on="c_custkey", right_on="o_custkey")
@@ -89,12 +91,12 @@ def q10(dfs) -> pl.LazyFrame:
 
 
 
-def q11(dfs) -> pl.LazyFrame:
+def q11(dfs, p=VALIDATION_PARAMS[11]) -> pl.LazyFrame:
     nation = dfs["nation"]
     partsupp = dfs["partsupp"]
     supplier = dfs["supplier"]
 
-    var1 = "GERMANY"
+    var1 = p["NATION"]
     var2 = 0.0001
 
     q1 = (
@@ -129,14 +131,14 @@ def q11(dfs) -> pl.LazyFrame:
 
 
 
-def q12(dfs) -> pl.LazyFrame:
+def q12(dfs, p=VALIDATION_PARAMS[12]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     orders = dfs["orders"]
 
-    var1 = "MAIL"
-    var2 = "SHIP"
-    var3 = date(1994, 1, 1)
-    var4 = date(1995, 1, 1)
+    var1 = p["SHIPMODE1"]
+    var2 = p["SHIPMODE2"]
+    var3 = p["DATE"]
+    var4 = p["END_DATE"]
 
     q_final = (
         orders.join(lineitem, left_on="o_orderkey", right_on="l_orderkey")
@@ -166,12 +168,12 @@ def q12(dfs) -> pl.LazyFrame:
 
 
 
-def q13(dfs) -> pl.LazyFrame:
+def q13(dfs, p=VALIDATION_PARAMS[13]) -> pl.LazyFrame:
     customer = dfs["customer"]
     orders = dfs["orders"]
 
-    var1 = "special"
-    var2 = "requests"
+    var1 = p["WORD1"]
+    var2 = p["WORD2"]
 
     orders = orders.filter(pl.col("o_comment").str.contains(f"{var1}.*{var2}").not_())
     q_final = (
@@ -192,12 +194,12 @@ def q13(dfs) -> pl.LazyFrame:
 
 
 
-def q14(dfs) -> pl.LazyFrame:
+def q14(dfs, p=VALIDATION_PARAMS[14]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     part = dfs["part"]
 
-    var1 = date(1995, 9, 1)
-    var2 = date(1995, 10, 1)
+    var1 = p["DATE"]
+    var2 = p["END_DATE"]
 
     q_final = (
         lineitem.join(part, left_on="l_partkey", right_on="p_partkey")
@@ -224,12 +226,12 @@ def q14(dfs) -> pl.LazyFrame:
 
 
 
-def q15(dfs) -> pl.LazyFrame:
+def q15(dfs, p=VALIDATION_PARAMS[15]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     supplier = dfs["supplier"]
 
-    var1 = date(1996, 1, 1)
-    var2 = date(1996, 4, 1)
+    var1 = p["DATE"]
+    var2 = p["END_DATE"]
 
     revenue = (
         lineitem.filter(pl.col("l_shipdate").is_between(var1, var2, closed="left"))
@@ -257,12 +259,12 @@ def q15(dfs) -> pl.LazyFrame:
 
 
 
-def q16(dfs) -> pl.LazyFrame:
+def q16(dfs, p=VALIDATION_PARAMS[16]) -> pl.LazyFrame:
     part = dfs["part"]
     partsupp = dfs["partsupp"]
     supplier = dfs["supplier"]
 
-    var1 = "Brand#45"
+    var1 = p["BRAND"]
 
     supplier = supplier.filter(
         pl.col("s_comment").str.contains(".*Customer.*Complaints.*")
@@ -272,8 +274,8 @@ def q16(dfs) -> pl.LazyFrame:
     q_final = (
         part.join(partsupp, left_on="p_partkey", right_on="ps_partkey")
         .filter(pl.col("p_brand") != var1)
-        .filter(pl.col("p_type").str.contains("MEDIUM POLISHED*").not_())
-        .filter(pl.col("p_size").is_in([49, 14, 23, 45, 19, 3, 36, 9]))
+        .filter(pl.col("p_type").str.starts_with(p["TYPE"]).not_())
+        .filter(pl.col("p_size").is_in(p["SIZES"]))
         .join(supplier, left_on="ps_suppkey", right_on="s_suppkey", how="left")
         .filter(pl.col("ps_suppkey_right").is_null())
         .group_by("p_brand", "p_type", "p_size")
@@ -291,12 +293,12 @@ def q16(dfs) -> pl.LazyFrame:
 
 
 
-def q17(dfs) -> pl.LazyFrame:
+def q17(dfs, p=VALIDATION_PARAMS[17]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     part = dfs["part"]
 
-    var1 = "Brand#23"
-    var2 = "MED BOX"
+    var1 = p["BRAND"]
+    var2 = p["CONTAINER"]
 
     q1 = (
         part.filter(pl.col("p_brand") == var1)
@@ -320,12 +322,12 @@ def q17(dfs) -> pl.LazyFrame:
 
 
 
-def q18(dfs) -> pl.LazyFrame:
+def q18(dfs, p=VALIDATION_PARAMS[18]) -> pl.LazyFrame:
     customer = dfs["customer"]
     lineitem = dfs["lineitem"]
     orders = dfs["orders"]
 
-    var1 = 300
+    var1 = p["QUANTITY"]
 
     q1 = (
         lineitem.group_by("l_orderkey")
@@ -358,7 +360,7 @@ def q18(dfs) -> pl.LazyFrame:
 
 
 
-def q19(dfs) -> pl.LazyFrame:
+def q19(dfs, p=VALIDATION_PARAMS[19]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     part = dfs["part"]
 
@@ -368,27 +370,27 @@ def q19(dfs) -> pl.LazyFrame:
         .filter(pl.col("l_shipinstruct") == "DELIVER IN PERSON")
         .filter(
             (
-                (pl.col("p_brand") == "Brand#12")
+                (pl.col("p_brand") == p["BRAND1"])
                 & pl.col("p_container").is_in(
                     ["SM CASE", "SM BOX", "SM PACK", "SM PKG"]
                 )
-                & (pl.col("l_quantity").is_between(1, 11))
+                & (pl.col("l_quantity").is_between(p["QUANTITY1"], p["QUANTITY1"] + 10))
                 & (pl.col("p_size").is_between(1, 5))
             )
             | (
-                (pl.col("p_brand") == "Brand#23")
+                (pl.col("p_brand") == p["BRAND2"])
                 & pl.col("p_container").is_in(
                     ["MED BAG", "MED BOX", "MED PKG", "MED PACK"]
                 )
-                & (pl.col("l_quantity").is_between(10, 20))
+                & (pl.col("l_quantity").is_between(p["QUANTITY2"], p["QUANTITY2"] + 10))
                 & (pl.col("p_size").is_between(1, 10))
             )
             | (
-                (pl.col("p_brand") == "Brand#34")
+                (pl.col("p_brand") == p["BRAND3"])
                 & pl.col("p_container").is_in(
                     ["LG CASE", "LG BOX", "LG PACK", "LG PKG"]
                 )
-                & (pl.col("l_quantity").is_between(20, 30))
+                & (pl.col("l_quantity").is_between(p["QUANTITY3"], p["QUANTITY3"] + 10))
                 & (pl.col("p_size").is_between(1, 15))
             )
         )
@@ -407,16 +409,16 @@ def q19(dfs) -> pl.LazyFrame:
 
 
 
-def q2(dfs) -> pl.LazyFrame:
+def q2(dfs, p=VALIDATION_PARAMS[2]) -> pl.LazyFrame:
     nation = dfs["nation"]
     part = dfs["part"]
     partsupp = dfs["partsupp"]
     region = dfs["region"]
     supplier = dfs["supplier"]
 
-    var1 = 15
-    var2 = "BRASS"
-    var3 = "EUROPE"
+    var1 = p["SIZE"]
+    var2 = p["TYPE"]
+    var3 = p["REGION"]
 
     q1 = (
         part.join(partsupp, left_on="p_partkey", right_on="ps_partkey")
@@ -457,17 +459,17 @@ def q2(dfs) -> pl.LazyFrame:
 
 
 
-def q20(dfs) -> pl.LazyFrame:
+def q20(dfs, p=VALIDATION_PARAMS[20]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     nation = dfs["nation"]
     part = dfs["part"]
     partsupp = dfs["partsupp"]
     supplier = dfs["supplier"]
 
-    var1 = date(1994, 1, 1)
-    var2 = date(1995, 1, 1)
-    var3 = "CANADA"
-    var4 = "forest"
+    var1 = p["DATE"]
+    var2 = p["END_DATE"]
+    var3 = p["NATION"]
+    var4 = p["COLOR"]
 
     q1 = (
         lineitem.filter(pl.col("l_shipdate").is_between(var1, var2, closed="left"))
@@ -500,13 +502,13 @@ def q20(dfs) -> pl.LazyFrame:
 
 
 
-def q21(dfs) -> pl.LazyFrame:
+def q21(dfs, p=VALIDATION_PARAMS[21]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     nation = dfs["nation"]
     orders = dfs["orders"]
     supplier = dfs["supplier"]
 
-    var1 = "SAUDI ARABIA"
+    var1 = p["NATION"]
 
     q1 = (
         lineitem.group_by("l_orderkey")
@@ -541,13 +543,13 @@ def q21(dfs) -> pl.LazyFrame:
 
 
 
-def q22(dfs) -> pl.LazyFrame:
+def q22(dfs, p=VALIDATION_PARAMS[22]) -> pl.LazyFrame:
     customer = dfs["customer"]
     orders = dfs["orders"]
 
     q1 = (
         customer.with_columns(pl.col("c_phone").str.slice(0, 2).alias("cntrycode"))
-        .filter(pl.col("cntrycode").str.contains("13|31|23|29|30|18|17"))
+        .filter(pl.col("cntrycode").is_in(p["CODES"]))
         .select("c_acctbal", "c_custkey", "cntrycode")
     )
 
@@ -580,13 +582,13 @@ def q22(dfs) -> pl.LazyFrame:
 
 
 
-def q3(dfs) -> pl.LazyFrame:
+def q3(dfs, p=VALIDATION_PARAMS[3]) -> pl.LazyFrame:
     customer = dfs["customer"]
     lineitem = dfs["lineitem"]
     orders = dfs["orders"]
 
-    var1 = "BUILDING"
-    var2 = date(1995, 3, 15)
+    var1 = p["SEGMENT"]
+    var2 = p["DATE"]
 
     q_final = (
         customer.filter(pl.col("c_mktsegment") == var1)
@@ -617,12 +619,12 @@ def q3(dfs) -> pl.LazyFrame:
 
 
 
-def q4(dfs) -> pl.LazyFrame:
+def q4(dfs, p=VALIDATION_PARAMS[4]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     orders = dfs["orders"]
 
-    var1 = date(1993, 7, 1)
-    var2 = date(1993, 10, 1)
+    var1 = p["DATE"]
+    var2 = p["END_DATE"]
 
     q_final = (
         # SQL exists translates to semi join in Polars API
@@ -646,7 +648,7 @@ def q4(dfs) -> pl.LazyFrame:
 
 
 
-def q5(dfs) -> pl.LazyFrame:
+def q5(dfs, p=VALIDATION_PARAMS[5]) -> pl.LazyFrame:
     customer = dfs["customer"]
     lineitem = dfs["lineitem"]
     nation = dfs["nation"]
@@ -654,9 +656,9 @@ def q5(dfs) -> pl.LazyFrame:
     region = dfs["region"]
     supplier = dfs["supplier"]
 
-    var1 = "ASIA"
-    var2 = date(1994, 1, 1)
-    var3 = date(1995, 1, 1)
+    var1 = p["REGION"]
+    var2 = p["DATE"]
+    var3 = p["END_DATE"]
 
     q_final = (
         region.join(nation, left_on="r_regionkey", right_on="n_regionkey")
@@ -686,14 +688,14 @@ def q5(dfs) -> pl.LazyFrame:
 
 
 
-def q6(dfs) -> pl.LazyFrame:
+def q6(dfs, p=VALIDATION_PARAMS[6]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
 
-    var1 = date(1994, 1, 1)
-    var2 = date(1995, 1, 1)
-    var3 = 0.05
-    var4 = 0.07
-    var5 = 24
+    var1 = p["DATE"]
+    var2 = p["END_DATE"]
+    var3 = p["DISCOUNT_LOW"]
+    var4 = p["DISCOUNT_HIGH"]
+    var5 = p["QUANTITY"]
 
     q_final = (
         lineitem.filter(pl.col("l_shipdate").is_between(var1, var2, closed="left"))
@@ -713,15 +715,15 @@ def q6(dfs) -> pl.LazyFrame:
 
 
 
-def q7(dfs) -> pl.LazyFrame:
+def q7(dfs, p=VALIDATION_PARAMS[7]) -> pl.LazyFrame:
     customer = dfs["customer"]
     lineitem = dfs["lineitem"]
     nation = dfs["nation"]
     orders = dfs["orders"]
     supplier = dfs["supplier"]
 
-    var1 = "FRANCE"
-    var2 = "GERMANY"
+    var1 = p["NATION1"]
+    var2 = p["NATION2"]
     var3 = date(1995, 1, 1)
     var4 = date(1996, 12, 31)
 
@@ -768,7 +770,7 @@ def q7(dfs) -> pl.LazyFrame:
 
 
 
-def q8(dfs) -> pl.LazyFrame:
+def q8(dfs, p=VALIDATION_PARAMS[8]) -> pl.LazyFrame:
     customer = dfs["customer"]
     lineitem = dfs["lineitem"]
     nation = dfs["nation"]
@@ -777,9 +779,9 @@ def q8(dfs) -> pl.LazyFrame:
     region = dfs["region"]
     supplier = dfs["supplier"]
 
-    var1 = "BRAZIL"
-    var2 = "AMERICA"
-    var3 = "ECONOMY ANODIZED STEEL"
+    var1 = p["NATION"]
+    var2 = p["REGION"]
+    var3 = p["TYPE"]
     var4 = date(1995, 1, 1)
     var5 = date(1996, 12, 31)
 
@@ -820,7 +822,7 @@ def q8(dfs) -> pl.LazyFrame:
 
 
 
-def q9(dfs) -> pl.LazyFrame:
+def q9(dfs, p=VALIDATION_PARAMS[9]) -> pl.LazyFrame:
     lineitem = dfs["lineitem"]
     nation = dfs["nation"]
     orders = dfs["orders"]
@@ -838,7 +840,7 @@ def q9(dfs) -> pl.LazyFrame:
         )
         .join(orders, left_on="l_orderkey", right_on="o_orderkey")
         .join(nation, left_on="s_nationkey", right_on="n_nationkey")
-        .filter(pl.col("p_name").str.contains("green"))
+        .filter(pl.col("p_name").str.contains(p["COLOR"], literal=True))
         .select(
             pl.col("n_name").alias("nation"),
             pl.col("o_orderdate").dt.year().alias("o_year"),
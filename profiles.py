@@ -0,0 +1,288 @@
+"""
+Native query profiles of the engines, normalized into operator tables.
+
+With a profile store, bench_tools.run_queries runs each query once more after
+its measured runs, with the profiling of the engine enabled (see
+EngineAdapter.profile), and stores the raw profile next to its operators. The
+raw profile formats (EngineAdapter.profile_format) are:
+- "duckdb": the JSON of enable_profiling,
+- "datafusion": the "Plan with Metrics" text of EXPLAIN ANALYZE,
+- "hyper": the JSON plan of EXPLAIN ANALYZE,
+- "postgresql": the JSON of EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON),
+- "polars": the node timings of LazyFrame.profile, as JSON records.
+
+Each operator of a profile is a dict with:
+- operator_id: position of the operator in a pre-order walk of the plan, from
+  the root (0),
+- parent_id: operator_id of the operator consuming its output, None for the
+  root,
+- operator: operator name as reported by the engine, e.g. HASH_JOIN,
+  HashJoinExec or Hash Join,
+- rows: number of rows output by the operator,
+- time_s: time spent in the operator itself, its inputs excluded,
+- memory_bytes: memory used by the operator.
+The metrics the engine does not report are None.
+"""
+
+import json
+import re
+
+import pandas as pd
+
+from misc import SETTING_KEYS, TIMING_KEYS
+
+OPERATOR_KEYS = [
+    "operator_id",
+    "parent_id",
+    "operator",
+    "rows",
+    "time_s",
+    "memory_bytes",
+]
+
+_DURATION_UNITS = {"ns": 1e-9, "µs": 1e-6, "us": 1e-6, "ms": 1e-3, "s": 1.0}
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 2**10, "MB": 2**20, "GB": 2**30, "TB": 2**40}
+_COUNT_UNITS = {"": 1, "K": 1e3, "M": 1e6, "B": 1e9}
+
+
+def _operator(operators, parent_id, operator, rows, time_s, memory_bytes=None):
+    """Append an operator to the list and return its operator_id."""
+    operator_id = len(operators)
+    operators.append(
+        {
+            "operator_id": operator_id,
+            "parent_id": parent_id,
+            "operator": operator,
+            "rows": rows,
+            "time_s": time_s,
+            "memory_bytes": memory_bytes,
+        }
+    )
+    return operator_id
+
+
+def duckdb_operators(profile):
+    """
+    Operators of a DuckDB profile. The root of the JSON tree is the query, its
+    children the operators, whose operator_timing excludes their children.
+    """
+
+    def walk(node, parent_id):
+        memory_bytes = node.get("system_peak_buffer_memory")
+        operator_id = _operator(
+            operators,
+            parent_id,
+            node["operator_name"],
+            node.get("operator_cardinality"),
+            node.get("operator_timing"),
+            # only reported for the whole query by the current versions
+            memory_bytes if memory_bytes else None,
+        )
+        for child in node.get("children", []):
+            walk(child, operator_id)
+
+    operators = []
+    for child in json.loads(profile).get("children", []):
+        walk(child, None)
+    return operators
+
+
+def _datafusion_metric(value, units):
+    """Parse a DataFusion metric value, e.g. 12.5µs, 1.2 MB or 4.0 K."""
+    match = re.fullmatch(r"([0-9.]+)\s*([^0-9.\s]*)", value.strip())
+    if (match is None) or (match.group(2) not in units):
+        return None
+    return float(match.group(1)) * units[match.group(2)]
+
+
+def datafusion_operators(profile):
+    """
+    Operators of a DataFusion plan with metrics, one operator per line
+    indented by its depth, e.g.
+    "  HashJoinExec: mode=Partitioned, ..., metrics=[output_rows=4, ...]".
+    The time is the elapsed_compute metric, the CPU time of the operator
+    summed over its partitions, the memory the sum of its *mem_used metrics.
+    """
+    operators = []
+    # operator_id of the last operator of each depth
+    parents = []
+    for line in profile.splitlines():
+        if len(line.strip()) == 0:
+            continue
+        depth = (len(line) - len(line.lstrip())) // 2
+        name = line.strip().split(":")[0]
+        metrics = {}
+        match = re.search(r"metrics=\[(.*)\]\s*$", line)
+        if match:
+            for item in match.group(1).split(", "):
+                key, _, value = item.partition("=")
+                metrics[key] = value
+        rows = None
+        if "output_rows" in metrics:
+            rows = _datafusion_metric(metrics["output_rows"], _COUNT_UNITS)
+            rows = None if rows is None else int(rows)
+        time_s = None
+        if "elapsed_compute" in metrics:
+            time_s = _datafusion_metric(metrics["elapsed_compute"], _DURATION_UNITS)
+        memory = [
+            _datafusion_metric(value, _SIZE_UNITS)
+            for key, value in metrics.items()
+            if key.endswith("mem_used")
+        ]
+        memory = [value for value in memory if value is not None]
+        memory_bytes = int(sum(memory)) if len(memory) > 0 else None
+        del parents[depth:]
+        parent_id = parents[-1] if len(parents) > 0 else None
+        parents.append(
+            _operator(operators, parent_id, name, rows, time_s, memory_bytes)
+        )
+    return operators
+
+
+def hyper_operators(profile):
+    """
+    Operators of a Hyper plan. The operators are the JSON objects with an
+    "operator" key, their inputs being nested under keys such as "input",
+    "left" and "right". The rows and the time are the "tuple-count" and
+    "execution-time" of their "analyze" object, when present.
+    """
+
+    def walk(node, parent_id):
+        if isinstance(node, list):
+            for item in node:
+                walk(item, parent_id)
+            return
+        if not isinstance(node, dict):
+            return
+        if "operator" in node:
+            analyze = node.get("analyze", {})
+            parent_id = _operator(
+                operators,
+                parent_id,
+                node["operator"],
+                analyze.get("tuple-count"),
+                analyze.get("execution-time"),
+            )
+        for key, value in node.items():
+            if key != "analyze":
+                walk(value, parent_id)
+
+    operators = []
+    walk(json.loads(profile), None)
+    return operators
+
+
+def postgresql_operators(profile):
+    """
+    Operators of a PostgreSQL plan. The rows and the time of a node are
+    reported per loop, and its time includes its children: the rows are
+    multiplied by the loops, and the time of the children subtracted. The
+    memory is the peak memory of the hash tables and the memory sorts.
+    """
+
+    def total_time_s(node):
+        return node.get("Actual Total Time", 0.0) * node.get("Actual Loops", 1) * 1e-3
+
+    def walk(node, parent_id):
+        children = node.get("Plans", [])
+        time_s = None
+        if "Actual Total Time" in node:
+            time_s = max(
+                total_time_s(node) - sum(total_time_s(child) for child in children),
+                0.0,
+            )
+        rows = None
+        if "Actual Rows" in node:
+            rows = int(node["Actual Rows"] * node.get("Actual Loops", 1))
+        memory_kb = node.get("Peak Memory Usage")
+        if node.get("Sort Space Type") == "Memory":
+            memory_kb = node.get("Sort Space Used")
+        operator_id = _operator(
+            operators,
+            parent_id,
+            node["Node Type"],
+            rows,
+            time_s,
+            None if memory_kb is None else memory_kb * 1024,
+        )
+        for child in children:
+            walk(child, operator_id)
+
+    operators = []
+    for statement in json.loads(profile):
+        walk(statement["Plan"], None)
+    return operators
+
+
+def polars_operators(profile):
+    """
+    Operators of the Polars node timings, whose start and end are in
+    microseconds. The plan structure, the rows and the memory are not
+    reported, and the interval of a node may include the time spent waiting
+    for its inputs.
+    """
+    operators = []
+    for node in json.loads(profile):
+        _operator(
+            operators, None, node["node"], None, (node["end"] - node["start"]) * 1e-6
+        )
+    return operators
+
+
+PARSERS = {
+    "duckdb": duckdb_operators,
+    "datafusion": datafusion_operators,
+    "hyper": hyper_operators,
+    "postgresql": postgresql_operators,
+    "polars": polars_operators,
+}
+
+
+def profile_operators(profile_format, profile):
+    """
+    Normalize a raw profile into its operators.
+
+    Parameters
+    ----------
+    profile_format : str
+        One of PARSERS, see EngineAdapter.profile_format.
+    profile : str
+        Raw profile returned by EngineAdapter.profile.
+
+    Returns
+    -------
+    list: one dict per operator, with the OPERATOR_KEYS.
+    """
+    if profile_format not in PARSERS:
+        raise ValueError(f"Unknown profile format : {profile_format}")
+    return PARSERS[profile_format](profile)
+
+
+def operators_dataframe(records):
+    """
+    Operator table of the stored profiles.
+
+    Parameters
+    ----------
+    records : list
+        Profile records, as emitted by bench_tools.run_session.
+
+    Returns
+    -------
+    pd.DataFrame: one row per operator of each profiled query, with the
+    TIMING_KEYS, the run settings and the OPERATOR_KEYS, and time_share, the
+    share of the operator in the time of the profiled query.
+    """
+    rows = []
+    for record in records:
+        keys = {key: record[key] for key in TIMING_KEYS + SETTING_KEYS if key in record}
+        for operator in record["operators"]:
+            rows.append({**keys, **operator})
+    df = pd.DataFrame(rows, columns=None if len(rows) > 0 else OPERATOR_KEYS)
+    if len(df) > 0:
+        df["parent_id"] = df["parent_id"].astype("Int64")
+        df["time_s"] = pd.to_numeric(df["time_s"])
+        keys = [key for key in TIMING_KEYS + SETTING_KEYS if key in df]
+        total_time_s = df.groupby(keys, dropna=False)["time_s"].transform("sum")
+        df["time_share"] = df["time_s"] / total_time_s
+    return df
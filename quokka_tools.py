@@ -1,3 +1,8 @@
+import functools
+
+from tpch_params import NATIONS, VALIDATION_PARAMS, format_sql_value
+
+
 def do_1(qc, tables):
 
     d = tables["lineitem"].filter_sql("l_shipdate <= date '1998-09-02'")
@@ -71,8 +76,8 @@ def do_1_2(qc, tables):
     return f.collect()
 
 
-def do_1_sql(qc, tables):
-    d = tables["lineitem"].filter_sql("l_shipdate <= date '1998-09-02'")
+def do_1_sql(qc, tables, p=VALIDATION_PARAMS[1]):
+    d = tables["lineitem"].filter_sql(f"l_shipdate <= date '{p['DATE']}'")
     f = d.groupby(["l_returnflag", "l_linestatus"]).agg_sql(
         """sum(l_quantity) as sum_qty,
                                 sum(l_extendedprice) as sum_base_price,
@@ -86,12 +91,12 @@ def do_1_sql(qc, tables):
     return f.collect()
 
 
-def do_2(qc, tables):
+def do_2(qc, tables, p=VALIDATION_PARAMS[2]):
     """
     Quokka does not do query unnesting.
     """
     qc.set_config("optimize_joins", False)
-    europe = tables["region"].filter_sql("r_name = 'EUROPE'")
+    europe = tables["region"].filter_sql(f"r_name = '{p['REGION']}'")
     european_nations = (
         tables["nation"]
         .join(europe, left_on="n_regionkey", right_on="r_regionkey")
@@ -114,7 +119,7 @@ def do_2(qc, tables):
     d = tables["partsupp"].join(d, left_on="ps_suppkey", right_on="s_suppkey")
     d = d.join(k, left_on="ps_supplycost", right_on="min_cost", suffix="_2")
     d = d.filter_sql(
-        """europe_key = ps_partkey and p_size = 15 and p_type like '%BRASS' """
+        f"""europe_key = ps_partkey and p_size = {p['SIZE']} and p_type like '%{p['TYPE']}' """
     )
     d = d.select(
         [
@@ -173,13 +178,13 @@ def do_3(qc, tables):
 #     return f.collect()
 
 
-def do_3_sql(qc, tables):
+def do_3_sql(qc, tables, p=VALIDATION_PARAMS[3]):
     d = tables["lineitem"].join(
         tables["orders"], left_on="l_orderkey", right_on="o_orderkey"
     )
     d = tables["customer"].join(d, left_on="c_custkey", right_on="o_custkey")
     d = d.filter_sql(
-        "c_mktsegment = 'BUILDING' and o_orderdate < date '1995-03-15' and l_shipdate > date '1995-03-15'"
+        f"c_mktsegment = '{p['SEGMENT']}' and o_orderdate < date '{p['DATE']}' and l_shipdate > date '{p['DATE']}'"
     )
     d = d.groupby(["l_orderkey", "o_orderdate", "o_shippriority"]).agg_sql(
         "sum(l_extendedprice * (1 - l_discount)) as revenue"
@@ -208,13 +213,13 @@ def do_4(qc, tables):
     return f.collect()
 
 
-def do_4_sql(qc, tables):
+def do_4_sql(qc, tables, p=VALIDATION_PARAMS[4]):
     d = tables["lineitem"].filter_sql("l_commitdate < l_receiptdate")
     d = tables["orders"].join(
         d, left_on="o_orderkey", right_on="l_orderkey", how="semi"
     )
     d = d.filter_sql(
-        "o_orderdate >= date '1993-07-01' and o_orderdate < date '1993-10-01'"
+        f"o_orderdate >= date '{p['DATE']}' and o_orderdate < date '{p['END_DATE']}'"
     )
     f = d.groupby("o_orderpriority").agg_sql("count(*) as count_order")
     # f.explain()
@@ -258,9 +263,9 @@ def do_5(qc, tables):
     return f.collect().sort("revenue", descending=True)
 
 
-def do_5_sql(qc, tables):
+def do_5_sql(qc, tables, p=VALIDATION_PARAMS[5]):
     qc.set_config("optimize_joins", False)
-    asia = tables["region"].filter_sql("r_name == 'ASIA'")
+    asia = tables["region"].filter_sql(f"r_name == '{p['REGION']}'")
     asian_nations = (
         tables["nation"]
         .join(asia, left_on="n_regionkey", right_on="r_regionkey")
@@ -277,7 +282,7 @@ def do_5_sql(qc, tables):
         tables["supplier"], left_on="l_suppkey", right_on="s_suppkey", suffix="_5"
     )
     d = d.filter_sql(
-        "s_nationkey = c_nationkey and o_orderdate >= date '1994-01-01' and o_orderdate < date '1994-01-01' + interval '1' year"
+        f"s_nationkey = c_nationkey and o_orderdate >= date '{p['DATE']}' and o_orderdate < date '{p['END_DATE']}'"
     )
     f = d.groupby("n_name").agg_sql(
         "sum(l_extendedprice * (1 - l_discount)) as revenue"
@@ -301,9 +306,9 @@ def do_6(qc, tables):
     return f.collect()
 
 
-def do_6_sql(qc, tables):
+def do_6_sql(qc, tables, p=VALIDATION_PARAMS[6]):
     d = tables["lineitem"].filter_sql(
-        "l_shipdate >= date '1994-01-01' and l_shipdate < date '1994-01-01' + interval '1' year and l_discount between 0.06 - 0.01 and 0.06 + 0.01 and l_quantity < 24"
+        f"l_shipdate >= date '{p['DATE']}' and l_shipdate < date '{p['END_DATE']}' and l_discount between {p['DISCOUNT_LOW']} and {p['DISCOUNT_HIGH']} and l_quantity < {p['QUANTITY']}"
     )
     f = d.agg_sql("sum(l_extendedprice * l_discount) as revenue")
     return f.collect()
@@ -348,7 +353,7 @@ def do_7(qc, tables):
     return f.collect().sort(["supp_nation", "cust_nation", "l_year"])
 
 
-def do_7_sql(qc, tables):
+def do_7_sql(qc, tables, p=VALIDATION_PARAMS[7]):
     d1 = tables["customer"].join(
         tables["nation"], left_on="c_nationkey", right_on="n_nationkey"
     )
@@ -365,9 +370,9 @@ def do_7_sql(qc, tables):
     d = d1.join(d2, left_on="o_orderkey", right_on="l_orderkey", suffix="_4")
     d = d.rename({"n_name_4": "supp_nation", "n_name": "cust_nation"})
     d = d.filter_sql(
-        """(
-                                (supp_nation = 'FRANCE' and cust_nation = 'GERMANY')
-                                or (supp_nation = 'GERMANY' and cust_nation = 'FRANCE')
+        f"""(
+                                (supp_nation = '{p['NATION1']}' and cust_nation = '{p['NATION2']}')
+                                or (supp_nation = '{p['NATION2']}' and cust_nation = '{p['NATION1']}')
                         )
                         and l_shipdate between date '1995-01-01' and date '1996-12-31'"""
     )
@@ -382,8 +387,8 @@ def do_7_sql(qc, tables):
     return f.collect().sort(["supp_nation", "cust_nation", "l_year"])
 
 
-def do_8(qc, tables):
-    america = tables["region"].filter_sql("r_name = 'AMERICA'")
+def do_8(qc, tables, p=VALIDATION_PARAMS[8]):
+    america = tables["region"].filter_sql(f"r_name = '{p['REGION']}'")
     american_nations = (
         tables["nation"]
         .join(america, left_on="n_regionkey", right_on="r_regionkey")
@@ -402,9 +407,9 @@ def do_8(qc, tables):
     d = d.join(tables["supplier"], left_on="l_suppkey", right_on="s_suppkey")
     d = d.join(tables["nation"], left_on="s_nationkey", right_on="n_nationkey")
     d = d.filter_sql(
-        """
+        f"""
        o_orderdate between date '1995-01-01' and date '1996-12-31'
-        and p_type = 'ECONOMY ANODIZED STEEL'
+        and p_type = '{p['TYPE']}'
     """
     )
     d = d.with_columns(
@@ -416,7 +421,7 @@ def do_8(qc, tables):
     )
     d = d.rename({"n_name": "nation"})
     d = d.with_columns(
-        {"brazil_volume": lambda x: x["volume"] * (x["nation"] == "BRAZIL")},
+        {"brazil_volume": lambda x: x["volume"] * (x["nation"] == p["NATION"])},
         required_columns={"volume", "nation"},
     )
     f = d.groupby("o_year").aggregate(
@@ -428,7 +433,7 @@ def do_8(qc, tables):
 
 
 # join ordering will be hard for this one
-def do_9(qc, tables):
+def do_9(qc, tables, p=VALIDATION_PARAMS[9]):
 
     qc.set_config("optimize_joins", False)
     d = tables["partsupp"].join(
@@ -439,7 +444,7 @@ def do_9(qc, tables):
     )
     d = d1.join(d, left_on="s_suppkey", right_on="ps_suppkey")
     d = d.join(tables["lineitem"], left_on="ps_partkey", right_on="l_partkey")
-    d = d.filter_sql("s_suppkey = l_suppkey and p_name like '%green%'")
+    d = d.filter_sql(f"s_suppkey = l_suppkey and p_name like '%{p['COLOR']}%'")
     d = d.join(tables["orders"], left_on="l_orderkey", right_on="o_orderkey")
     d = d.with_columns(
         {
@@ -457,16 +462,16 @@ def do_9(qc, tables):
     return result.sort(["nation", "o_year"], descending=[False, True])
 
 
-def do_10(qc, tables):
+def do_10(qc, tables, p=VALIDATION_PARAMS[10]):
     d = tables["customer"].join(
         tables["nation"], left_on="c_nationkey", right_on="n_nationkey"
     )
     d = d.join(tables["orders"], left_on="c_custkey", right_on="o_custkey")
     d = d.join(tables["lineitem"], left_on="o_orderkey", right_on="l_orderkey")
     d = d.filter_sql(
-        """
-        o_orderdate >= date '1993-10-01'
-        and o_orderdate < date '1993-10-01' + interval '3' month
+        f"""
+        o_orderdate >= date '{p['DATE']}'
+        and o_orderdate < date '{p['END_DATE']}'
         and l_returnflag = 'R'
     """
     )
@@ -486,9 +491,9 @@ def do_10(qc, tables):
 
 
 def get_do_11(coef):
-    def do_11(qc, tables):
+    def do_11(qc, tables, p=VALIDATION_PARAMS[11]):
         d = tables["supplier"].join(
-            tables["nation"].filter_sql("n_name == 'GERMANY'"),
+            tables["nation"].filter_sql(f"n_name == '{p['NATION']}'"),
             left_on="s_nationkey",
             right_on="n_nationkey",
         )
@@ -533,15 +538,15 @@ def do_12(qc, tables):
     return f.collect()
 
 
-def do_12_sql(qc, tables):
+def do_12_sql(qc, tables, p=VALIDATION_PARAMS[12]):
 
     d = tables["lineitem"].join(
         tables["orders"], left_on="l_orderkey", right_on="o_orderkey"
     )
 
     d = d.filter_sql(
-        "l_shipmode IN ('MAIL','SHIP') and l_commitdate < l_receiptdate and l_shipdate < l_commitdate and \
-        l_receiptdate >= date '1994-01-01' and l_receiptdate < date '1995-01-01'"
+        f"l_shipmode IN ('{p['SHIPMODE1']}','{p['SHIPMODE2']}') and l_commitdate < l_receiptdate and l_shipdate < l_commitdate and \
+        l_receiptdate >= date '{p['DATE']}' and l_receiptdate < date '{p['END_DATE']}'"
     )
 
     f = d.groupby("l_shipmode").agg_sql(
@@ -553,12 +558,12 @@ def do_12_sql(qc, tables):
     return f.collect()
 
 
-def do_13(qc, tables):
+def do_13(qc, tables, p=VALIDATION_PARAMS[13]):
 
     d = tables["customer"].join(
         tables["orders"], left_on="c_custkey", right_on="o_custkey", how="left"
     )
-    d = d.filter_sql("o_comment not like '%special%requests%'")
+    d = d.filter_sql(f"o_comment not like '%{p['WORD1']}%{p['WORD2']}%'")
     c_orders = d.groupby("c_custkey").agg_sql("count(o_orderkey) as c_count")
     result = (
         c_orders.groupby("c_count")
@@ -569,12 +574,12 @@ def do_13(qc, tables):
     return result
 
 
-def do_14(qc, tables):
+def do_14(qc, tables, p=VALIDATION_PARAMS[14]):
     d = tables["lineitem"].join(
         tables["part"], left_on="l_partkey", right_on="p_partkey"
     )
     d = d.filter_sql(
-        "l_shipdate >= date '1995-09-01' and l_shipdate < date '1995-09-01' + interval '1' month"
+        f"l_shipdate >= date '{p['DATE']}' and l_shipdate < date '{p['END_DATE']}'"
     )
     f = d.agg_sql(
         """100.00 * sum(case
@@ -587,11 +592,11 @@ def do_14(qc, tables):
     return f.collect()
 
 
-def do_15(qc, tables):
+def do_15(qc, tables, p=VALIDATION_PARAMS[15]):
 
     # first compute the revenue
     d = tables["lineitem"].filter_sql(
-        "l_shipdate >= date '1996-01-01' and l_shipdate < date '1996-01-01' + interval '3' month"
+        f"l_shipdate >= date '{p['DATE']}' and l_shipdate < date '{p['END_DATE']}'"
     )
     d = d.with_columns(
         {"revenue": lambda x: x["l_extendedprice"] * (1 - x["l_discount"])},
@@ -613,7 +618,7 @@ def do_15(qc, tables):
     return result.collect()
 
 
-def do_16(qc, tables):
+def do_16(qc, tables, p=VALIDATION_PARAMS[16]):
 
     bad_suppliers = tables["supplier"].filter_sql(
         "s_comment like '%Customer%Complaints%'"
@@ -623,7 +628,7 @@ def do_16(qc, tables):
     )
     d = d.join(tables["part"], left_on="ps_partkey", right_on="p_partkey", how="inner")
     d = d.filter_sql(
-        "p_brand != 'Brand#45' and p_type not like 'MEDIUM POLISHED%' and p_size in (49, 14, 23, 45, 19, 3, 36, 9)"
+        f"p_brand != '{p['BRAND']}' and p_type not like '{p['TYPE']}%' and p_size in ({format_sql_value(p['SIZES'])})"
     )
     result = d.groupby(["p_brand", "p_type", "p_size"]).count_distinct("ps_suppkey")
     # result.explain()
@@ -634,7 +639,7 @@ def do_16(qc, tables):
     return result
 
 
-def do_17(qc, tables):
+def do_17(qc, tables, p=VALIDATION_PARAMS[17]):
     u_0 = (
         tables["lineitem"]
         .groupby("l_partkey")
@@ -648,7 +653,7 @@ def do_17(qc, tables):
         tables["lineitem"], left_on="p_partkey", right_on="l_partkey", how="inner"
     )
     d = d.filter_sql(
-        "p_brand = 'Brand#23' and p_container = 'MED BOX' and l_quantity < avg_quantity"
+        f"p_brand = '{p['BRAND']}' and p_container = '{p['CONTAINER']}' and l_quantity < avg_quantity"
     )
     f = d.agg_sql("SUM(l_extendedprice) / 7.0 AS avg_yearly")
     # f.explain()
@@ -656,12 +661,12 @@ def do_17(qc, tables):
     return result
 
 
-def do_18(qc, tables):
+def do_18(qc, tables, p=VALIDATION_PARAMS[18]):
     u_0 = (
         tables["lineitem"]
         .groupby("l_orderkey")
         .agg_sql("SUM(l_quantity) AS sum_quant")
-        .filter_sql("sum_quant > 300")
+        .filter_sql(f"sum_quant > {p['QUANTITY']}")
         .compute()
     )
     u_0 = qc.read_dataset(u_0)
@@ -679,20 +684,20 @@ def do_18(qc, tables):
     return d.collect()
 
 
-def do_19(qc, tables):
+def do_19(qc, tables, p=VALIDATION_PARAMS[19]):
     print("manual DNF unnesting currently needed for reasonable performance.")
     d = (
         tables["lineitem"]
         .filter_sql(
-            """
-            (l_quantity >= 1 and l_quantity <= 30)
+            f"""
+            (l_quantity >= {p['QUANTITY1']} and l_quantity <= {p['QUANTITY3'] + 10})
             and (l_shipmode in ('AIR', 'AIR REG'))
             and (l_shipinstruct = 'DELIVER IN PERSON')
         """
         )
         .join(
             tables["part"].filter_sql(
-                """(p_brand = 'Brand#12' or p_brand = 'Brand#23' or p_brand = 'Brand#34')
+                f"""(p_brand = '{p['BRAND1']}' or p_brand = '{p['BRAND2']}' or p_brand = '{p['BRAND3']}')
             and (p_size between 1 and 15)
             and (p_container in ('SM CASE', 'SM BOX', 'SM PACK', 'SM PKG', 'MED BAG', 'MED BOX', 'MED PKG', 'MED PACK', 'LG CASE', 'LG BOX', 'LG PACK', 'LG PKG'))
         """
@@ -703,21 +708,21 @@ def do_19(qc, tables):
         )
     )
     d = d.filter_sql(
-        """
+        f"""
                 (
-                    p_brand = 'Brand#12'
+                    p_brand = '{p['BRAND1']}'
                     and p_container in ('SM CASE', 'SM BOX', 'SM PACK', 'SM PKG')
-                    and l_quantity >= 1 and l_quantity <= 1 + 10
+                    and l_quantity >= {p['QUANTITY1']} and l_quantity <= {p['QUANTITY1']} + 10
                     and p_size between 1 and 5) or
                 (
-                    p_brand = 'Brand#23'
+                    p_brand = '{p['BRAND2']}'
                     and p_container in ('MED BAG', 'MED BOX', 'MED PKG', 'MED PACK')
-                    and l_quantity >= 10 and l_quantity <= 10 + 10
+                    and l_quantity >= {p['QUANTITY2']} and l_quantity <= {p['QUANTITY2']} + 10
                     and p_size between 1 and 10) or
                 (
-                    p_brand = 'Brand#34'
+                    p_brand = '{p['BRAND3']}'
                     and p_container in ('LG CASE', 'LG BOX', 'LG PACK', 'LG PKG')
-                    and l_quantity >= 20 and l_quantity <= 20 + 10
+                    and l_quantity >= {p['QUANTITY3']} and l_quantity <= {p['QUANTITY3']} + 10
                     and p_size between 1 and 15
                 )
     """
@@ -728,17 +733,17 @@ def do_19(qc, tables):
     return result.collect()
 
 
-def do_20(qc, tables):
+def do_20(qc, tables, p=VALIDATION_PARAMS[20]):
     u_0 = (
         tables["lineitem"]
         .filter_sql(
-            "l_shipdate < date '1995-01-01' and l_shipdate >= date '1994-01-01'"
+            f"l_shipdate < date '{p['END_DATE']}' and l_shipdate >= date '{p['DATE']}'"
         )
         .groupby(["l_partkey", "l_suppkey"])
         .agg_sql("0.5 * SUM(l_quantity) AS sum_quantity")
         .compute()
     )
-    u_3 = tables["part"].filter_sql("p_name like 'forest%'")
+    u_3 = tables["part"].filter_sql(f"p_name like '{p['COLOR']}%'")
     u_4 = tables["partsupp"].join(
         qc.read_dataset(u_0), left_on="ps_suppkey", right_on="l_suppkey", how="inner"
     )
@@ -748,7 +753,7 @@ def do_20(qc, tables):
         u_4, left_on="s_suppkey", right_on="ps_suppkey", how="semi"
     )
     d = d.join(
-        tables["nation"].filter_sql("n_name = 'CANADA'"),
+        tables["nation"].filter_sql(f"n_name = '{p['NATION']}'"),
         left_on="s_nationkey",
         right_on="n_nationkey",
         how="inner",
@@ -760,7 +765,7 @@ def do_20(qc, tables):
 
 # the SQL for this is just probably not going to happen for a while
 # this OOMs on cluster setup for SF100, probably ain't too great
-def do_21(qc, tables):
+def do_21(qc, tables, p=VALIDATION_PARAMS[21]):
 
     u_0 = (
         tables["lineitem"]
@@ -783,7 +788,7 @@ def do_21(qc, tables):
         tables["orders"], left_on="l_orderkey", right_on="o_orderkey", how="inner"
     )
     d = d.filter_sql(
-        "l_receiptdate > l_commitdate and s_nationkey = 20 and o_orderstatus = 'F'"
+        f"l_receiptdate > l_commitdate and s_nationkey = {list(NATIONS).index(p['NATION'])} and o_orderstatus = 'F'"
     )
     d = d.join(
         qc.read_dataset(u_0),
@@ -847,7 +852,7 @@ def do_21_sql(qc, tables):
     )
     d = d.join(
         tables["supplier"]
-        .filter_sql("s_nationkey = 20")
+        .filter_sql(f"s_nationkey = {list(NATIONS).index(p['NATION'])}")
         .select(["s_suppkey", "s_name"]),
         left_on="l_suppkey",
         right_on="s_suppkey",
@@ -882,13 +887,13 @@ def do_21_sql(qc, tables):
     return d.collect()
 
 
-def do_22(qc, tables):
+def do_22(qc, tables, p=VALIDATION_PARAMS[22]):
     u_0 = (
         tables["customer"]
         .filter_sql(
-            """
+            f"""
         c_acctbal > 0.00
-        AND SUBSTRING(c_phone, 1, 2) IN ('13', '31', '23', '29', '30', '18', '17')
+        AND SUBSTRING(c_phone, 1, 2) IN ({format_sql_value(p['CODES'])})
     """
         )
         .agg_sql("AVG(c_acctbal) AS _col_0")
@@ -900,7 +905,7 @@ def do_22(qc, tables):
         required_columns={"c_phone"},
     )
     d = d.filter_sql(
-        "cntrycode IN ('13', '31', '23', '29', '30', '18', '17') and c_acctbal > "
+        f"cntrycode IN ({format_sql_value(p['CODES'])}) and c_acctbal > "
         + str(u_0)
     )
     d = d.join(tables["orders"], left_on="c_custkey", right_on="o_custkey", how="anti")
@@ -911,9 +916,14 @@ def do_22(qc, tables):
     return d.collect().sort("cntrycode")
 
 
-def get_quokka_queries(scale_factor):
+def get_quokka_queries(scale_factor, params=None):
+    """
+    The Quokka implementations of the 22 queries, with the TPC-H substitution
+    parameters (query number -> parameters, the validation parameters by
+    default, see tpch_params.py).
+    """
     coef = float(0.0001 / scale_factor)
-    return [
+    queries = [
         do_1_sql,
         do_2,
         do_3_sql,
@@ -937,3 +947,8 @@ def get_quokka_queries(scale_factor):
         do_21,
         do_22,
     ]
+    if params is None:
+        params = VALIDATION_PARAMS
+    return [
+        functools.partial(query, p=params[i + 1]) for i, query in enumerate(queries)
+    ]
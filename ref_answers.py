@@ -0,0 +1,209 @@
+"""
+Reference answers of the queries, stored next to the data.
+
+A reference engine (DuckDB) runs the queries of a data folder once, and their
+results are stored as zstd-compressed Parquet files in its ref_answers
+subfolder, one file per query (e.g. ref_answers/q01.parquet). At the scale
+factors for which the DuckDB tpch and tpcds extensions publish the answers of
+the specification (tpch_answers(), e.g. 0.01, 0.1 and 1 for TPC-H), the
+results are cross-checked against them before being stored.
+
+The benchmarks read the stored answers instead of running a second engine:
+the reference fingerprints of the results (see result_check.py) are computed
+from them, and the reference row counts read from their metadata, which
+extend the hand-maintained ones of ref_row_count.py to any scale factor.
+"""
+
+import glob
+import io
+import os
+import re
+
+import duckdb
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.parquet as pq
+
+from misc import find_table_files, parse_folder_name
+from result_check import compare_fingerprints, fingerprint_table
+
+ANSWERS_DIR_NAME = "ref_answers"
+
+
+def answer_path(folder_path, query_number):
+    return os.path.join(folder_path, ANSWERS_DIR_NAME, f"q{query_number:02d}.parquet")
+
+
+def stored_answer_paths(folder_path):
+    """dict: query number -> path of the stored answer."""
+    paths = {}
+    pattern = os.path.join(folder_path, ANSWERS_DIR_NAME, "q*.parquet")
+    for file_path in sorted(glob.glob(pattern)):
+        match = re.fullmatch(r"q(\d+)\.parquet", os.path.basename(file_path))
+        if match:
+            paths[int(match.group(1))] = file_path
+    return paths
+
+
+def compute_answers(adapter, folder_path, queries, logger):
+    """
+    Run the queries of a data folder with a DuckDB adapter.
+
+    Returns
+    -------
+    dict: query number -> Arrow table of the result, the failed queries being
+    left out.
+    """
+    _, scale_factor = parse_folder_name(folder_path)
+    table_files = {}
+    if adapter.file_extension is not None:
+        table_files = find_table_files(folder_path, adapter.file_extension)
+    answers = {}
+    connected = False
+    for i, query in enumerate(adapter.get_queries(queries, scale_factor)):
+        query_number = i + 1
+        if not connected:
+            adapter.connect(folder_path)
+            adapter.register_tables(table_files)
+            connected = True
+        try:
+            table = adapter.execute(adapter.plan(query)).to_arrow_table()
+            answers[query_number] = table
+            logger.info(f"query {query_number} : {table.num_rows} rows")
+        except Exception:
+            logger.exception(f"Error executing query {query_number}")
+        if adapter.reconnect_per_query:
+            adapter.close()
+            connected = False
+    if connected:
+        adapter.close()
+    return answers
+
+
+def published_answers(tpc_name, scale_factor, schemas):
+    """
+    Answers published by the DuckDB tpch or tpcds extension at a scale factor,
+    e.g. by tpch_answers(), empty if there are none.
+
+    Parameters
+    ----------
+    schemas : dict
+        query number -> Arrow schema of the computed answer, giving the
+        columns of the published one: the numeric columns are read as
+        floating point numbers, which the published answers round.
+
+    Returns
+    -------
+    dict: query number -> Arrow table.
+    """
+    with duckdb.connect() as con:
+        _ = con.sql(f"INSTALL {tpc_name}")
+        _ = con.sql(f"LOAD {tpc_name}")
+        rows = con.execute(
+            f"SELECT query_nr, answer FROM {tpc_name}_answers() "
+            + "WHERE scale_factor = ?",
+            [scale_factor],
+        ).fetchall()
+    answers = {}
+    for query_number, answer in rows:
+        if query_number not in schemas:
+            continue
+        schema = schemas[query_number]
+        column_names = [f"column_{i}" for i in range(len(schema))]
+        column_types = {}
+        for column_name, field in zip(column_names, schema):
+            data_type = field.type
+            if pa.types.is_floating(data_type) or pa.types.is_decimal(data_type):
+                data_type = pa.float64()
+            column_types[column_name] = data_type
+        answers[query_number] = pyarrow.csv.read_csv(
+            io.BytesIO(answer.encode()),
+            read_options=pyarrow.csv.ReadOptions(
+                column_names=column_names, skip_rows=1
+            ),
+            parse_options=pyarrow.csv.ParseOptions(delimiter="|"),
+            convert_options=pyarrow.csv.ConvertOptions(
+                column_types=column_types,
+                null_values=["NULL", ""],
+                strings_can_be_null=True,
+            ),
+        )
+    return answers
+
+
+def cross_check_answers(answers, tpc_name, scale_factor, logger):
+    """
+    Compare the computed answers with the published ones of the scale factor,
+    if any.
+
+    Returns
+    -------
+    list: the numbers of the queries whose answer differs.
+    """
+    schemas = {query_number: table.schema for query_number, table in answers.items()}
+    published = published_answers(tpc_name, scale_factor, schemas)
+    if len(published) == 0:
+        logger.info(f"No published {tpc_name} answers at scale factor {scale_factor}")
+        return []
+    wrong_queries = []
+    for query_number, table in sorted(published.items()):
+        differences = compare_fingerprints(
+            fingerprint_table(answers[query_number]), fingerprint_table(table)
+        )
+        if len(differences) > 0:
+            logger.error(
+                f"query {query_number} : the answer differs from the published "
+                + f"one : {'; '.join(differences)}"
+            )
+            wrong_queries.append(query_number)
+    logger.info(
+        f"{len(published) - len(wrong_queries)} / {len(published)} answers "
+        + "match the published ones"
+    )
+    return wrong_queries
+
+
+def write_answers(folder_path, answers):
+    """Store the answers (query number -> Arrow table) of a data folder."""
+    os.makedirs(os.path.join(folder_path, ANSWERS_DIR_NAME), exist_ok=True)
+    for query_number, table in answers.items():
+        pq.write_table(
+            table, answer_path(folder_path, query_number), compression="zstd"
+        )
+
+
+def load_ref_fingerprints(subfolders):
+    """
+    Reference fingerprints of the stored answers of the data folders.
+
+    Returns
+    -------
+    dict: (scale_factor, query) -> reference fingerprint.
+    """
+    ref_fingerprints = {}
+    for folder_path in subfolders:
+        _, scale_factor = parse_folder_name(folder_path)
+        for query_number, file_path in stored_answer_paths(folder_path).items():
+            ref_fingerprints[(scale_factor, query_number)] = fingerprint_table(
+                pq.read_table(file_path)
+            )
+    return ref_fingerprints
+
+
+def stored_n_rows_returned(subfolders):
+    """
+    Row counts of the stored answers of the data folders, from the Parquet
+    metadata.
+
+    Returns
+    -------
+    dict: (scale_factor, query) -> row count.
+    """
+    n_rows_returned = {}
+    for folder_path in subfolders:
+        _, scale_factor = parse_folder_name(folder_path)
+        for query_number, file_path in stored_answer_paths(folder_path).items():
+            n_rows_returned[(scale_factor, query_number)] = pq.read_metadata(
+                file_path
+            ).num_rows
+    return n_rows_returned
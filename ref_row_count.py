@@ -1,9 +1,15 @@
-def tpch_ref_n_rows_returned():
+from ref_answers import stored_n_rows_returned
+
+
+def tpch_ref_n_rows_returned(subfolders=()):
     """
     d[(scale_factor, query)] = n_rows_returned
     scale_factor : int
     query : int
     n_rows_returned : int
+
+    The row counts of the answers stored in the data folders subfolders (see
+    ref_answers.py) are added, and take precedence.
     """
     d = dict(
         {
@@ -119,15 +125,19 @@ def tpch_ref_n_rows_returned():
             (100, 22): 7,
         }
     )
+    d.update(stored_n_rows_returned(subfolders))
     return d
 
 
-def tpcds_ref_n_rows_returned():
+def tpcds_ref_n_rows_returned(subfolders=()):
     """
     d[(scale_factor, query)] = n_rows_returned
     scale_factor : int
     query : int
     n_rows_returned : int
+
+    The row counts of the answers stored in the data folders subfolders (see
+    ref_answers.py) are added, and take precedence.
     """
     d = dict(
         {
@@ -648,4 +658,5 @@ def tpcds_ref_n_rows_returned():
             (10, 103): 100,
         }
     )
+    d.update(stored_n_rows_returned(subfolders))
     return d
@@ -0,0 +1,206 @@
+"""
+TPC-H refresh functions and data maintenance benchmark.
+
+A refresh set is generated from a dbgen slice: with children=1000, the step i
+of dbgen holds SF * 1500 orders and their lineitems, the size of the TPC-H
+refresh sets. RF1 inserts these orders and lineitems with new order keys
+(shifted beyond the largest key of the dataset), RF2 deletes the orders of
+the slice and their lineitems, which are part of the dataset.
+
+The refresh functions modify a copy of the engine data (see
+EngineAdapter.copy_dataset), on which the queries are timed before and after
+the refresh sets.
+"""
+
+import os
+from time import perf_counter
+
+import duckdb
+import pandas as pd
+
+from bench_tools import run_queries
+from misc import find_table_files, parse_folder_name
+
+REFRESH_DIR_NAME = "refresh"
+REFRESH_CHILDREN = 1000
+
+
+def refresh_set_paths(folder_path, refresh_set):
+    """Parquet files of a refresh set of a data folder."""
+    refresh_dir_path = os.path.join(folder_path, REFRESH_DIR_NAME)
+    return {
+        "rf1_orders": os.path.join(
+            refresh_dir_path, f"rf1_orders_{refresh_set}.parquet"
+        ),
+        "rf1_lineitem": os.path.join(
+            refresh_dir_path, f"rf1_lineitem_{refresh_set}.parquet"
+        ),
+        "rf2_orderkeys": os.path.join(
+            refresh_dir_path, f"rf2_orderkeys_{refresh_set}.parquet"
+        ),
+    }
+
+
+def generate_refresh_sets(folder_path, logger, n_sets=1):
+    """
+    Generate the missing refresh sets of a TPC-H data folder, in its refresh
+    subfolder.
+
+    Parameters
+    ----------
+    folder_path : str
+        Data folder path, e.g. ".../tpch_10", with the orders Parquet files.
+    logger : loguru.logger
+    n_sets : int
+        Number of refresh sets, each one from its own dbgen slice.
+    """
+    assert 1 <= n_sets <= REFRESH_CHILDREN
+    _, scale_factor = parse_folder_name(folder_path)
+    os.makedirs(os.path.join(folder_path, REFRESH_DIR_NAME), exist_ok=True)
+    orders_files = find_table_files(folder_path, "parquet")["orders"]
+    with duckdb.connect() as con:
+        # the new order keys are beyond the largest key of the dataset
+        (offset,) = con.sql(
+            f"SELECT max(o_orderkey) FROM read_parquet({orders_files})"
+        ).fetchone()
+
+    for refresh_set in range(n_sets):
+        paths = refresh_set_paths(folder_path, refresh_set)
+        if all(os.path.isfile(path) for path in paths.values()):
+            continue
+        logger.info(f"Generate the refresh set {refresh_set}")
+        with duckdb.connect() as con:
+            _ = con.sql("INSTALL tpch")
+            _ = con.sql("LOAD tpch")
+            _ = con.sql(
+                f"CALL dbgen(sf={scale_factor}, children={REFRESH_CHILDREN}, "
+                + f"step={refresh_set})"
+            )
+            _ = con.sql(f"""COPY (SELECT * REPLACE (o_orderkey + {offset} AS o_orderkey)
+                FROM orders) TO '{paths["rf1_orders"]}' (FORMAT PARQUET)""")
+            _ = con.sql(f"""COPY (SELECT * REPLACE (l_orderkey + {offset} AS l_orderkey)
+                FROM lineitem) TO '{paths["rf1_lineitem"]}' (FORMAT PARQUET)""")
+            _ = con.sql(f"""COPY (SELECT o_orderkey FROM orders)
+                TO '{paths["rf2_orderkeys"]}' (FORMAT PARQUET)""")
+            n_orders = con.sql("SELECT count(*) FROM orders").fetchone()[0]
+        logger.info(f"{n_orders:>12d} orders")
+
+
+def run_refresh_functions(adapter, folder_path, copy_folder_path, refresh_set, logger):
+    """
+    Run RF1, then RF2, of a refresh set on the connected adapter.
+
+    Returns
+    -------
+    list: one timing record per refresh function, with its status, number of
+    inserted or deleted rows (n_rows) and elapsed time.
+    """
+    _, scale_factor = parse_folder_name(copy_folder_path)
+    paths = refresh_set_paths(folder_path, refresh_set)
+    functions = {
+        "RF1": (
+            ("insert_rows", "orders", paths["rf1_orders"]),
+            ("insert_rows", "lineitem", paths["rf1_lineitem"]),
+        ),
+        "RF2": (
+            ("delete_rows", "lineitem", "l_orderkey", paths["rf2_orderkeys"]),
+            ("delete_rows", "orders", "o_orderkey", paths["rf2_orderkeys"]),
+        ),
+    }
+    records = []
+    for function, operations in functions.items():
+        start_time_s = perf_counter()
+        n_rows = 0
+        try:
+            for method, *operation_args in operations:
+                n_rows += getattr(adapter, method)(*operation_args)
+            status = "ok"
+        except Exception as e:
+            logger.error(f"{function} of the refresh set {refresh_set} : {e}")
+            status = adapter.failure_status(e)
+        elapsed_time_s = perf_counter() - start_time_s
+        logger.info(
+            f"{function} of the refresh set {refresh_set} : {n_rows} rows, "
+            + f"elapsed time (s) : {elapsed_time_s:10.3f}"
+        )
+        records.append(
+            {
+                "engine": adapter.engine,
+                "file_type": adapter.file_type,
+                "scale_factor": scale_factor,
+                "function": function,
+                "refresh_set": refresh_set,
+                "status": status,
+                "n_rows": n_rows,
+                "elapsed_time_s": elapsed_time_s if status == "ok" else float("nan"),
+            }
+        )
+    return records
+
+
+def run_refresh_benchmark(
+    adapter, folder_path, queries, work_dir_path, logger, n_sets=1, **kwargs
+):
+    """
+    Time the queries on a copy of the engine data, the refresh functions of
+    n_sets refresh sets, then the queries again on the modified data.
+
+    Parameters
+    ----------
+    adapter : engine_adapters.EngineAdapter
+        An adapter implementing copy_dataset, insert_rows and delete_rows.
+    folder_path : str
+        Data folder path, e.g. ".../tpch_10", with its refresh sets.
+    queries : str
+        The queries text.
+    work_dir_path : str
+        Directory of the copy, named tpch_refresh_<scale factor>, which is
+        removed at the end.
+    logger : loguru.logger
+    n_sets : int
+        Number of refresh sets.
+    **kwargs
+        Passed to bench_tools.run_queries, e.g. repetitions.
+
+    Returns
+    -------
+    (pd.DataFrame, pd.DataFrame): the refresh function records, and the
+    query timings with their phase, "before" or "after" the refresh sets.
+    """
+    folder_name = os.path.basename(os.path.normpath(folder_path))
+    tpc_name, _ = parse_folder_name(folder_path)
+    copy_folder_path = os.path.join(
+        work_dir_path, folder_name.replace(tpc_name + "_", tpc_name + "_refresh_", 1)
+    )
+    os.makedirs(copy_folder_path, exist_ok=False)
+    try:
+        logger.info(f"Copy the {adapter.engine} data to {copy_folder_path}")
+        adapter.copy_dataset(folder_path, copy_folder_path)
+        timings = [
+            run_queries(adapter, [copy_folder_path], queries, logger, **kwargs).assign(
+                phase="before"
+            )
+        ]
+
+        refresh_records = []
+        adapter.connect(copy_folder_path)
+        try:
+            if adapter.file_extension is not None:
+                adapter.register_tables(
+                    find_table_files(copy_folder_path, adapter.file_extension)
+                )
+            for refresh_set in range(n_sets):
+                refresh_records += run_refresh_functions(
+                    adapter, folder_path, copy_folder_path, refresh_set, logger
+                )
+        finally:
+            adapter.close()
+
+        timings.append(
+            run_queries(adapter, [copy_folder_path], queries, logger, **kwargs).assign(
+                phase="after"
+            )
+        )
+    finally:
+        adapter.remove_dataset_copy(copy_folder_path)
+    return pd.DataFrame(refresh_records), pd.concat(timings, ignore_index=True)
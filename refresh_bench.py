@@ -0,0 +1,173 @@
+"""
+TPC-H data maintenance benchmark: the refresh functions RF1 (insert) and RF2
+(delete) on a copy of the engine data, and the queries timed before and after
+them, see refresh.py.
+
+Example:
+$ python refresh_bench.py -d /home/francois/Data/dbbenchdata -n 2 -e duckdb_on_duckdb hyper_on_hyper
+"""
+
+import datetime
+import os
+import sys
+from argparse import ArgumentParser
+
+import pandas as pd
+from loguru import logger
+
+from matrix_bench import ADAPTERS
+from misc import check_n_returned_rows, find_subfolders_with_prefix, summarize_timings
+from ref_row_count import tpch_ref_n_rows_returned
+from refresh import generate_refresh_sets, run_refresh_benchmark
+from tpch_queries import sql
+
+REFRESH_ENGINES = (
+    "duckdb_on_duckdb",
+    "hyper_on_hyper",
+    "duckdb_on_lance",
+    "postgresql",
+)
+
+if __name__ == "__main__":
+    # logger
+    fmt = (
+        "[<g>{time:YYYY-MM-DD HH:mm:ss.SSSZ}</g> :: <c>{level}</c> ::"
+        + " <e>{process.id}</e>] {message}"
+    )
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        level="DEBUG",
+        backtrace=True,
+        diagnose=True,
+        format=fmt,
+        enqueue=True,
+    )
+
+    # argument parser
+    parser = ArgumentParser(
+        description="Command line interface to the TPC-H data maintenance benchmark"
+    )
+    _ = parser.add_argument(
+        "-d",
+        "--data_dir",
+        dest="data_dir_path",
+        help="Data dir path",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=os.getcwd(),
+    )
+    _ = parser.add_argument(
+        "-o",
+        "--output",
+        dest="output_dir",
+        help="output directory path",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=os.path.join(
+            os.getcwd(),
+            "results",
+            datetime.datetime.now().replace(microsecond=0).isoformat(),
+        ),
+    )
+    _ = parser.add_argument(
+        "-e",
+        "--engines",
+        dest="engines",
+        help="engines to test",
+        choices=REFRESH_ENGINES,
+        nargs="+",
+        required=False,
+        default=["duckdb_on_duckdb", "hyper_on_hyper"],
+    )
+    _ = parser.add_argument(
+        "-n",
+        "--n_sets",
+        dest="n_sets",
+        help="number of refresh sets, each one running RF1 then RF2",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=1,
+    )
+    _ = parser.add_argument(
+        "-r",
+        "--repetitions",
+        dest="repetitions",
+        help="number of timed runs of each query, before and after the refresh sets",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=1,
+    )
+    _ = parser.add_argument(
+        "--work_dir",
+        dest="work_dir_path",
+        help="directory of the modified data copies, the output directory by default",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    args = parser.parse_args()
+    data_dir_path = os.path.abspath(args.data_dir_path)
+    logger.info(f"data dir path : {data_dir_path}")
+    logger.info(f"output dir path : {args.output_dir}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    work_dir_path = args.work_dir_path
+    if work_dir_path is None:
+        work_dir_path = args.output_dir
+    os.makedirs(work_dir_path, exist_ok=True)
+
+    tpch_subfolders = find_subfolders_with_prefix(data_dir_path, "tpch_")
+    for folder_path in tpch_subfolders:
+        generate_refresh_sets(folder_path, logger, args.n_sets)
+
+    refreshes, timings = [], []
+    for engine in args.engines:
+        for folder_path in tpch_subfolders:
+            refresh_df, timings_df = run_refresh_benchmark(
+                ADAPTERS[engine](),
+                folder_path,
+                sql,
+                work_dir_path,
+                logger,
+                n_sets=args.n_sets,
+                repetitions=args.repetitions,
+            )
+            refreshes.append(refresh_df)
+            timings.append(timings_df)
+
+    refresh_df = pd.concat(refreshes, ignore_index=True)
+    refresh_df.to_csv(os.path.join(args.output_dir, "refresh.csv"), index=False)
+    df = pd.concat(timings, ignore_index=True)
+    # the reference row counts are those of the unmodified data
+    checked = check_n_returned_rows(
+        df[df["phase"] == "before"].copy(),
+        tpch_ref_n_rows_returned(tpch_subfolders),
+        logger,
+    )
+    df.loc[checked.index, "status"] = checked["status"]
+    df.to_csv(os.path.join(args.output_dir, "refresh_timings.csv"), index=False)
+
+    # query slowdown after the refresh sets
+    keys = ["engine", "file_type", "scale_factor", "query"]
+    before, after = [
+        summarize_timings(df[df["phase"] == phase])[keys + ["elapsed_time_s"]]
+        for phase in ("before", "after")
+    ]
+    degradation = before.merge(after, on=keys, suffixes=("_before", "_after"))
+    degradation["slowdown"] = (
+        degradation["elapsed_time_s_after"] / degradation["elapsed_time_s_before"]
+    )
+    degradation.to_csv(
+        os.path.join(args.output_dir, "refresh_degradation.csv"), index=False
+    )
+    for row in refresh_df.itertuples():
+        logger.info(
+            f"{row.engine} / .{row.file_type} - scale factor : {row.scale_factor}, "
+            + f"{row.function} {row.refresh_set} : {row.status}, "
+            + f"{row.n_rows} rows, {row.elapsed_time_s:.3f} s"
+        )
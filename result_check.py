@@ -0,0 +1,346 @@
+"""
+Content-level validation of the query results with fingerprints.
+
+The fingerprint of a result is computed on its Arrow record batches, as they
+are fetched, without converting them to Python objects or pandas. It is
+insensitive to the order of the rows and tolerant to the floating point
+differences between the engines:
+
+- the numeric columns (integer, floating point and decimal) are summed, with
+  the sum of their absolute values and of their squares, and compared within
+  a tolerance, only relative if both columns are integer ones,
+- the other columns (strings, dates, booleans...) are hashed value by value,
+  the hashes being summed modulo 2**64, and compared exactly,
+- the hashes of the non-numeric values of each row are combined into a row
+  hash, summed likewise, so that values paired with the wrong keys are caught,
+- the row count and the null count of each column are compared exactly.
+
+The dates and the timestamps are hashed as microseconds since the epoch, so
+that a date returned as a timestamp at midnight matches. An empty result
+fetched without any batch, hence without columns, is only compared by its row
+count.
+
+The columns are compared by position, their names varying between the
+engines. The reference fingerprints are computed from the reference answers
+stored next to the data, see ref_answers.py.
+"""
+
+import json
+from contextlib import contextmanager
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# tolerance of the numeric values: relative, and absolute for the results
+# rounded to the cent
+REL_TOL = 1e-6
+ABS_TOL = 0.01
+
+_C1 = np.uint64(0xBF58476D1CE4E5B9)
+_C2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = 0x9E3779B97F4A7C15
+_NULL_HASH = np.uint64(0x5BD1E9955BD1E995)
+_MODULUS = 2**64
+_MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+def _mix(h):
+    """splitmix64 finalizer of an uint64 array."""
+    h = (h ^ (h >> np.uint64(30))) * _C1
+    h = (h ^ (h >> np.uint64(27))) * _C2
+    return h ^ (h >> np.uint64(31))
+
+
+def _integer_hashes(values):
+    return _mix(values.astype(np.int64).view(np.uint64) + np.uint64(_GOLDEN))
+
+
+def _binary_hashes(array):
+    """Hashes of the values of a large_binary array, from its buffers."""
+    _, offsets_buffer, data_buffer = array.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=np.int64)[
+        array.offset : array.offset + len(array) + 1
+    ]
+    lengths = np.diff(offsets)
+    data = np.zeros(0, dtype=np.uint8)
+    if data_buffer is not None:
+        data = np.frombuffer(data_buffer, dtype=np.uint8)
+    data = data[offsets[0] : offsets[-1]].astype(np.uint64)
+    # each byte is hashed with its position in its value, the hashes of the
+    # bytes of a value being summed with the cumulative sum differences
+    positions = np.arange(len(data), dtype=np.int64) - np.repeat(
+        offsets[:-1] - offsets[0], lengths
+    )
+    byte_hashes = _mix(data + (positions.astype(np.uint64) << np.uint64(8)))
+    sums = np.concatenate([[np.uint64(0)], np.cumsum(byte_hashes, dtype=np.uint64)])
+    starts = offsets[:-1] - offsets[0]
+    return _mix(sums[starts + lengths] - sums[starts] + lengths.astype(np.uint64))
+
+
+def column_kind(data_type):
+    """
+    Kind of a column: "integer" or "numeric" for the columns compared with a
+    tolerance, else "hash".
+    """
+    if pa.types.is_integer(data_type):
+        return "integer"
+    if pa.types.is_floating(data_type) or pa.types.is_decimal(data_type):
+        return "numeric"
+    return "hash"
+
+
+def value_hashes(array):
+    """
+    uint64 hashes of the values of an Arrow array, the null values having a
+    fixed hash.
+    """
+    if pa.types.is_dictionary(array.type):
+        array = array.dictionary_decode()
+    data_type = array.type
+    if pa.types.is_null(data_type):
+        return np.full(len(array), _NULL_HASH, dtype=np.uint64)
+    if pa.types.is_boolean(data_type):
+        values = np.asarray(pc.fill_null(array, False).to_numpy(zero_copy_only=False))
+        hashes = _integer_hashes(values)
+    elif pa.types.is_date(data_type):
+        days = pc.fill_null(array.cast(pa.date32()), 0).cast(pa.int32()).to_numpy()
+        # the microseconds of the timestamp at midnight
+        hashes = _integer_hashes(days.astype(np.int64) * _MICROSECONDS_PER_DAY)
+    elif pa.types.is_timestamp(data_type):
+        array = array.cast(pa.timestamp("us", data_type.tz))
+        hashes = _integer_hashes(pc.fill_null(array.cast(pa.int64()), 0).to_numpy())
+    elif pa.types.is_time(data_type):
+        array = array.cast(pa.time64("us"))
+        hashes = _integer_hashes(pc.fill_null(array.cast(pa.int64()), 0).to_numpy())
+    elif pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type):
+        hashes = _binary_hashes(array.cast(pa.large_binary()))
+    else:
+        # strings and the other types, by their text
+        hashes = _binary_hashes(array.cast(pa.large_string()).cast(pa.large_binary()))
+    if array.null_count > 0:
+        valid = np.asarray(array.is_valid().to_numpy(zero_copy_only=False))
+        hashes = np.where(valid, hashes, _NULL_HASH)
+    return hashes
+
+
+class ResultFingerprint:
+    """
+    Order-insensitive fingerprint of a query result, updated with its Arrow
+    record batches (see EngineAdapter.fetch).
+
+    Attributes
+    ----------
+    time_s : float
+        Time spent computing the fingerprint, excluded from the phase times
+        by bench_tools.timed_run.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.columns = None
+        self.row_hash = 0
+        self.time_s = 0.0
+
+    @contextmanager
+    def timing(self):
+        """Add the time of the block to time_s, e.g. to read the result."""
+        start_s = perf_counter()
+        try:
+            yield
+        finally:
+            self.time_s += perf_counter() - start_s
+
+    def update(self, data):
+        """Add the rows of an Arrow record batch or table."""
+        with self.timing():
+            if self.columns is None:
+                self.columns = [
+                    {
+                        "kind": column_kind(field.type),
+                        "n_nulls": 0,
+                        "hash": 0,
+                        "sum": 0.0,
+                        "sum_abs": 0.0,
+                        "sum_squares": 0.0,
+                    }
+                    for field in data.schema
+                ]
+            batches = data.to_batches() if isinstance(data, pa.Table) else [data]
+            for batch in batches:
+                self._update_batch(batch)
+
+    def _update_batch(self, batch):
+        self.n_rows += batch.num_rows
+        row_hashes = np.zeros(batch.num_rows, dtype=np.uint64)
+        for i, (column, array) in enumerate(zip(self.columns, batch.columns)):
+            column["n_nulls"] += array.null_count
+            if column["kind"] != "hash":
+                values = pc.drop_null(array).cast(pa.float64()).to_numpy()
+                column["sum"] += float(values.sum())
+                column["sum_abs"] += float(np.abs(values).sum())
+                column["sum_squares"] += float(np.square(values).sum())
+                continue
+            # the null values are counted apart, their hashes being constant
+            hashes = value_hashes(array)
+            column["hash"] = (
+                column["hash"] + int(np.sum(hashes, dtype=np.uint64))
+            ) % _MODULUS
+            # the hashes of the values are salted with their column position
+            row_hashes += _mix(hashes + np.uint64((i + 1) * _GOLDEN % _MODULUS))
+        self.row_hash = (
+            self.row_hash + int(np.sum(_mix(row_hashes), dtype=np.uint64))
+        ) % _MODULUS
+
+    def to_dict(self):
+        """JSON-serializable fingerprint, the hashes as hexadecimal strings."""
+        columns = []
+        for column in self.columns or []:
+            if column["kind"] != "hash":
+                keys = ("kind", "n_nulls", "sum", "sum_abs", "sum_squares")
+                columns.append({key: column[key] for key in keys})
+            else:
+                columns.append(
+                    {
+                        "kind": column["kind"],
+                        "n_nulls": column["n_nulls"],
+                        "hash": f"{column['hash']:016x}",
+                    }
+                )
+        return {
+            "n_rows": self.n_rows,
+            "row_hash": f"{self.row_hash:016x}",
+            "columns": columns,
+        }
+
+
+def fingerprint_table(table):
+    """Fingerprint dict of an Arrow table."""
+    fingerprint = ResultFingerprint()
+    fingerprint.update(table)
+    return fingerprint.to_dict()
+
+
+def _close(value, ref_value, tolerance):
+    if np.isnan(value) or np.isnan(ref_value):
+        return np.isnan(value) and np.isnan(ref_value)
+    return abs(value - ref_value) <= tolerance
+
+
+def compare_fingerprints(
+    fingerprint, ref_fingerprint, rel_tol=REL_TOL, abs_tol=ABS_TOL
+):
+    """
+    Compare a result fingerprint with the reference one.
+
+    The sums of a numeric column match if they differ by less than what each
+    value may differ by, abs_tol + rel_tol * |value|, summed over the rows,
+    abs_tol being 0 if both columns are integer ones.
+
+    Returns
+    -------
+    list: the differences, as messages, empty if the fingerprints match.
+    """
+    if fingerprint["n_rows"] != ref_fingerprint["n_rows"]:
+        return [f"{fingerprint['n_rows']} rows instead of {ref_fingerprint['n_rows']}"]
+    if len(fingerprint["columns"]) == 0:
+        # an empty result without batches, e.g. from a Datafusion stream
+        return []
+    if len(fingerprint["columns"]) != len(ref_fingerprint["columns"]):
+        return [
+            f"{len(fingerprint['columns'])} columns instead of "
+            + f"{len(ref_fingerprint['columns'])}"
+        ]
+    n_rows = fingerprint["n_rows"]
+    differences = []
+    for i, (column, ref_column) in enumerate(
+        zip(fingerprint["columns"], ref_fingerprint["columns"])
+    ):
+        name = f"column {i + 1}"
+        if column["n_nulls"] != ref_column["n_nulls"]:
+            differences.append(
+                f"{name} : {column['n_nulls']} nulls instead of "
+                + f"{ref_column['n_nulls']}"
+            )
+        elif column["n_nulls"] == n_rows:
+            # only nulls, whatever the type
+            continue
+        elif (column["kind"] == "hash") != (ref_column["kind"] == "hash"):
+            differences.append(
+                f"{name} : {column['kind']} values instead of {ref_column['kind']}"
+            )
+        elif column["kind"] == "hash":
+            if column["hash"] != ref_column["hash"]:
+                differences.append(f"{name} : different values")
+        else:
+            n_values = n_rows - column["n_nulls"]
+            value_tol = abs_tol
+            if column["kind"] == ref_column["kind"] == "integer":
+                value_tol = 0.0
+            sum_abs = max(column["sum_abs"], ref_column["sum_abs"])
+            sum_tolerance = n_values * value_tol + rel_tol * sum_abs
+            squares_tolerance = (
+                2.0 * (value_tol * sum_abs + rel_tol * ref_column["sum_squares"])
+                + n_values * value_tol**2
+            )
+            if not _close(column["sum"], ref_column["sum"], sum_tolerance):
+                differences.append(
+                    f"{name} : sum {column['sum']} instead of {ref_column['sum']}"
+                )
+            elif not _close(
+                column["sum_squares"], ref_column["sum_squares"], squares_tolerance
+            ):
+                differences.append(f"{name} : different values, same sum")
+    if (len(differences) == 0) and (
+        fingerprint["row_hash"] != ref_fingerprint["row_hash"]
+    ):
+        differences.append("the values are paired differently in the rows")
+    return differences
+
+
+def check_result_fingerprints(
+    df, ref_fingerprints, logger, rel_tol=REL_TOL, abs_tol=ABS_TOL
+):
+    """
+    Set the status of the successful runs whose result fingerprint differs
+    from the reference one to "wrong_result".
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Timings with one row per query and repetition, the fingerprints as
+        JSON in the result_fingerprint column (see bench_tools.run_queries).
+    ref_fingerprints : dict
+        (scale_factor, query) -> reference fingerprint, see
+        ref_answers.load_ref_fingerprints. The runs without reference fingerprint or
+        without fingerprint, and the runs with drawn substitution parameters
+        (param_seed), are not checked.
+    logger : loguru.logger
+
+    Returns
+    -------
+    pd.DataFrame: the timings, modified in place.
+    """
+    if "result_fingerprint" not in df:
+        return df
+    for row in df.itertuples():
+        key = (float(row.scale_factor), int(row.query))
+        if (key not in ref_fingerprints) or (row.status != "ok"):
+            continue
+        if pd.isna(row.result_fingerprint):
+            continue
+        if not pd.isna(getattr(row, "param_seed", np.nan)):
+            continue
+        differences = compare_fingerprints(
+            json.loads(row.result_fingerprint), ref_fingerprints[key], rel_tol, abs_tol
+        )
+        if len(differences) > 0:
+            logger.error(
+                f"Wrong result! engine : {row.engine}, file type : {row.file_type}, "
+                + f"scale factor : {row.scale_factor}, query : {row.query}, "
+                + f"repetition : {row.repetition} : {'; '.join(differences)}"
+            )
+            df.loc[row.Index, "status"] = "wrong_result"
+    return df
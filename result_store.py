@@ -0,0 +1,92 @@
+"""
+Crash-safe storage of the timing records.
+
+Each record is appended to a JSON Lines file and synced to disk as soon as its
+run finishes, so that an interrupted benchmark keeps its results and can be
+resumed without running again the recorded (engine, file type, scale factor,
+query, repetition) combinations.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from misc import SETTING_KEYS, TIMING_KEYS
+
+RESUME_KEYS = TIMING_KEYS + SETTING_KEYS + ["repetition"]
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def resume_key(record):
+    """Key of a record, the settings absent from the record being None."""
+    return tuple(
+        None if _is_missing(record.get(key)) else record.get(key) for key in RESUME_KEYS
+    )
+
+
+class ResultStore:
+    """
+    Timing records stored in a JSON Lines file, one record per line.
+
+    Parameters
+    ----------
+    file_path : str
+        Path of the JSONL file, created on the first append.
+    common_fields : dict, optional
+        Fields added to each appended record, e.g. the config fingerprint of
+        the run manifest.
+    """
+
+    def __init__(self, file_path, common_fields=None):
+        self.file_path = file_path
+        self.common_fields = {} if common_fields is None else common_fields
+
+    def load(self):
+        """The stored records. A line truncated by a crash is ignored."""
+        records = []
+        if not os.path.isfile(self.file_path):
+            return records
+        with open(self.file_path) as jsonl_file:
+            for line in jsonl_file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    pass
+        return records
+
+    def append(self, record):
+        record = {**record, **self.common_fields}
+        line = json.dumps(record, default=_json_default) + "\n"
+        if os.path.isfile(self.file_path) and (os.path.getsize(self.file_path) > 0):
+            with open(self.file_path, "rb") as jsonl_file:
+                _ = jsonl_file.seek(-1, os.SEEK_END)
+                if jsonl_file.read(1) != b"\n":
+                    # end the line truncated by a crash
+                    line = "\n" + line
+        with open(self.file_path, "a") as jsonl_file:
+            jsonl_file.write(line)
+            jsonl_file.flush()
+            os.fsync(jsonl_file.fileno())
+
+    def recorded_statuses(self):
+        """dict: resume_key -> status of the stored records."""
+        return {resume_key(record): record["status"] for record in self.load()}
+
+    def dataframe(self):
+        return pd.DataFrame(self.load())
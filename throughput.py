@@ -0,0 +1,244 @@
+"""
+TPC-H power and throughput tests.
+
+The power test runs the queries one at a time, in the order of the stream 0
+of the TPC-H specification (Appendix A). The throughput test runs S query
+streams concurrently, each one on its own connection to the same engine
+(see EngineAdapter.open_stream) and in the order of its stream number. The
+composite metric follows the TPC-H QphH@Size definition without the refresh
+functions:
+
+    Power@Size      = 3600 * SF / geometric mean of the power test query times
+    Throughput@Size = S * 22 * 3600 / Ts * SF, Ts the throughput test time
+    QphH@Size       = sqrt(Power@Size * Throughput@Size)
+
+With a parameter seed, each stream runs the queries with its own TPC-H
+substitution parameters, drawn from the seed and the stream number, as in the
+specification, instead of the validation parameters.
+"""
+
+import json
+import threading
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from bench_tools import timed_run, timing_record
+from misc import find_table_files, parse_folder_name
+from tpch_params import generate_params
+
+# query orders of the streams 0 (power test) to 10, TPC-H Appendix A
+STREAM_PERMUTATIONS = (
+    (14, 2, 9, 20, 6, 17, 18, 8, 21, 13, 3, 22, 16, 4, 11, 15, 1, 10, 19, 5, 7, 12),
+    (21, 3, 18, 5, 11, 7, 6, 20, 17, 12, 16, 15, 13, 10, 2, 8, 14, 19, 9, 22, 1, 4),
+    (6, 17, 14, 16, 19, 10, 9, 2, 15, 8, 5, 22, 12, 7, 13, 18, 1, 4, 20, 3, 11, 21),
+    (8, 5, 4, 6, 17, 7, 1, 18, 22, 14, 9, 10, 15, 11, 20, 2, 21, 19, 13, 16, 12, 3),
+    (5, 21, 14, 19, 15, 17, 12, 6, 4, 9, 8, 16, 11, 2, 10, 18, 1, 13, 7, 22, 3, 20),
+    (21, 15, 4, 6, 7, 16, 19, 18, 14, 22, 11, 13, 3, 1, 2, 5, 8, 20, 12, 17, 10, 9),
+    (10, 3, 15, 13, 6, 8, 9, 7, 4, 11, 22, 18, 12, 1, 5, 16, 2, 14, 19, 20, 17, 21),
+    (18, 8, 20, 21, 2, 4, 22, 17, 1, 11, 9, 19, 3, 13, 5, 7, 10, 16, 6, 14, 15, 12),
+    (19, 1, 15, 17, 5, 8, 9, 12, 14, 7, 4, 3, 20, 16, 6, 22, 10, 13, 2, 21, 18, 11),
+    (8, 13, 2, 20, 17, 3, 6, 21, 18, 11, 19, 10, 15, 4, 22, 1, 7, 12, 9, 14, 5, 16),
+    (6, 15, 18, 17, 12, 1, 7, 2, 22, 13, 21, 10, 14, 9, 3, 16, 20, 19, 11, 4, 8, 5),
+)
+
+
+def stream_query_order(stream, query_count):
+    """
+    Query numbers of a stream, in their execution order: the TPC-H order for
+    the 22 TPC-H queries and the streams 0 to 10, else a permutation seeded
+    by the stream number.
+    """
+    if (query_count == 22) and (stream < len(STREAM_PERMUTATIONS)):
+        return list(STREAM_PERMUTATIONS[stream])
+    rng = np.random.default_rng(stream)
+    return [int(n) + 1 for n in rng.permutation(query_count)]
+
+
+def run_stream(
+    adapter, queries, stream, test, scale_factor, start_s, logger, params=None
+):
+    """
+    Run the queries of a stream one after the other, a failing query being
+    recorded and followed by the next one.
+
+    Parameters
+    ----------
+    params : dict, optional
+        The substitution parameters of the queries, written in the records.
+
+    Returns
+    -------
+    list: the timing records, with the stream number, the position of the
+    query in the stream, and its start and end times from start_s.
+    """
+    records = []
+    order = stream_query_order(stream, len(queries))
+    for position, query_number in enumerate(order):
+        query_start_s = perf_counter()
+        try:
+            phases = timed_run(adapter, queries[query_number - 1])
+            status = "ok"
+        except Exception as e:
+            logger.error(f"stream {stream}, query {query_number} : {e}")
+            phases = {}
+            status = adapter.failure_status(e)
+        if params is not None:
+            phases["params"] = json.dumps(params[query_number], default=str)
+        records.append(
+            timing_record(
+                adapter,
+                scale_factor,
+                query_number,
+                status,
+                test=test,
+                stream=stream,
+                position=position + 1,
+                start_time_s=query_start_s - start_s,
+                end_time_s=perf_counter() - start_s,
+                **phases,
+            )
+        )
+    logger.info(
+        f"{test} test stream {stream} elapsed time (s) : "
+        + f"{perf_counter() - start_s:10.3f}"
+    )
+    return records
+
+
+def run_throughput_test(
+    adapter, folder_path, queries, n_streams, logger, power=True, param_seed=None
+):
+    """
+    Run the power test, then the throughput test, on a data folder.
+
+    Parameters
+    ----------
+    adapter : engine_adapters.EngineAdapter
+        An adapter implementing open_stream.
+    folder_path : str
+        Data folder path, e.g. ".../tpch_10".
+    queries : str
+        The queries text.
+    n_streams : int
+        Number of concurrent streams S of the throughput test, numbered from 1.
+    logger : loguru.logger
+    power : bool
+        Run the power test (stream 0) before the throughput test.
+    param_seed : int, optional
+        Seed of the substitution parameters of the streams, the validation
+        parameters by default.
+
+    Returns
+    -------
+    (pd.DataFrame, dict): the timing records, with their test ("power" or
+    "throughput"), stream and position, and the metrics of the folder:
+    power_size, throughput_size, qphh_size (NaN if a query failed),
+    throughput_time_s (NaN if a stream failed) and the elapsed time of each
+    stream.
+    """
+    _, scale_factor = parse_folder_name(folder_path)
+    adapter.connect(folder_path)
+    if adapter.file_extension is not None:
+        adapter.register_tables(find_table_files(folder_path, adapter.file_extension))
+    # substitution parameters of the streams 0 (power test) to n_streams
+    stream_params = [None] * (n_streams + 1)
+    if param_seed is not None:
+        stream_params = [
+            generate_params([param_seed, stream]) for stream in range(n_streams + 1)
+        ]
+    stream_queries = [
+        adapter.get_queries(queries, scale_factor, params) for params in stream_params
+    ]
+    records = []
+    try:
+        if power:
+            logger.info("power test")
+            records += run_stream(
+                adapter,
+                stream_queries[0],
+                0,
+                "power",
+                scale_factor,
+                perf_counter(),
+                logger,
+                params=stream_params[0],
+            )
+
+        logger.info(f"throughput test : {n_streams} streams")
+        streams = [adapter.open_stream(stream) for stream in range(1, n_streams + 1)]
+        stream_records = [None] * n_streams
+        stream_errors = [None] * n_streams
+        barrier = threading.Barrier(n_streams + 1)
+
+        def run(i):
+            barrier.wait()
+            try:
+                stream_records[i] = run_stream(
+                    streams[i],
+                    stream_queries[i + 1],
+                    i + 1,
+                    "throughput",
+                    scale_factor,
+                    start_s,
+                    logger,
+                    params=stream_params[i + 1],
+                )
+            except Exception as e:
+                logger.exception(f"Error running the stream {i + 1}")
+                stream_errors[i] = e
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(n_streams)]
+        for thread in threads:
+            thread.start()
+        start_s = perf_counter()
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+        throughput_time_s = perf_counter() - start_s
+        for stream_adapter in streams:
+            stream_adapter.close_stream()
+        for stream_record in stream_records:
+            if stream_record is not None:
+                records += stream_record
+        failed_streams = [i + 1 for i, e in enumerate(stream_errors) if e is not None]
+        if len(failed_streams) > 0:
+            # the records of the other streams are kept, without metrics
+            logger.error(f"throughput test : the streams {failed_streams} failed")
+            throughput_time_s = np.nan
+    finally:
+        adapter.close()
+
+    df = pd.DataFrame(records)
+    if param_seed is not None:
+        df["param_seed"] = param_seed
+    metrics = throughput_metrics(df, scale_factor, n_streams, throughput_time_s)
+    return df, metrics
+
+
+def throughput_metrics(df, scale_factor, n_streams, throughput_time_s):
+    """QphH-like metrics of the records of a power and throughput test."""
+    metrics = {
+        "n_streams": n_streams,
+        "throughput_time_s": throughput_time_s,
+        "power_size": np.nan,
+        "throughput_size": np.nan,
+        "qphh_size": np.nan,
+    }
+    throughput = df[df["test"] == "throughput"]
+    for stream, group in throughput.groupby("stream"):
+        metrics[f"stream_{stream}_time_s"] = group["end_time_s"].max()
+    if (throughput["status"] == "ok").all():
+        query_count = throughput["query"].nunique()
+        metrics["throughput_size"] = (
+            n_streams * query_count * 3600.0 / throughput_time_s * scale_factor
+        )
+    power = df[df["test"] == "power"]
+    if (len(power) > 0) and (power["status"] == "ok").all():
+        geometric_mean_s = np.exp(np.log(power["elapsed_time_s"]).mean())
+        metrics["power_size"] = 3600.0 * scale_factor / geometric_mean_s
+        metrics["qphh_size"] = np.sqrt(
+            metrics["power_size"] * metrics["throughput_size"]
+        )
+    return metrics
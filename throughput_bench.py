@@ -0,0 +1,169 @@
+"""
+TPC-H throughput test: the power test followed by S concurrent query streams
+on each tpch_* data folder, see throughput.py.
+
+Example:
+$ python throughput_bench.py -d /home/francois/Data/dbbenchdata -s 4 -e duckdb_on_duckdb hyper_on_hyper
+"""
+
+import datetime
+import os
+import sys
+from argparse import ArgumentParser
+
+import pandas as pd
+from loguru import logger
+
+from matrix_bench import ADAPTERS
+from misc import check_n_returned_rows, find_subfolders_with_prefix
+from ref_row_count import tpch_ref_n_rows_returned
+from throughput import run_throughput_test
+from tpch_queries import sql
+
+STREAM_ENGINES = (
+    "duckdb_on_duckdb",
+    "duckdb_on_parquet",
+    "hyper_on_hyper",
+    "hyper_on_parquet",
+    "datafusion_on_parquet",
+    "postgresql",
+)
+
+if __name__ == "__main__":
+    # logger
+    fmt = (
+        "[<g>{time:YYYY-MM-DD HH:mm:ss.SSSZ}</g> :: <c>{level}</c> ::"
+        + " <e>{process.id}</e>] {message}"
+    )
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        level="DEBUG",
+        backtrace=True,
+        diagnose=True,
+        format=fmt,
+        enqueue=True,
+    )
+
+    # argument parser
+    parser = ArgumentParser(
+        description="Command line interface to the TPC-H throughput test"
+    )
+    _ = parser.add_argument(
+        "-d",
+        "--data_dir",
+        dest="data_dir_path",
+        help="Data dir path",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=os.getcwd(),
+    )
+    _ = parser.add_argument(
+        "-o",
+        "--output",
+        dest="output_dir",
+        help="output directory path",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=os.path.join(
+            os.getcwd(),
+            "results",
+            datetime.datetime.now().replace(microsecond=0).isoformat(),
+        ),
+    )
+    _ = parser.add_argument(
+        "-s",
+        "--streams",
+        dest="n_streams",
+        help="number of concurrent query streams",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=2,
+    )
+    _ = parser.add_argument(
+        "-e",
+        "--engines",
+        dest="engines",
+        help="engines to test",
+        choices=STREAM_ENGINES,
+        nargs="+",
+        required=False,
+        default=["duckdb_on_duckdb", "hyper_on_hyper"],
+    )
+    _ = parser.add_argument(
+        "--no_power",
+        dest="no_power",
+        help="skip the power test, the QphH metric is then not computed",
+        action="store_true",
+    )
+    _ = parser.add_argument(
+        "--param_seed",
+        dest="param_seed",
+        help="seed of the TPC-H substitution parameters of the streams, the "
+        + "validation parameters by default",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "--tmp_dir",
+        dest="tmp_dir_path",
+        help="spill directory of DuckDB, Hyper and Datafusion",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    args = parser.parse_args()
+    assert args.n_streams >= 1
+    data_dir_path = os.path.abspath(args.data_dir_path)
+    logger.info(f"data dir path : {data_dir_path}")
+    logger.info(f"output dir path : {args.output_dir}")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    tpch_subfolders = find_subfolders_with_prefix(data_dir_path, "tpch_")
+    timings, metrics = [], []
+    for engine in args.engines:
+        for folder_path in tpch_subfolders:
+            adapter = ADAPTERS[engine](tmp_dir_path=args.tmp_dir_path)
+            logger.info("==== BEGIN ====")
+            logger.info(
+                f"{adapter.engine} / .{adapter.file_type} - folder : "
+                + f"{os.path.basename(os.path.normpath(folder_path))}"
+            )
+            df, folder_metrics = run_throughput_test(
+                adapter,
+                folder_path,
+                sql,
+                args.n_streams,
+                logger,
+                power=not args.no_power,
+                param_seed=args.param_seed,
+            )
+            timings.append(df)
+            metrics.append(
+                {
+                    "engine": adapter.engine,
+                    "file_type": adapter.file_type,
+                    "scale_factor": df["scale_factor"].iloc[0],
+                    **folder_metrics,
+                }
+            )
+            logger.info(
+                f"Throughput test time (s) : {folder_metrics['throughput_time_s']:10.3f}, "
+                + f"Power@Size : {folder_metrics['power_size']:.1f}, "
+                + f"Throughput@Size : {folder_metrics['throughput_size']:.1f}, "
+                + f"QphH@Size : {folder_metrics['qphh_size']:.1f}"
+            )
+            logger.info("====  END  ====")
+
+    df = pd.concat(timings, ignore_index=True)
+    df = check_n_returned_rows(df, tpch_ref_n_rows_returned(tpch_subfolders), logger)
+    df.to_csv(os.path.join(args.output_dir, "throughput_timings.csv"), index=False)
+    pd.DataFrame(metrics).to_csv(
+        os.path.join(args.output_dir, "throughput_metrics.csv"), index=False
+    )
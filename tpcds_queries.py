@@ -0,0 +1,30 @@
+"""
+TPC-DS queries, taken from the DuckDB tpcds extension (the 99 queries of the
+specification, with the DuckDB dialect adjustments).
+
+The queries are formatted as the TPC-H ones in tpch_queries.py: separated by
+semicolons, each one tagged with a --queryNN comment.
+"""
+
+import duckdb
+
+
+def get_tpcds_sql():
+    """
+    Returns
+    -------
+    str: the 99 TPC-DS queries text.
+    """
+    with duckdb.connect() as con:
+        _ = con.sql("INSTALL tpcds")
+        _ = con.sql("LOAD tpcds")
+        rows = con.sql(
+            "SELECT query_nr, query FROM tpcds_queries() ORDER BY query_nr"
+        ).fetchall()
+    queries = []
+    for query_nr, query in rows:
+        query = query.strip().rstrip(";")
+        # a query of several statements would shift the query numbers
+        assert ";" not in query, f"TPC-DS query {query_nr} has several statements"
+        queries.append(f"--query{query_nr:02d}\n{query}")
+    return ";\n\n".join(queries) + ";\n"
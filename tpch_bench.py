@@ -1,6 +1,11 @@
 """
+TPC-H benchmark, or TPC-DS with -b tpcds: the 99 queries of the DuckDB tpcds
+extension, run on the tpcds_* data folders generated by
+generate_tpcds_data.py.
+
 Example:
 $ python tpch_bench.py -d /home/francois/Data/dbbenchdata -o test.csv
+$ python tpch_bench.py -d /home/francois/Data/dbbenchdata -b tpcds
 """
 
 import os
@@ -11,8 +16,6 @@ from argparse import ArgumentParser
 
 import datafusion
 import duckdb
-import numpy as np
-import pandas as pd
 import tableauhyperapi
 from loguru import logger
 
@@ -27,13 +30,24 @@ from bench_tools import (
     run_queries_datafusion_on_lance,
     run_queries_postgresql,
     run_queries_polars_on_parquet,
+    run_queries_polars_sql_on_parquet,
     run_queries_datafusion_ray_on_parquet,
     run_queries_quokka_on_parquet,
 )
-from tpch_queries import sql
-from ref_row_count import tpch_ref_n_rows_returned
-from misc import find_subfolders_with_prefix, visualize_timings
-
+from failure_registry import FailureRegistry
+from manifest import archive_changed_manifest, collect_manifest, write_manifest
+from matrix_bench import BENCHMARKS
+from profiles import operators_dataframe
+from result_check import check_result_fingerprints
+from result_store import ResultStore
+from ref_answers import load_ref_fingerprints
+from misc import (
+    check_n_returned_rows,
+    find_subfolders_with_prefix,
+    speedup_curves,
+    summarize_timings,
+    visualize_timings,
+)
 
 if __name__ == "__main__":
     # logger
@@ -57,7 +71,9 @@ if __name__ == "__main__":
     logger.info(f"Datafusion      : {datafusion.__version__}")
 
     # argument parser
-    parser = ArgumentParser(description="Command line interface to the TPC-H benchmark")
+    parser = ArgumentParser(
+        description="Command line interface to the TPC-H and TPC-DS benchmarks"
+    )
     _ = parser.add_argument(
         "-d",
         "--data_dir",
@@ -68,6 +84,15 @@ if __name__ == "__main__":
         required=False,
         default=os.getcwd(),
     )
+    _ = parser.add_argument(
+        "-b",
+        "--benchmark",
+        dest="benchmark",
+        help="benchmark run on its data folders, e.g. tpcds on the tpcds_* ones",
+        choices=sorted(BENCHMARKS),
+        required=False,
+        default="tpch",
+    )
     _ = parser.add_argument(
         "-o",
         "--output",
@@ -82,7 +107,177 @@ if __name__ == "__main__":
             datetime.datetime.now().replace(microsecond=0).isoformat(),
         ),
     )
+    _ = parser.add_argument(
+        "-w",
+        "--warmup",
+        dest="warmup",
+        help="number of untimed warm-up runs of each query",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=0,
+    )
+    _ = parser.add_argument(
+        "-r",
+        "--repetitions",
+        dest="repetitions",
+        help="number of timed runs of each query",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=1,
+    )
+    _ = parser.add_argument(
+        "-i",
+        "--isolation",
+        dest="isolation",
+        help="run each data folder ('session') or each query ('query') "
+        + "in a supervised worker process",
+        choices=["session", "query"],
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "-t",
+        "--timeout",
+        dest="timeout_s",
+        help="wall-clock limit of each query run in seconds (requires --isolation)",
+        metavar="NUM",
+        type=float,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "-m",
+        "--memory_ceiling",
+        dest="memory_ceiling_gb",
+        help="memory limit of the worker processes in GB (requires --isolation)",
+        metavar="NUM",
+        type=float,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "-f",
+        "--failure_registry",
+        dest="failure_registry_path",
+        help="JSON file of the failure registry, skipping or retrying the "
+        + "queries that timed out, OOMed or crashed in previous runs",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "--failure_policy",
+        dest="failure_policy",
+        help="skip the registered failures, or retry them with a doubled "
+        + "timeout and memory ceiling",
+        choices=["skip", "retry"],
+        required=False,
+        default="skip",
+    )
+    _ = parser.add_argument(
+        "--sample_interval",
+        dest="sample_interval_s",
+        help="sampling interval of the memory, CPU and I/O usage of the engine "
+        + "processes in seconds, 0 to disable the sampling",
+        metavar="NUM",
+        type=float,
+        required=False,
+        default=0.1,
+    )
+    _ = parser.add_argument(
+        "-c",
+        "--cache_mode",
+        dest="cache_mode",
+        help="cold: evict the dataset files from the page cache before each "
+        + "query run, hot: read them into the page cache before each query",
+        choices=["hot", "cold"],
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "--duckdb_fetch_mode",
+        dest="duckdb_fetch_mode",
+        help="fetch the DuckDB results as streamed Arrow batches, only count "
+        + "their rows, or convert them to pandas",
+        choices=["arrow", "count", "pandas"],
+        required=False,
+        default="arrow",
+    )
+    _ = parser.add_argument(
+        "--hyper_fetch_mode",
+        dest="hyper_fetch_mode",
+        help="export the Hyper results to Parquet, only count their rows, or "
+        + "iterate over their rows in Python",
+        choices=["parquet", "count", "rows"],
+        required=False,
+        default="parquet",
+    )
+    _ = parser.add_argument(
+        "--threads",
+        dest="threads",
+        help="comma-separated thread counts to sweep over, e.g. 1,2,4,8",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "--memory_limit",
+        dest="memory_limit_gb",
+        help="comma-separated memory budgets of the engines in GB to sweep "
+        + "over, e.g. 2,4,8,16",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "--param_seed",
+        dest="param_seed",
+        help="seed of the TPC-H substitution parameters, drawn for each run of "
+        + "a query, the validation parameters by default (TPC-H only)",
+        metavar="INT",
+        type=int,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "--validate",
+        dest="validate",
+        help="compare the fingerprints of the results with the reference ones "
+        + "stored with the data folders (ref_answers)",
+        action="store_true",
+    )
+    _ = parser.add_argument(
+        "--profile",
+        dest="profile",
+        help="run each query once more with the profiling of the engine, and "
+        + "write its native profile to profiles.jsonl and its operators to "
+        + "operators.csv",
+        action="store_true",
+    )
+    _ = parser.add_argument(
+        "--tmp_dir",
+        dest="tmp_dir_path",
+        help="spill directory of DuckDB, Hyper and Datafusion",
+        metavar="TXT",
+        type=str,
+        required=False,
+        default=None,
+    )
+    _ = parser.add_argument(
+        "--resume",
+        dest="resume",
+        help="skip the runs already recorded in the timings.jsonl file of the "
+        + "output directory",
+        action="store_true",
+    )
     args = parser.parse_args()
+    if (args.param_seed is not None) and (args.benchmark != "tpch"):
+        parser.error("--param_seed only applies to the TPC-H benchmark")
     data_dir_path = pathlib.Path(args.data_dir_path).resolve()
     logger.info(f"data dir path : {data_dir_path}")
     logger.info(f"output dir path : {args.output_dir}")
@@ -90,57 +285,150 @@ if __name__ == "__main__":
     os.makedirs(args.output_dir, exist_ok=True)
 
     output_csv = pathlib.Path(os.path.join(args.output_dir, "timings.csv")).resolve()
+    summary_csv = pathlib.Path(
+        os.path.join(args.output_dir, "timings_summary.csv")
+    ).resolve()
 
-    tpch_subfolders = find_subfolders_with_prefix(data_dir_path, "tpch_")
+    timings_jsonl = os.path.join(args.output_dir, "timings.jsonl")
+    if os.path.isfile(timings_jsonl) and not args.resume:
+        raise ValueError(f"{timings_jsonl} already exists, use --resume to complete it")
 
-    df = pd.DataFrame()
-    df_tmp = run_queries_polars_on_parquet(tpch_subfolders, sql, logger)
-    df = pd.concat((df, df_tmp), axis=0)
+    get_sql, ref_n_rows_returned = BENCHMARKS[args.benchmark]
+    sql = get_sql()
+    subfolders = find_subfolders_with_prefix(data_dir_path, args.benchmark + "_")
+    # the output location and the resumption do not change the configuration
+    settings = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("output_dir", "resume")
+    }
+    manifest = collect_manifest(data_dir_path, subfolders, settings)
+    manifest_path = os.path.join(args.output_dir, "run_manifest.json")
+    if args.resume:
+        _ = archive_changed_manifest(manifest, manifest_path, logger)
+    write_manifest(manifest, manifest_path)
+    logger.info(f"config fingerprint : {manifest['config_fingerprint']}")
 
-    df_tmp = run_queries_duckdb_on_duckdb(tpch_subfolders, sql, logger)
-    df = pd.concat((df, df_tmp), axis=0)
+    result_store = ResultStore(
+        timings_jsonl,
+        common_fields={"config_fingerprint": manifest["config_fingerprint"]},
+    )
+    profile_store = None
+    if args.profile:
+        profile_store = ResultStore(
+            os.path.join(args.output_dir, "profiles.jsonl"),
+            common_fields={"config_fingerprint": manifest["config_fingerprint"]},
+        )
+    memory_ceiling = None
+    if args.memory_ceiling_gb is not None:
+        memory_ceiling = int(args.memory_ceiling_gb * 1e9)
+    threads = None
+    if args.threads is not None:
+        threads = [int(n_threads) for n_threads in args.threads.split(",")]
+    memory_limits = None
+    if args.memory_limit_gb is not None:
+        memory_limits = [
+            int(float(memory_limit_gb) * 1e9)
+            for memory_limit_gb in args.memory_limit_gb.split(",")
+        ]
+    if args.tmp_dir_path is not None:
+        os.makedirs(args.tmp_dir_path, exist_ok=True)
+    failure_registry = None
+    if args.failure_registry_path is not None:
+        failure_registry = FailureRegistry(
+            args.failure_registry_path, policy=args.failure_policy
+        )
+        logger.info(f"failure registry : {args.failure_registry_path}")
+    run_kwargs = dict(
+        warmup=args.warmup,
+        repetitions=args.repetitions,
+        isolation=args.isolation,
+        timeout_s=args.timeout_s,
+        memory_ceiling=memory_ceiling,
+        failure_registry=failure_registry,
+        sample_interval_s=(
+            args.sample_interval_s if args.sample_interval_s > 0 else None
+        ),
+        cache_mode=args.cache_mode,
+        threads=threads,
+        memory_limits=memory_limits,
+        result_store=result_store,
+        resume=args.resume,
+        fingerprint=args.validate,
+        profile_store=profile_store,
+        param_seed=args.param_seed,
+    )
 
-    df_tmp = run_queries_duckdb_on_parquet(tpch_subfolders, sql, logger)
-    df = pd.concat((df, df_tmp), axis=0)
+    if args.benchmark == "tpch":
+        _ = run_queries_polars_on_parquet(subfolders, sql, logger, **run_kwargs)
 
-    # df_tmp = run_queries_duckdb_on_lance(tpch_subfolders, sql, logger)
-    # df = pd.concat((df, df_tmp), axis=0)
+    _ = run_queries_duckdb_on_duckdb(
+        subfolders,
+        sql,
+        logger,
+        tmp_dir_path=args.tmp_dir_path,
+        fetch_mode=args.duckdb_fetch_mode,
+        **run_kwargs,
+    )
 
-    df_tmp = run_queries_hyper_on_hyper(tpch_subfolders, sql, logger)
-    df = pd.concat((df, df_tmp), axis=0)
+    _ = run_queries_duckdb_on_parquet(
+        subfolders,
+        sql,
+        logger,
+        tmp_dir_path=args.tmp_dir_path,
+        fetch_mode=args.duckdb_fetch_mode,
+        **run_kwargs,
+    )
 
-    df_tmp = run_queries_hyper_on_parquet(tpch_subfolders, sql, logger)
-    df = pd.concat((df, df_tmp), axis=0)
+    # _ = run_queries_duckdb_on_lance(subfolders, sql, logger, **run_kwargs)
 
-    df_tmp = run_queries_datafusion_on_parquet(tpch_subfolders, sql, logger)
-    df = pd.concat((df, df_tmp), axis=0)
+    _ = run_queries_hyper_on_hyper(
+        subfolders,
+        sql,
+        logger,
+        tmp_dir_path=args.tmp_dir_path,
+        fetch_mode=args.hyper_fetch_mode,
+        **run_kwargs,
+    )
+
+    _ = run_queries_hyper_on_parquet(
+        subfolders,
+        sql,
+        logger,
+        tmp_dir_path=args.tmp_dir_path,
+        fetch_mode=args.hyper_fetch_mode,
+        **run_kwargs,
+    )
+
+    _ = run_queries_datafusion_on_parquet(
+        subfolders, sql, logger, tmp_dir_path=args.tmp_dir_path, **run_kwargs
+    )
 
-    df_tmp = run_queries_ballista_on_parquet(tpch_subfolders, sql, logger)
-    df = pd.concat((df, df_tmp), axis=0)
+    if args.benchmark == "tpch":
+        _ = run_queries_ballista_on_parquet(subfolders, sql, logger, **run_kwargs)
+    else:
+        # the TPC-DS queries have no Polars DataFrame implementation
+        _ = run_queries_polars_sql_on_parquet(subfolders, sql, logger, **run_kwargs)
 
-    # df_tmp = run_queries_quokka_on_parquet(tpch_subfolders, logger)
-    # df = pd.concat((df, df_tmp), axis=0)
+    # _ = run_queries_quokka_on_parquet(subfolders, logger, **run_kwargs)
 
-    # df_tmp = run_queries_datafusion_ray_on_parquet(tpch_subfolders, sql, logger)
-    # df = pd.concat((df, df_tmp), axis=0)
+    # _ = run_queries_datafusion_ray_on_parquet(subfolders, sql, logger, **run_kwargs)
 
-    # df_tmp = run_queries_datafusion_on_lance(tpch_subfolders, sql, logger)
-    # df = pd.concat((df, df_tmp), axis=0)
+    # _ = run_queries_datafusion_on_lance(subfolders, sql, logger, **run_kwargs)
 
-    # df_tmp = run_queries_postgresql(tpch_subfolders, sql, logger)
-    # df = pd.concat((df, df_tmp), axis=0)
+    # _ = run_queries_postgresql(subfolders, sql, logger, **run_kwargs)
 
-    d = tpch_ref_n_rows_returned()
-    for row in df.itertuples():
-        n_returned_rows_ref = d[(int(row.scale_factor), int(row.query))]
-        if (not np.isnan(row.n_returned_rows)) and (
-            n_returned_rows_ref != int(row.n_returned_rows)
-        ):
-            raise ValueError(
-                f"Wrong number of returned rows! engine : {row.engine}, "
-                + f"file type : {row.file_type}, scale factor : {row.scale_factor}, query : {row.query}, "
-                + f"n returned rows : {row.n_returned_rows}, should be : {n_returned_rows_ref}"
-            )
+    df = result_store.dataframe()
+    df = check_n_returned_rows(df, ref_n_rows_returned(subfolders), logger)
+    df = check_result_fingerprints(df, load_ref_fingerprints(subfolders), logger)
 
     df.to_csv(output_csv, index=False)
-    visualize_timings(df, args.output_dir)
+    summary = summarize_timings(df)
+    summary.to_csv(summary_csv, index=False)
+    if (threads is not None) and (len(threads) > 1):
+        speedup_csv = os.path.join(args.output_dir, "speedup.csv")
+        speedup_curves(summary).to_csv(speedup_csv, index=False)
+    if profile_store is not None:
+        operators_csv = os.path.join(args.output_dir, "operators.csv")
+        operators_dataframe(profile_store.load()).to_csv(operators_csv, index=False)
+    visualize_timings(summary, args.output_dir)
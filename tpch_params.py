@@ -0,0 +1,263 @@
+"""
+TPC-H substitution parameters, following the rules of the specification
+(section 2.4, as implemented by qgen).
+
+The parameters of a query are a dict of values named after the specification
+(e.g. SEGMENT and DATE for the query 3), with the derived values the queries
+need (e.g. END_DATE, the end of the date range), so that the SQL text and the
+Polars and Quokka implementations do not compute them. The SQL text refers to
+them with __NAME__ placeholders, see substitute_params.
+
+VALIDATION_PARAMS holds the parameters of the validation queries, used by
+default. generate_params draws a seeded variant of the 22 queries.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+REGIONS = ("AFRICA", "AMERICA", "ASIA", "EUROPE", "MIDDLE EAST")
+# nation name -> region key, by nation key
+NATIONS = {
+    "ALGERIA": 0,
+    "ARGENTINA": 1,
+    "BRAZIL": 1,
+    "CANADA": 1,
+    "EGYPT": 4,
+    "ETHIOPIA": 0,
+    "FRANCE": 3,
+    "GERMANY": 3,
+    "INDIA": 2,
+    "INDONESIA": 2,
+    "IRAN": 4,
+    "IRAQ": 4,
+    "JAPAN": 2,
+    "JORDAN": 4,
+    "KENYA": 0,
+    "MOROCCO": 0,
+    "MOZAMBIQUE": 0,
+    "PERU": 1,
+    "CHINA": 2,
+    "ROMANIA": 3,
+    "SAUDI ARABIA": 4,
+    "VIETNAM": 2,
+    "RUSSIA": 3,
+    "UNITED KINGDOM": 3,
+    "UNITED STATES": 1,
+}
+SEGMENTS = ("AUTOMOBILE", "BUILDING", "FURNITURE", "MACHINERY", "HOUSEHOLD")
+TYPE_SYLLABLES = (
+    ("STANDARD", "SMALL", "MEDIUM", "LARGE", "ECONOMY", "PROMO"),
+    ("ANODIZED", "BURNISHED", "PLATED", "POLISHED", "BRUSHED"),
+    ("TIN", "NICKEL", "BRASS", "STEEL", "COPPER"),
+)
+CONTAINER_SYLLABLES = (
+    ("SM", "LG", "MED", "JUMBO", "WRAP"),
+    ("CASE", "BOX", "BAG", "JAR", "PKG", "PACK", "CAN", "DRUM"),
+)
+SHIP_MODES = ("REG AIR", "AIR", "RAIL", "SHIP", "TRUCK", "MAIL", "FOB")
+# words of the part names
+COLORS = (
+    "almond antique aquamarine azure beige bisque black blanched blue blush "
+    + "brown burlywood burnished chartreuse chiffon chocolate coral cornflower "
+    + "cornsilk cream cyan dark deep dim dodger drab firebrick floral forest "
+    + "frosted gainsboro ghost goldenrod green grey honeydew hot indian ivory "
+    + "khaki lace lavender lawn lemon light lime linen magenta maroon medium "
+    + "metallic midnight mint misty moccasin navajo navy olive orange orchid "
+    + "pale papaya peach peru pink plum powder puff purple red rose rosy royal "
+    + "saddle salmon sandy seashell sienna sky slate smoke snow spring steel "
+    + "tan thistle tomato turquoise violet wheat white yellow"
+).split()
+COMMENT_WORDS = (
+    ("special", "pending", "unusual", "express"),
+    ("packages", "requests", "accounts", "deposits"),
+)
+
+
+def add_months(day, months):
+    """The same day of the month, months later."""
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1)
+
+
+def date_params(start, months):
+    """DATE and END_DATE, the end of a range of a number of months."""
+    return {"DATE": start, "END_DATE": add_months(start, months)}
+
+
+def q1_params(delta):
+    return {"DELTA": delta, "DATE": date(1998, 12, 1) - timedelta(days=delta)}
+
+
+def q6_params(year, discount, quantity):
+    return {
+        **date_params(date(year, 1, 1), 12),
+        "DISCOUNT": discount,
+        "DISCOUNT_LOW": round(discount - 0.01, 2),
+        "DISCOUNT_HIGH": round(discount + 0.01, 2),
+        "QUANTITY": quantity,
+    }
+
+
+VALIDATION_PARAMS = {
+    1: q1_params(90),
+    2: {"SIZE": 15, "TYPE": "BRASS", "REGION": "EUROPE"},
+    3: {"SEGMENT": "BUILDING", "DATE": date(1995, 3, 15)},
+    4: date_params(date(1993, 7, 1), 3),
+    5: {"REGION": "ASIA", **date_params(date(1994, 1, 1), 12)},
+    6: q6_params(1994, 0.06, 24),
+    7: {"NATION1": "FRANCE", "NATION2": "GERMANY"},
+    8: {"NATION": "BRAZIL", "REGION": "AMERICA", "TYPE": "ECONOMY ANODIZED STEEL"},
+    9: {"COLOR": "green"},
+    10: date_params(date(1993, 10, 1), 3),
+    11: {"NATION": "GERMANY"},
+    12: {
+        "SHIPMODE1": "MAIL",
+        "SHIPMODE2": "SHIP",
+        **date_params(date(1994, 1, 1), 12),
+    },
+    13: {"WORD1": "special", "WORD2": "requests"},
+    14: date_params(date(1995, 9, 1), 1),
+    15: date_params(date(1996, 1, 1), 3),
+    16: {
+        "BRAND": "Brand#45",
+        "TYPE": "MEDIUM POLISHED",
+        "SIZES": [49, 14, 23, 45, 19, 3, 36, 9],
+    },
+    17: {"BRAND": "Brand#23", "CONTAINER": "MED BOX"},
+    18: {"QUANTITY": 300},
+    19: {
+        "QUANTITY1": 1,
+        "QUANTITY2": 10,
+        "QUANTITY3": 20,
+        "BRAND1": "Brand#12",
+        "BRAND2": "Brand#23",
+        "BRAND3": "Brand#34",
+    },
+    20: {"COLOR": "forest", "NATION": "CANADA", **date_params(date(1994, 1, 1), 12)},
+    21: {"NATION": "SAUDI ARABIA"},
+    22: {"CODES": ["13", "31", "23", "29", "30", "18", "17"]},
+}
+
+
+def generate_params(seed):
+    """
+    Draw the substitution parameters of the 22 queries.
+
+    Parameters
+    ----------
+    seed : int or list
+        Seed of the draws, e.g. [run seed, stream number], as accepted by
+        numpy.random.default_rng.
+
+    Returns
+    -------
+    dict: query number -> parameters of the query, as VALIDATION_PARAMS.
+    """
+    rng = np.random.default_rng(seed)
+
+    def choice(values, size=None):
+        if size is None:
+            return values[rng.integers(len(values))]
+        return [values[i] for i in rng.choice(len(values), size, replace=False)]
+
+    def integer(low, high):
+        return int(rng.integers(low, high + 1))
+
+    def month(first, last):
+        # first day of a month between first and last, included
+        n_months = (last.year - first.year) * 12 + last.month - first.month
+        return add_months(first, integer(0, n_months))
+
+    def year():
+        return integer(1993, 1997)
+
+    def brand():
+        return f"Brand#{integer(1, 5)}{integer(1, 5)}"
+
+    def part_type(n_syllables):
+        return " ".join(choice(syllables) for syllables in TYPE_SYLLABLES[:n_syllables])
+
+    nations = list(NATIONS)
+    nation8 = choice(nations)
+    return {
+        1: q1_params(integer(60, 120)),
+        2: {
+            "SIZE": integer(1, 50),
+            "TYPE": choice(TYPE_SYLLABLES[2]),
+            "REGION": choice(REGIONS),
+        },
+        3: {
+            "SEGMENT": choice(SEGMENTS),
+            "DATE": date(1995, 3, 1) + timedelta(days=integer(0, 30)),
+        },
+        4: date_params(month(date(1993, 1, 1), date(1997, 10, 1)), 3),
+        5: {"REGION": choice(REGIONS), **date_params(date(year(), 1, 1), 12)},
+        6: q6_params(year(), integer(2, 9) / 100, integer(24, 25)),
+        7: dict(zip(("NATION1", "NATION2"), choice(nations, 2))),
+        8: {
+            "NATION": nation8,
+            "REGION": REGIONS[NATIONS[nation8]],
+            "TYPE": part_type(3),
+        },
+        9: {"COLOR": choice(COLORS)},
+        10: date_params(month(date(1993, 2, 1), date(1995, 1, 1)), 3),
+        11: {"NATION": choice(nations)},
+        12: {
+            **dict(zip(("SHIPMODE1", "SHIPMODE2"), choice(SHIP_MODES, 2))),
+            **date_params(date(year(), 1, 1), 12),
+        },
+        13: {
+            "WORD1": choice(COMMENT_WORDS[0]),
+            "WORD2": choice(COMMENT_WORDS[1]),
+        },
+        14: date_params(month(date(1993, 1, 1), date(1997, 12, 1)), 1),
+        15: date_params(month(date(1993, 1, 1), date(1997, 10, 1)), 3),
+        16: {
+            "BRAND": brand(),
+            "TYPE": part_type(2),
+            "SIZES": choice(range(1, 51), 8),
+        },
+        17: {
+            "BRAND": brand(),
+            "CONTAINER": " ".join(choice(s) for s in CONTAINER_SYLLABLES),
+        },
+        18: {"QUANTITY": integer(312, 315)},
+        19: {
+            "QUANTITY1": integer(1, 10),
+            "QUANTITY2": integer(10, 20),
+            "QUANTITY3": integer(20, 30),
+            "BRAND1": brand(),
+            "BRAND2": brand(),
+            "BRAND3": brand(),
+        },
+        20: {
+            "COLOR": choice(COLORS),
+            "NATION": choice(nations),
+            **date_params(date(year(), 1, 1), 12),
+        },
+        21: {"NATION": choice(nations)},
+        # country codes, the nation keys + 10
+        22: {"CODES": [str(code) for code in choice(range(10, 35), 7)]},
+    }
+
+
+def format_sql_value(value):
+    """SQL text of a parameter value, the strings being quoted in the template."""
+    if isinstance(value, list):
+        return ", ".join(
+            f"'{v}'" if isinstance(v, str) else format_sql_value(v) for v in value
+        )
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def substitute_params(query, params):
+    """
+    Replace the __NAME__ placeholders of a query text with the parameters of
+    the query.
+    """
+    for name, value in params.items():
+        query = query.replace(f"__{name}__", format_sql_value(value))
+    return query
@@ -14,7 +14,7 @@ SELECT
 FROM
     lineitem
 WHERE
-    l_shipdate <= CAST('1998-09-02' AS date)
+    l_shipdate <= CAST('__DATE__' AS date)
 GROUP BY
     l_returnflag,
     l_linestatus
@@ -42,11 +42,11 @@ FROM
 WHERE
     p_partkey = ps_partkey
     AND s_suppkey = ps_suppkey
-    AND p_size = 15
-    AND p_type LIKE '%BRASS'
+    AND p_size = __SIZE__
+    AND p_type LIKE '%__TYPE__'
     AND s_nationkey = n_nationkey
     AND n_regionkey = r_regionkey
-    AND r_name = 'EUROPE'
+    AND r_name = '__REGION__'
     AND ps_supplycost = (
         SELECT
             MIN(ps_supplycost)
@@ -60,7 +60,7 @@ WHERE
             AND s_suppkey = ps_suppkey
             AND s_nationkey = n_nationkey
             AND n_regionkey = r_regionkey
-            AND r_name = 'EUROPE'
+            AND r_name = '__REGION__'
     )
 ORDER BY
     s_acctbal DESC,
@@ -87,11 +87,11 @@ FROM
     orders,
     lineitem
 WHERE
-    c_mktsegment = 'BUILDING'
+    c_mktsegment = '__SEGMENT__'
     AND c_custkey = o_custkey
     AND l_orderkey = o_orderkey
-    AND o_orderdate < CAST('1995-03-15' AS date)
-    AND l_shipdate > CAST('1995-03-15' AS date)
+    AND o_orderdate < CAST('__DATE__' AS date)
+    AND l_shipdate > CAST('__DATE__' AS date)
 GROUP BY
     l_orderkey,
     o_orderdate,
@@ -116,8 +116,8 @@ SELECT
 FROM
     orders
 WHERE
-    o_orderdate >= CAST('1993-07-01' AS date)
-    AND o_orderdate < CAST('1993-10-01' AS date)
+    o_orderdate >= CAST('__DATE__' AS date)
+    AND o_orderdate < CAST('__END_DATE__' AS date)
     AND EXISTS (
         SELECT
             *
@@ -157,9 +157,9 @@ WHERE
     AND c_nationkey = s_nationkey
     AND s_nationkey = n_nationkey
     AND n_regionkey = r_regionkey
-    AND r_name = 'ASIA'
-    AND o_orderdate >= CAST('1994-01-01' AS date)
-    AND o_orderdate < CAST('1995-01-01' AS date)
+    AND r_name = '__REGION__'
+    AND o_orderdate >= CAST('__DATE__' AS date)
+    AND o_orderdate < CAST('__END_DATE__' AS date)
 GROUP BY
     n_name
 ORDER BY
@@ -177,11 +177,11 @@ SELECT
 FROM
     lineitem
 WHERE
-    l_shipdate >= CAST('1994-01-01' AS date)
-    AND l_shipdate < CAST('1995-01-01' AS date)
-    AND l_discount BETWEEN 0.05
-    AND 0.07
-    AND l_quantity < 24;
+    l_shipdate >= CAST('__DATE__' AS date)
+    AND l_shipdate < CAST('__END_DATE__' AS date)
+    AND l_discount BETWEEN __DISCOUNT_LOW__
+    AND __DISCOUNT_HIGH__
+    AND l_quantity < __QUANTITY__;
 
 
     
@@ -221,12 +221,12 @@ FROM
             AND c_nationkey = n2.n_nationkey
             AND (
                 (
-                    n1.n_name = 'FRANCE'
-                    AND n2.n_name = 'GERMANY'
+                    n1.n_name = '__NATION1__'
+                    AND n2.n_name = '__NATION2__'
                 )
                 OR (
-                    n1.n_name = 'GERMANY'
-                    AND n2.n_name = 'FRANCE'
+                    n1.n_name = '__NATION2__'
+                    AND n2.n_name = '__NATION1__'
                 )
             )
             AND l_shipdate BETWEEN CAST('1995-01-01' AS date)
@@ -252,7 +252,7 @@ SELECT
     o_year,
     SUM(
         CASE
-            WHEN nation = 'BRAZIL' THEN volume
+            WHEN nation = '__NATION__' THEN volume
             ELSE 0
         END
     ) / SUM(volume) AS mkt_share
@@ -282,11 +282,11 @@ FROM
             AND o_custkey = c_custkey
             AND c_nationkey = n1.n_nationkey
             AND n1.n_regionkey = r_regionkey
-            AND r_name = 'AMERICA'
+            AND r_name = '__REGION__'
             AND s_nationkey = n2.n_nationkey
             AND o_orderdate BETWEEN CAST('1995-01-01' AS date)
             AND CAST('1996-12-31' AS date)
-            AND p_type = 'ECONOMY ANODIZED STEEL'
+            AND p_type = '__TYPE__'
     ) AS all_nations
 GROUP BY
     o_year
@@ -331,7 +331,7 @@ FROM
             AND p_partkey = l_partkey
             AND o_orderkey = l_orderkey
             AND s_nationkey = n_nationkey
-            AND p_name LIKE '%green%'
+            AND p_name LIKE '%__COLOR__%'
     ) AS profit
 GROUP BY
     nation,
@@ -365,8 +365,8 @@ FROM
 WHERE
     c_custkey = o_custkey
     AND l_orderkey = o_orderkey
-    AND o_orderdate >= CAST('1993-10-01' AS date)
-    AND o_orderdate < CAST('1994-01-01' AS date)
+    AND o_orderdate >= CAST('__DATE__' AS date)
+    AND o_orderdate < CAST('__END_DATE__' AS date)
     AND l_returnflag = 'R'
     AND c_nationkey = n_nationkey
 GROUP BY
@@ -399,7 +399,7 @@ FROM
 WHERE
     ps_suppkey = s_suppkey
     AND s_nationkey = n_nationkey
-    AND n_name = 'GERMANY'
+    AND n_name = '__NATION__'
 GROUP BY
     ps_partkey
 HAVING
@@ -413,7 +413,7 @@ HAVING
         WHERE
             ps_suppkey = s_suppkey
             AND s_nationkey = n_nationkey
-            AND n_name = 'GERMANY'
+            AND n_name = '__NATION__'
     )
 ORDER BY
     value DESC;
@@ -447,11 +447,11 @@ FROM
     lineitem
 WHERE
     o_orderkey = l_orderkey
-    AND l_shipmode IN ('MAIL', 'SHIP')
+    AND l_shipmode IN ('__SHIPMODE1__', '__SHIPMODE2__')
     AND l_commitdate < l_receiptdate
     AND l_shipdate < l_commitdate
-    AND l_receiptdate >= CAST('1994-01-01' AS date)
-    AND l_receiptdate < CAST('1995-01-01' AS date)
+    AND l_receiptdate >= CAST('__DATE__' AS date)
+    AND l_receiptdate < CAST('__END_DATE__' AS date)
 GROUP BY
     l_shipmode
 ORDER BY
@@ -476,7 +476,7 @@ FROM
         FROM
             customer
             LEFT OUTER JOIN orders ON c_custkey = o_custkey
-            AND o_comment NOT LIKE '%special%requests%'
+            AND o_comment NOT LIKE '%__WORD1__%__WORD2__%'
         GROUP BY
             c_custkey
     ) AS c_orders
@@ -506,8 +506,8 @@ FROM
     part
 WHERE
     l_partkey = p_partkey
-    AND l_shipdate >= date '1995-09-01'
-    AND l_shipdate < CAST('1995-10-01' AS date);
+    AND l_shipdate >= CAST('__DATE__' AS date)
+    AND l_shipdate < CAST('__END_DATE__' AS date);
 
 
     
@@ -532,8 +532,8 @@ FROM
         FROM
             lineitem
         WHERE
-            l_shipdate >= CAST('1996-01-01' AS date)
-            AND l_shipdate < CAST('1996-04-01' AS date)
+            l_shipdate >= CAST('__DATE__' AS date)
+            AND l_shipdate < CAST('__END_DATE__' AS date)
         GROUP BY
             l_suppkey
     ) revenue0
@@ -550,8 +550,8 @@ WHERE
                 FROM
                     lineitem
                 WHERE
-                    l_shipdate >= CAST('1996-01-01' AS date)
-                    AND l_shipdate < CAST('1996-04-01' AS date)
+                    l_shipdate >= CAST('__DATE__' AS date)
+                    AND l_shipdate < CAST('__END_DATE__' AS date)
                 GROUP BY
                     l_suppkey
             ) revenue1
@@ -575,18 +575,9 @@ FROM
     part
 WHERE
     p_partkey = ps_partkey
-    AND p_brand <> 'Brand#45'
-    AND p_type NOT LIKE 'MEDIUM POLISHED%'
-    AND p_size IN (
-        49,
-        14,
-        23,
-        45,
-        19,
-        3,
-        36,
-        9
-    )
+    AND p_brand <> '__BRAND__'
+    AND p_type NOT LIKE '__TYPE__%'
+    AND p_size IN (__SIZES__)
     AND ps_suppkey NOT IN (
         SELECT
             s_suppkey
@@ -620,8 +611,8 @@ FROM
     part
 WHERE
     p_partkey = l_partkey
-    AND p_brand = 'Brand#23'
-    AND p_container = 'MED BOX'
+    AND p_brand = '__BRAND__'
+    AND p_container = '__CONTAINER__'
     AND l_quantity < (
         SELECT
             0.2 * AVG(l_quantity)
@@ -657,7 +648,7 @@ WHERE
         GROUP BY
             l_orderkey
         HAVING
-            SUM(l_quantity) > 300
+            SUM(l_quantity) > __QUANTITY__
     )
     AND c_custkey = o_custkey
     AND o_orderkey = l_orderkey
@@ -686,15 +677,15 @@ FROM
 WHERE
     (
         p_partkey = l_partkey
-        AND p_brand = 'Brand#12'
+        AND p_brand = '__BRAND1__'
         AND p_container IN (
             'SM CASE',
             'SM BOX',
             'SM PACK',
             'SM PKG'
         )
-        AND l_quantity >= 1
-        AND l_quantity <= 1 + 10
+        AND l_quantity >= __QUANTITY1__
+        AND l_quantity <= __QUANTITY1__ + 10
         AND p_size BETWEEN 1
         AND 5
         AND l_shipmode IN ('AIR', 'AIR REG')
@@ -702,15 +693,15 @@ WHERE
     )
     OR (
         p_partkey = l_partkey
-        AND p_brand = 'Brand#23'
+        AND p_brand = '__BRAND2__'
         AND p_container IN (
             'MED BAG',
             'MED BOX',
             'MED PKG',
             'MED PACK'
         )
-        AND l_quantity >= 10
-        AND l_quantity <= 10 + 10
+        AND l_quantity >= __QUANTITY2__
+        AND l_quantity <= __QUANTITY2__ + 10
         AND p_size BETWEEN 1
         AND 10
         AND l_shipmode IN ('AIR', 'AIR REG')
@@ -718,15 +709,15 @@ WHERE
     )
     OR (
         p_partkey = l_partkey
-        AND p_brand = 'Brand#34'
+        AND p_brand = '__BRAND3__'
         AND p_container IN (
             'LG CASE',
             'LG BOX',
             'LG PACK',
             'LG PKG'
         )
-        AND l_quantity >= 20
-        AND l_quantity <= 20 + 10
+        AND l_quantity >= __QUANTITY3__
+        AND l_quantity <= __QUANTITY3__ + 10
         AND p_size BETWEEN 1
         AND 15
         AND l_shipmode IN ('AIR', 'AIR REG')
@@ -758,7 +749,7 @@ WHERE
                 FROM
                     part
                 WHERE
-                    p_name LIKE 'forest%'
+                    p_name LIKE '__COLOR__%'
             )
             AND ps_availqty > (
                 SELECT
@@ -768,12 +759,12 @@ WHERE
                 WHERE
                     l_partkey = ps_partkey
                     AND l_suppkey = ps_suppkey
-                    AND l_shipdate >= CAST('1994-01-01' AS date)
-                    AND l_shipdate < CAST('1995-01-01' AS date)
+                    AND l_shipdate >= CAST('__DATE__' AS date)
+                    AND l_shipdate < CAST('__END_DATE__' AS date)
             )
     )
     AND s_nationkey = n_nationkey
-    AND n_name = 'CANADA'
+    AND n_name = '__NATION__'
 ORDER BY
     s_name;
     
@@ -816,7 +807,7 @@ WHERE
             AND l3.l_receiptdate > l3.l_commitdate
     )
     AND s_nationkey = n_nationkey
-    AND n_name = 'SAUDI ARABIA'
+    AND n_name = '__NATION__'
 GROUP BY
     s_name
 ORDER BY
@@ -843,15 +834,7 @@ FROM
         FROM
             customer
         WHERE
-            SUBSTRING(c_phone, 1, 2) IN (
-                '13',
-                '31',
-                '23',
-                '29',
-                '30',
-                '18',
-                '17'
-            )
+            SUBSTRING(c_phone, 1, 2) IN (__CODES__)
             AND c_acctbal > (
                 SELECT
                     AVG(c_acctbal)
@@ -859,15 +842,7 @@ FROM
                     customer
                 WHERE
                     c_acctbal > 0.00
-                    AND SUBSTRING(c_phone, 1, 2) IN (
-                        '13',
-                        '31',
-                        '23',
-                        '29',
-                        '30',
-                        '18',
-                        '17'
-                    )
+                    AND SUBSTRING(c_phone, 1, 2) IN (__CODES__)
             )
             AND NOT EXISTS (
                 SELECT